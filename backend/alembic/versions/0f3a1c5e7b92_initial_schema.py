@@ -0,0 +1,314 @@
+"""initial schema
+
+Esquema anterior a Alembic (las tablas que existían antes de la primera
+migración), para que `alembic upgrade head` funcione sobre una base vacía.
+En bases creadas antes de adoptar Alembic las tablas ya existen y se omiten.
+
+Revision ID: 0f3a1c5e7b92
+Revises:
+Create Date: 2026-10-19 04:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f3a1c5e7b92'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "companies" not in existing:
+        op.create_table(
+            "companies",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("logo_url", sa.String(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_companies_id", "companies", ["id"])
+        op.create_index("ix_companies_name", "companies", ["name"])
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("role", sa.String(), nullable=False),
+            sa.Column("company_id", sa.Integer(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("is_verified", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_id", "users", ["id"])
+    if "chat_logs" not in existing:
+        op.create_table(
+            "chat_logs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("company_id", sa.Integer(), nullable=False),
+            sa.Column("query", sa.Text(), nullable=False),
+            sa.Column("response", sa.Text(), nullable=False),
+            sa.Column("sources", sa.JSON(), nullable=True),
+            sa.Column("model_used", sa.String(), nullable=True),
+            sa.Column("tokens_used", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_chat_logs_id", "chat_logs", ["id"])
+    if "chat_messages" not in existing:
+        op.create_table(
+            "chat_messages",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("sender_id", sa.Integer(), nullable=False),
+            sa.Column("receiver_id", sa.Integer(), nullable=True),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("is_read", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["receiver_id"], ["users.id"]),
+            sa.ForeignKeyConstraint(["sender_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_chat_messages_id", "chat_messages", ["id"])
+    if "courses" not in existing:
+        op.create_table(
+            "courses",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("company_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("instructor_id", sa.Integer(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+            sa.ForeignKeyConstraint(["instructor_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_courses_id", "courses", ["id"])
+    if "documents" not in existing:
+        op.create_table(
+            "documents",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("company_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("file_path", sa.String(), nullable=False),
+            sa.Column(
+                "file_type", sa.Enum("PDF", "DOCX", "PPTX", "TXT", "VIDEO", "AUDIO", name="documenttype"),
+                nullable=False,
+            ),
+            sa.Column("file_size", sa.Integer(), nullable=False),
+            sa.Column("mime_type", sa.String(), nullable=True),
+            sa.Column("extracted_text", sa.Text(), nullable=True),
+            sa.Column("is_processed", sa.Boolean(), nullable=True),
+            sa.Column("is_indexed", sa.Boolean(), nullable=True),
+            sa.Column("uploaded_by", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+            sa.ForeignKeyConstraint(["uploaded_by"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_documents_id", "documents", ["id"])
+    if "events" not in existing:
+        op.create_table(
+            "events",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("company_id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column(
+                "event_type", sa.Enum("TRAINING", "MEETING", "EXAM", "DEADLINE", name="eventtype"),
+                nullable=False,
+            ),
+            sa.Column("start_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("end_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("location", sa.String(), nullable=True),
+            sa.Column("is_all_day", sa.Boolean(), nullable=True),
+            sa.Column("reminder_sent", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_events_id", "events", ["id"])
+    if "notifications" not in existing:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column(
+                "notification_type", sa.Enum("MESSAGE", "ASSIGNMENT", "EVENT", "SYSTEM", name="notificationtype"),
+                nullable=False,
+            ),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("is_read", sa.Boolean(), nullable=True),
+            sa.Column("link", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_notifications_id", "notifications", ["id"])
+    if "profiles" not in existing:
+        op.create_table(
+            "profiles",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("first_name", sa.String(), nullable=False),
+            sa.Column("last_name", sa.String(), nullable=False),
+            sa.Column("phone", sa.String(), nullable=True),
+            sa.Column("position", sa.String(), nullable=True),
+            sa.Column("department", sa.String(), nullable=True),
+            sa.Column("avatar_url", sa.String(), nullable=True),
+            sa.Column("bio", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id"),
+        )
+        op.create_index("ix_profiles_id", "profiles", ["id"])
+    if "enrollments" not in existing:
+        op.create_table(
+            "enrollments",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("course_id", sa.Integer(), nullable=False),
+            sa.Column("progress", sa.Float(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("enrolled_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["course_id"], ["courses.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_enrollments_id", "enrollments", ["id"])
+    if "modules" not in existing:
+        op.create_table(
+            "modules",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("course_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("order", sa.Integer(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["course_id"], ["courses.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_modules_id", "modules", ["id"])
+    if "module_contents" not in existing:
+        op.create_table(
+            "module_contents",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("module_id", sa.Integer(), nullable=False),
+            sa.Column("content_type", sa.String(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=True),
+            sa.Column("document_id", sa.Integer(), nullable=True),
+            sa.Column("order", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["document_id"], ["documents.id"]),
+            sa.ForeignKeyConstraint(["module_id"], ["modules.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_module_contents_id", "module_contents", ["id"])
+    if "quizzes" not in existing:
+        op.create_table(
+            "quizzes",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("module_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("passing_score", sa.Float(), nullable=True),
+            sa.Column("total_questions", sa.Integer(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["module_id"], ["modules.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_quizzes_id", "quizzes", ["id"])
+    if "attempts" not in existing:
+        op.create_table(
+            "attempts",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("quiz_id", sa.Integer(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=False),
+            sa.Column("is_passed", sa.Boolean(), nullable=True),
+            sa.Column("started_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_attempts_id", "attempts", ["id"])
+    if "questions" not in existing:
+        op.create_table(
+            "questions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("quiz_id", sa.Integer(), nullable=False),
+            sa.Column("question_text", sa.Text(), nullable=False),
+            sa.Column("question_type", sa.String(), nullable=True),
+            sa.Column("correct_answer", sa.Text(), nullable=False),
+            sa.Column("options", sa.Text(), nullable=True),
+            sa.Column("points", sa.Float(), nullable=True),
+            sa.Column("order", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_questions_id", "questions", ["id"])
+    if "answers" not in existing:
+        op.create_table(
+            "answers",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("attempt_id", sa.Integer(), nullable=False),
+            sa.Column("question_id", sa.Integer(), nullable=False),
+            sa.Column("answer_text", sa.Text(), nullable=False),
+            sa.Column("is_correct", sa.Boolean(), nullable=True),
+            sa.Column("points_earned", sa.Float(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["attempt_id"], ["attempts.id"]),
+            sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_answers_id", "answers", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("answers")
+    op.drop_table("questions")
+    op.drop_table("attempts")
+    op.drop_table("quizzes")
+    op.drop_table("module_contents")
+    op.drop_table("modules")
+    op.drop_table("enrollments")
+    op.drop_table("profiles")
+    op.drop_table("notifications")
+    op.drop_table("events")
+    op.drop_table("documents")
+    op.drop_table("courses")
+    op.drop_table("chat_messages")
+    op.drop_table("chat_logs")
+    op.drop_table("users")
+    op.drop_table("companies")
+    for name in ("notificationtype", "eventtype", "documenttype"):
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,30 @@
+"""module_contents updated_at
+
+Columna updated_at en module_contents (como en courses y modules) para calcular
+ETag/Last-Modified de los contenidos a partir de (id, updated_at).
+
+Revision ID: 5b0e7c3f9a21
+Revises: afc8cfb4ad41
+Create Date: 2026-10-19 06:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b0e7c3f9a21'
+down_revision = 'afc8cfb4ad41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "module_contents",
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("module_contents", "updated_at")
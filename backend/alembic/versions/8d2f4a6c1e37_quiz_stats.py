@@ -0,0 +1,40 @@
+"""quiz_stats
+
+Tabla de agregados por quiz (conteo, suma, suma de cuadrados, aprobados,
+histograma y mejores puntajes) mantenida incrementalmente por submit_attempt.
+Rellenar los quizzes existentes con scripts/backfill_quiz_stats.py.
+
+Revision ID: 8d2f4a6c1e37
+Revises: 5b0e7c3f9a21
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f4a6c1e37'
+down_revision = '5b0e7c3f9a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_stats",
+        sa.Column("quiz_id", sa.Integer(), sa.ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pass_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("score_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("score_sq_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("min_score", sa.Float(), nullable=True),
+        sa.Column("max_score", sa.Float(), nullable=True),
+        sa.Column("histogram", sa.JSON(), nullable=False, server_default="[]"),
+        sa.Column("top_scores", sa.JSON(), nullable=False, server_default="[]"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quiz_stats")
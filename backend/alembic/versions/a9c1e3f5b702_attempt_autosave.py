@@ -0,0 +1,31 @@
+"""attempt_autosave
+
+Autoguardado de intentos en curso: respuestas parciales y fecha del último
+guardado, más el índice para reanudar la sesión del usuario en un quiz.
+
+Revision ID: a9c1e3f5b702
+Revises: f2b8d4e6a913
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c1e3f5b702'
+down_revision = 'f2b8d4e6a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("attempts", sa.Column("draft_answers", sa.JSON(), nullable=True))
+    op.add_column("attempts", sa.Column("draft_saved_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("idx_attempts_user_quiz_completed", "attempts", ["user_id", "quiz_id", "completed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_attempts_user_quiz_completed", table_name="attempts")
+    op.drop_column("attempts", "draft_saved_at")
+    op.drop_column("attempts", "draft_answers")
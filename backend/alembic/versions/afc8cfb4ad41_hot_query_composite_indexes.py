@@ -0,0 +1,83 @@
+"""hot query composite indexes
+
+Índices compuestos y parciales para las formas de consulta reales de los routers:
+- notifications: no leídas por usuario, ordenadas por created_at DESC (parcial)
+- chat_messages: conversación entre dos usuarios ordenada por created_at
+- enrollments: verificación de inscripción duplicada (user_id, course_id)
+- events: calendario por empresa ordenado por start_time
+- modules / module_contents: listados por curso/módulo ordenados por "order"
+
+chat_logs(user_id, created_at) ya está cubierto por idx_chat_logs_user_created_id
+(revisión d31466db1a50).
+
+Revision ID: afc8cfb4ad41
+Revises: d31466db1a50
+Create Date: 2026-10-19 05:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'afc8cfb4ad41'
+down_revision = 'd31466db1a50'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas, kwargs)
+INDEXES = [
+    (
+        "idx_notifications_user_unread_created",
+        "notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        {"postgresql_where": sa.text("is_read = false")},
+    ),
+    (
+        "idx_chat_messages_pair_created",
+        "chat_messages",
+        ["sender_id", "receiver_id", "created_at", "id"],
+        {},
+    ),
+    ("idx_events_company_start", "events", ["company_id", "start_time"], {}),
+    ("idx_modules_course_order", "modules", ["course_id", "order"], {}),
+    ("idx_module_contents_module_order", "module_contents", ["module_id", "order"], {}),
+]
+
+ENROLLMENT_UNIQUE = "enrollments_user_id_course_id_key"
+
+
+def _has_enrollment_unique(bind) -> bool:
+    """El esquema SQL original ya declara UNIQUE(user_id, course_id)."""
+    inspector = sa.inspect(bind)
+    for constraint in inspector.get_unique_constraints("enrollments"):
+        if set(constraint["column_names"]) == {"user_id", "course_id"}:
+            return True
+    for index in inspector.get_indexes("enrollments"):
+        if index.get("unique") and set(index["column_names"]) == {"user_id", "course_id"}:
+            return True
+    return False
+
+
+def upgrade() -> None:
+    # En modo offline (--sql) no se puede inspeccionar: se asume el esquema SQL original
+    create_enrollment_unique = (
+        not op.get_context().as_sql and not _has_enrollment_unique(op.get_bind())
+    )
+
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+        if create_enrollment_unique:
+            op.create_index(
+                ENROLLMENT_UNIQUE, "enrollments", ["user_id", "course_id"],
+                unique=True, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    # El índice único de enrollments puede venir del esquema original: no se elimina
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
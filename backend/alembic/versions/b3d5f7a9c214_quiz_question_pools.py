@@ -0,0 +1,29 @@
+"""quiz_question_pools
+
+Bancos de preguntas: cantidad de preguntas servidas al azar por intento en
+cada quiz y preguntas servidas (en orden) en cada intento.
+
+Revision ID: b3d5f7a9c214
+Revises: a9c1e3f5b702
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d5f7a9c214'
+down_revision = 'a9c1e3f5b702'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("quizzes", sa.Column("pool_size", sa.Integer(), nullable=True))
+    op.add_column("attempts", sa.Column("question_ids", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("attempts", "question_ids")
+    op.drop_column("quizzes", "pool_size")
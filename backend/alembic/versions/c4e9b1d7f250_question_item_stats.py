@@ -0,0 +1,39 @@
+"""question_item_stats
+
+Resultados del análisis de ítems por pregunta (dificultad, discriminación
+punto-biserial y frecuencia de distractores), calculados por
+scripts/run_item_analysis.py.
+
+Revision ID: c4e9b1d7f250
+Revises: 8d2f4a6c1e37
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9b1d7f250'
+down_revision = '8d2f4a6c1e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "question_item_stats",
+        sa.Column("question_id", sa.Integer(), sa.ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("quiz_id", sa.Integer(), sa.ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("response_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("difficulty", sa.Float(), nullable=True),
+        sa.Column("discrimination", sa.Float(), nullable=True),
+        sa.Column("distractors", sa.JSON(), nullable=False, server_default="[]"),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("idx_question_item_stats_quiz", "question_item_stats", ["quiz_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_question_item_stats_quiz", table_name="question_item_stats")
+    op.drop_table("question_item_stats")
@@ -0,0 +1,56 @@
+"""chat_conversations
+
+Conversaciones de chat con el último mensaje desnormalizado y participantes
+con contador de no leídos, más el índice de la bandeja de entrada. Los datos
+existentes se cargan con scripts/backfill_conversations.py.
+
+Revision ID: c6e8a0b2d437
+Revises: b3d5f7a9c214
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e8a0b2d437'
+down_revision = 'b3d5f7a9c214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False, server_default="direct"),
+        sa.Column("user_a_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("user_b_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("last_message_id", sa.Integer(), sa.ForeignKey("chat_messages.id", ondelete="SET NULL"),
+                  nullable=True),
+        sa.Column("last_activity", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_conversations_id", "conversations", ["id"])
+    op.create_index("uq_conversations_pair", "conversations", ["user_a_id", "user_b_id"], unique=True)
+    op.create_table(
+        "conversation_participants",
+        sa.Column("conversation_id", sa.Integer(), sa.ForeignKey("conversations.id", ondelete="CASCADE"),
+                  primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_activity", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "idx_conversation_participants_inbox", "conversation_participants",
+        ["user_id", "last_activity", "conversation_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_conversation_participants_inbox", table_name="conversation_participants")
+    op.drop_table("conversation_participants")
+    op.drop_index("uq_conversations_pair", table_name="conversations")
+    op.drop_index("ix_conversations_id", table_name="conversations")
+    op.drop_table("conversations")
@@ -0,0 +1,42 @@
+"""keyset pagination indexes
+
+Índices compuestos que soportan la paginación por cursor de los endpoints de
+listado (orden por (created_at, id) o por id dentro de un filtro de usuario/empresa).
+
+Revision ID: d31466db1a50
+Revises: 0f3a1c5e7b92
+Create Date: 2026-10-19 04:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd31466db1a50'
+down_revision = '0f3a1c5e7b92'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas)
+INDEXES = [
+    ("idx_notifications_user_created_id", "notifications", ["user_id", "created_at", "id"]),
+    ("idx_chat_messages_sender_created_id", "chat_messages", ["sender_id", "created_at", "id"]),
+    ("idx_chat_messages_receiver_created_id", "chat_messages", ["receiver_id", "created_at", "id"]),
+    ("idx_chat_logs_user_created_id", "chat_logs", ["user_id", "created_at", "id"]),
+    ("idx_documents_company_id_id", "documents", ["company_id", "id"]),
+    ("idx_users_company_id_id", "users", ["company_id", "id"]),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
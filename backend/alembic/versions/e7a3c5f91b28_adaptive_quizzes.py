@@ -0,0 +1,45 @@
+"""adaptive_quizzes
+
+Modo adaptativo de evaluaciones: calibración IRT (2PL) por quiz con su tabla
+de información precalculada y el estado de los intentos adaptativos.
+
+Revision ID: e7a3c5f91b28
+Revises: c4e9b1d7f250
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c5f91b28'
+down_revision = 'c4e9b1d7f250'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_irt_models",
+        sa.Column("quiz_id", sa.Integer(), sa.ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("theta_grid", sa.JSON(), nullable=False),
+        sa.Column("items", sa.JSON(), nullable=False),
+        sa.Column("ranking", sa.JSON(), nullable=False),
+        sa.Column("expected_score", sa.JSON(), nullable=False),
+        sa.Column("response_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("iterations", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("fitted_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.add_column("attempts", sa.Column("mode", sa.String(), nullable=False, server_default="fixed"))
+    op.add_column("attempts", sa.Column("theta", sa.Float(), nullable=True))
+    op.add_column("attempts", sa.Column("theta_se", sa.Float(), nullable=True))
+    op.add_column("attempts", sa.Column("adaptive_state", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("attempts", "adaptive_state")
+    op.drop_column("attempts", "theta_se")
+    op.drop_column("attempts", "theta")
+    op.drop_column("attempts", "mode")
+    op.drop_table("quiz_irt_models")
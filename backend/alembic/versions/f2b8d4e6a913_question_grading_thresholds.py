@@ -0,0 +1,29 @@
+"""question_grading_thresholds
+
+Umbrales de calificación de texto por pregunta: similitud mínima por
+distancia de edición y similitud semántica (embeddings) opcional.
+
+Revision ID: f2b8d4e6a913
+Revises: e7a3c5f91b28
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d4e6a913'
+down_revision = 'e7a3c5f91b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("questions", sa.Column("fuzzy_threshold", sa.Float(), nullable=True))
+    op.add_column("questions", sa.Column("semantic_threshold", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("questions", "semantic_threshold")
+    op.drop_column("questions", "fuzzy_threshold")
@@ -10,6 +10,10 @@ backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
+# Arranque en frío: importar cada router en la primera petición a su prefijo
+# (una variable de entorno LAZY_ROUTERS explícita tiene prioridad)
+os.environ.setdefault("LAZY_ROUTERS", "true")
+
 # Importar la app de FastAPI
 from app.main import app
 from mangum import Mangum
@@ -1,32 +1,63 @@
 """
 Router principal de la API v1.
 Agregación de todos los routers de endpoints.
+
+Cada router se registra por nombre (= prefijo bajo /api/v1). Con carga eager
+se incluyen todos al arrancar; con LAZY_ROUTERS el módulo del router se importa
+en la primera petición a su prefijo (ver app.core.lazy_routes), de modo que un
+arranque en frío solo paga los routers que realmente usa.
 """
-from fastapi import APIRouter
-from app.api.v1.routers import (
-    auth,
-    users,
-    companies,
-    courses,
-    documents,
-    chat,
-    rag,
-    events,
-    quizzes,
-    notifications,
-)
-
-api_router = APIRouter()
-
-# Incluir todos los routers
-api_router.include_router(auth.router, prefix="/auth", tags=["Autenticación"])
-api_router.include_router(users.router, prefix="/users", tags=["Usuarios"])
-api_router.include_router(companies.router, prefix="/companies", tags=["Empresas"])
-api_router.include_router(courses.router, prefix="/courses", tags=["Cursos"])
-api_router.include_router(documents.router, prefix="/documents", tags=["Documentos"])
-api_router.include_router(chat.router, prefix="/chat", tags=["Chat"])
-api_router.include_router(rag.router, prefix="/rag", tags=["RAG"])
-api_router.include_router(events.router, prefix="/events", tags=["Eventos"])
-api_router.include_router(quizzes.router, prefix="/quizzes", tags=["Evaluaciones"])
-api_router.include_router(notifications.router, prefix="/notifications", tags=["Notificaciones"])
+import importlib
+import threading
+from typing import Dict, Iterable, Optional
+
+from fastapi import FastAPI
+
+API_PREFIX = "/api/v1"
+
+# nombre (prefijo) -> tag de OpenAPI
+ROUTERS: Dict[str, str] = {
+    "auth": "Autenticación",
+    "users": "Usuarios",
+    "companies": "Empresas",
+    "courses": "Cursos",
+    "documents": "Documentos",
+    "chat": "Chat",
+    "rag": "RAG",
+    "events": "Eventos",
+    "quizzes": "Evaluaciones",
+    "notifications": "Notificaciones",
+}
+
+_include_lock = threading.Lock()
+
+
+def include_router(app: FastAPI, name: str) -> None:
+    """Importar el router `name` e incluirlo en la aplicación (idempotente)."""
+    if name in getattr(app.state, "included_routers", ()):
+        return
+    with _include_lock:
+        included = getattr(app.state, "included_routers", None)
+        if included is None:
+            app.state.included_routers = included = set()
+        if name in included:
+            return
+        module = importlib.import_module(f"app.api.v1.routers.{name}")
+        app.include_router(module.router, prefix=f"{API_PREFIX}/{name}", tags=[ROUTERS[name]])
+        # El esquema OpenAPI se genera una vez; rehacerlo con las rutas nuevas
+        app.openapi_schema = None
+        included.add(name)
+
+
+def include_routers(app: FastAPI, names: Optional[Iterable[str]] = None) -> None:
+    """Incluir los routers indicados (todos por defecto, en el orden de ROUTERS)."""
+    for name in names or ROUTERS:
+        include_router(app, name)
+
 
+def router_for_path(path: str) -> Optional[str]:
+    """Nombre del router que atiende `path`, o None si no pertenece a /api/v1."""
+    if not path.startswith(f"{API_PREFIX}/"):
+        return None
+    name = path[len(API_PREFIX) + 1:].split("/", 1)[0]
+    return name if name in ROUTERS else None
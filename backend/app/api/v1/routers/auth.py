@@ -7,7 +7,13 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.core.security import (
+    verify_password_async,
+    get_password_hash_async,
+    create_access_token,
+    create_refresh_token,
+    PasswordHashingBusyError,
+)
 from app.core.dependencies import get_current_user
 from app.core.enums import Role
 from app.models.user import User, Profile
@@ -32,29 +38,39 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     
     logger.info("=" * 50)
     logger.info("Iniciando registro de usuario")
-    logger.info(f"Email: {user_data.email}")
-    logger.info(f"Role: {user_data.role} (tipo: {type(user_data.role)})")
-    logger.info(f"Company ID: {user_data.company_id}")
+    logger.info("Email: %s", user_data.email)
+    logger.info("Role: %s (tipo: %s)", user_data.role, type(user_data.role))
+    logger.info("Company ID: %s", user_data.company_id)
     logger.info("=" * 50)
     
     try:
+        # Hashear antes de tocar la base de datos para no retener una conexión
+        # del pool mientras bcrypt trabaja en el pool de hilos
+        logger.info("Iniciando hash de contraseña...")
+        try:
+            hashed_password = await get_password_hash_async(user_data.password)
+            logger.info("Contraseña hasheada exitosamente: %s...", hashed_password[:20])
+        except Exception as hash_error:
+            logger.error("Error al hashear contraseña: %s: %s", type(hash_error).__name__, hash_error)
+            raise
+        
         # Verificar conexión a la base de datos
         logger.info("Verificando conexion a la base de datos...")
         try:
             db.execute(text("SELECT 1"))  # Test query simple
             logger.info("Conexion a la base de datos OK")
         except Exception as db_test_error:
-            logger.error(f"ERROR en test de BD: {type(db_test_error).__name__}: {str(db_test_error)}")
+            logger.error("ERROR en test de BD: %s: %s", type(db_test_error).__name__, db_test_error)
             raise
         
         # MODO DEMO: Permitir registro sin validaciones estrictas
         # Si el email ya existe, actualizar el usuario existente en lugar de rechazar
-        logger.info(f"Buscando usuario existente con email: {user_data.email}")
+        logger.info("Buscando usuario existente con email: %s", user_data.email)
         existing_user = db.query(User).filter(User.email == user_data.email).first()
-        logger.info(f"Usuario existente encontrado: {existing_user is not None}")
+        logger.info("Usuario existente encontrado: %s", existing_user is not None)
         if existing_user:
             # En modo demo, actualizar la contraseña del usuario existente
-            existing_user.hashed_password = get_password_hash(user_data.password)
+            existing_user.hashed_password = hashed_password
             # Convertir role a enum si es necesario
             if user_data.role:
                 if isinstance(user_data.role, str):
@@ -68,13 +84,6 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         
         # Crear nuevo usuario
         logger.info("Creando nuevo usuario...")
-        logger.info("Iniciando hash de contraseña...")
-        try:
-            hashed_password = get_password_hash(user_data.password)
-            logger.info(f"Contraseña hasheada exitosamente: {hashed_password[:20]}...")
-        except Exception as hash_error:
-            logger.error(f"Error al hashear contraseña: {type(hash_error).__name__}: {str(hash_error)}")
-            raise
         
         # Asegurar que el role sea un enum Role válido
         # Mapear roles del frontend a los roles del sistema
@@ -95,7 +104,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
                 if isinstance(user_data.role, str):
                     # Intentar convertir el string a Role enum usando el mapeo
                     role_str = user_data.role.lower()
-                    logger.info(f"Intentando convertir role '{role_str}' a enum...")
+                    logger.info("Intentando convertir role '%s' a enum...", role_str)
                     
                     # Primero intentar con el mapeo
                     if role_str in role_mapping:
@@ -108,23 +117,23 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             else:
                 user_role = Role.ESTUDIANTE
         except ValueError as ve:
-            logger.error(f"Error al convertir role: {ve}")
-            logger.error(f"Roles validos son: {[r.value for r in Role]}")
+            logger.error("Error al convertir role: %s", ve)
+            logger.error("Roles validos son: %s", [r.value for r in Role])
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Role invalido: {user_data.role}. Roles validos: {[r.value for r in Role]}"
             )
         
-        logger.info(f"Role asignado: {user_role} (tipo: {type(user_role)})")
+        logger.info("Role asignado: %s (tipo: %s)", user_role, type(user_role))
         
         # Asegurar que company_id sea None si no se proporciona o es 0 (evitar problemas con foreign key)
         company_id = user_data.company_id if user_data.company_id and user_data.company_id != 0 else None
-        logger.info(f"company_id (procesado): {company_id} (original: {user_data.company_id})")
+        logger.info("company_id (procesado): %s (original: %s)", company_id, user_data.company_id)
         
         try:
             # Extraer el valor del enum como string para guardarlo en la BD
             role_value = user_role.value if isinstance(user_role, Role) else str(user_role)
-            logger.info(f"Role value que se guardara en BD: '{role_value}' (tipo: {type(role_value)})")
+            logger.info("Role value que se guardara en BD: '%s' (tipo: %s)", role_value, type(role_value))
             
             new_user = User(
                 email=user_data.email,
@@ -142,7 +151,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
                 db.commit()
                 logger.info("Commit exitoso, refrescando usuario...")
             except Exception as commit_error:
-                logger.error(f"Error en commit: {type(commit_error).__name__}: {str(commit_error)}")
+                logger.error("Error en commit: %s: %s", type(commit_error).__name__, commit_error)
                 import traceback
                 logger.error(traceback.format_exc())
                 db.rollback()
@@ -150,9 +159,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             
             try:
                 db.refresh(new_user)
-                logger.info(f"Usuario registrado exitosamente: ID={new_user.id}, email={new_user.email}")
+                logger.info("Usuario registrado exitosamente: ID=%s, email=%s", new_user.id, new_user.email)
             except Exception as refresh_error:
-                logger.error(f"Error en refresh: {type(refresh_error).__name__}: {str(refresh_error)}")
+                logger.error("Error en refresh: %s: %s", type(refresh_error).__name__, refresh_error)
                 import traceback
                 logger.error(traceback.format_exc())
                 # No hacer rollback aquí porque el commit ya fue exitoso
@@ -160,12 +169,16 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             
             return new_user
         except Exception as db_error:
-            logger.error(f"Error al crear usuario en la base de datos: {type(db_error).__name__}")
-            logger.error(f"Mensaje: {str(db_error)}")
+            logger.error("Error al crear usuario en la base de datos: %s", type(db_error).__name__)
+            logger.error("Mensaje: %s", db_error)
             import traceback
             logger.error(traceback.format_exc())
             db.rollback()
             raise  # Re-lanzar para que sea capturado por el handler general
+    except PasswordHashingBusyError:
+        # Saturación del pool de hashing: responder 503 (handler en main.py)
+        db.rollback()
+        raise
     except ValueError as e:
         db.rollback()
         raise HTTPException(
@@ -180,8 +193,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         error_trace = traceback.format_exc()
         logger.error("=" * 50)
         logger.error("ERROR COMPLETO AL REGISTRAR USUARIO")
-        logger.error(f"Tipo de excepcion: {type(e).__name__}")
-        logger.error(f"Mensaje: {str(e)}")
+        logger.error("Tipo de excepcion: %s", type(e).__name__)
+        logger.error("Mensaje: %s", e)
         logger.error("Traceback completo:")
         logger.error(error_trace)
         logger.error("=" * 50)
@@ -207,29 +220,33 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     
     logger.info("=" * 50)
     logger.info("Iniciando proceso de login")
-    logger.info(f"Email: {login_data.email}")
+    logger.info("Email: %s", login_data.email)
     logger.info("=" * 50)
     
     user = db.query(User).filter(User.email == login_data.email).first()
     
     if not user:
-        logger.warning(f"Usuario no encontrado: {login_data.email}")
+        logger.warning("Usuario no encontrado: %s", login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales inválidas"
         )
     
-    logger.info(f"Usuario encontrado: ID={user.id}, Email={user.email}, Role={user.role}, Activo={user.is_active}")
+    logger.info("Usuario encontrado: ID=%s, Email=%s, Role=%s, Activo=%s", user.id, user.email, user.role, user.is_active)
     
-    if not verify_password(login_data.password, user.hashed_password):
-        logger.warning(f"Contraseña incorrecta para usuario: {login_data.email}")
+    # Devolver la conexión al pool antes de esperar a bcrypt.
+    # El usuario queda desacoplado de la sesión con sus columnas ya cargadas.
+    db.close()
+    
+    if not await verify_password_async(login_data.password, user.hashed_password):
+        logger.warning("Contraseña incorrecta para usuario: %s", login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales inválidas"
         )
     
     if not user.is_active:
-        logger.warning(f"Intento de login de usuario inactivo: {login_data.email}")
+        logger.warning("Intento de login de usuario inactivo: %s", login_data.email)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Usuario inactivo"
@@ -245,7 +262,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         data={"sub": str(user.id)}
     )
     
-    logger.info(f"✅ Login exitoso para usuario: {login_data.email}")
+    logger.info("✅ Login exitoso para usuario: %s", login_data.email)
     logger.info("=" * 50)
     
     return {
@@ -330,9 +347,13 @@ async def change_password(
     import logging
     logger = logging.getLogger(__name__)
     
+    # Liberar la conexión de la sesión mientras bcrypt trabaja en el pool de hilos
+    hashed_password = current_user.hashed_password
+    db.commit()
+    
     # Verificar contraseña actual
-    if not verify_password(password_data.current_password, current_user.hashed_password):
-        logger.warning(f"Intento de cambio de contraseña con contraseña incorrecta para usuario: {current_user.email}")
+    if not await verify_password_async(password_data.current_password, hashed_password):
+        logger.warning("Intento de cambio de contraseña con contraseña incorrecta para usuario: %s", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Contraseña actual incorrecta"
@@ -353,11 +374,11 @@ async def change_password(
         )
     
     # Actualizar contraseña
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await get_password_hash_async(password_data.new_password)
     db.commit()
     db.refresh(current_user)
     
-    logger.info(f"✅ Contraseña actualizada exitosamente para usuario: {current_user.email}")
+    logger.info("✅ Contraseña actualizada exitosamente para usuario: %s", current_user.email)
     
     return {"message": "Contraseña actualizada exitosamente"}
 
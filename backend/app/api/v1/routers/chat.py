@@ -1,19 +1,27 @@
 """
 Router de chat tradicional.
-Endpoints para mensajería entre usuarios.
+Endpoints para mensajería entre usuarios y entrega en tiempo real por
+WebSocket (ver app.core.realtime).
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, List, Optional
+from app.core import realtime
+from app.core.database import SessionLocal, get_db
 from app.core.dependencies import get_current_user
-from app.models.chat import ChatMessage
+from app.core.pagination import paginate
+from app.core.security import decode_token
+from app.models.chat import ChatMessage, Conversation, ConversationParticipant
 from app.models.user import User
-from pydantic import BaseModel
+from app.services import conversations
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
 
 router = APIRouter()
 
+MAX_READ_IDS = 1000  # Ids por petición de lectura masiva
+
 
 class ChatMessageCreate(BaseModel):
     """Esquema para crear mensaje."""
@@ -34,44 +42,281 @@ class ChatMessageResponse(BaseModel):
         from_attributes = True
 
 
-@router.post("/", response_model=ChatMessageResponse, status_code=status.HTTP_201_CREATED)
-async def send_message(
-    message_data: ChatMessageCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Enviar mensaje."""
+class ConversationResponse(BaseModel):
+    """Conversación de la bandeja de entrada."""
+    id: int
+    kind: str
+    peer_id: Optional[int] = None  # El otro participante (conversación directa)
+    unread_count: int
+    last_activity: datetime
+    last_message: Optional[ChatMessageResponse] = None
+
+
+class ChatReadRequest(BaseModel):
+    """Mensajes recibidos a marcar como leídos (filtros combinables; sin filtros: todos)."""
+    message_ids: Optional[List[int]] = None
+    conversation_id: Optional[int] = None
+    until: Optional[datetime] = None  # Solo los creados hasta este instante (inclusive)
+
+
+class ConversationReadState(BaseModel):
+    """No leídos restantes de una conversación afectada."""
+    conversation_id: int
+    peer_id: Optional[int] = None
+    unread_count: int
+
+
+class ChatReadResponse(BaseModel):
+    """Resultado de la lectura masiva."""
+    updated: int
+    unread_count: int  # Total de no leídos del usuario
+    conversations: List[ConversationReadState]
+
+
+def _create_message(db: Session, sender_id: int, message_data: ChatMessageCreate) -> Dict[str, Any]:
+    """
+    Guardar el mensaje, actualizar su conversación (último mensaje y no
+    leídos) y publicarlo en tiempo real al remitente y al destinatario, todo
+    en una transacción. Retorna el mensaje serializado.
+    """
     new_message = ChatMessage(
-        sender_id=current_user.id,
+        sender_id=sender_id,
         receiver_id=message_data.receiver_id,
         message=message_data.message
     )
     db.add(new_message)
+    db.flush()
+    db.refresh(new_message)  # created_at lo asigna la base
+    conversations.record_message(db, new_message)
+    data = ChatMessageResponse.model_validate(new_message).model_dump(mode="json")
+    realtime.publish(db, (sender_id, message_data.receiver_id), "message", data)
     db.commit()
-    db.refresh(new_message)
-    return new_message
+    return data
 
 
-@router.get("/", response_model=List[ChatMessageResponse])
-async def get_messages(
-    receiver_id: Optional[int] = None,
+@router.post("/", response_model=ChatMessageResponse, status_code=status.HTTP_201_CREATED)
+async def send_message(
+    message_data: ChatMessageCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Enviar mensaje (también se entrega a los WebSockets abiertos del remitente
+    y del destinatario). La escritura corre en el threadpool, como la del
+    WebSocket, para no frenar el event loop que atiende a los sockets.
+    """
+    return await run_in_threadpool(_create_message, db, current_user.id, message_data)
+
+
+def _conversation_item(participant: ConversationParticipant, user_id: int) -> Dict[str, Any]:
+    conversation = participant.conversation
+    if conversation.kind == "direct":
+        peer_id = conversation.user_b_id if conversation.user_a_id == user_id else conversation.user_a_id
+    else:
+        peer_id = None
+    return {
+        "id": conversation.id,
+        "kind": conversation.kind,
+        "peer_id": peer_id,
+        "unread_count": participant.unread_count,
+        "last_activity": participant.last_activity,
+        "last_message": conversation.last_message,
+    }
+
+
+# Orden de la bandeja de entrada (actividad más reciente primero)
+CONVERSATIONS_ORDER = [ConversationParticipant.last_activity, ConversationParticipant.conversation_id]
+
+
+def conversations_query(db: Session, user_id: int):
+    """Participaciones del usuario con su conversación y último mensaje, sin orden ni paginación."""
+    return db.query(ConversationParticipant).options(
+        joinedload(ConversationParticipant.conversation).joinedload(Conversation.last_message)
+    ).filter(ConversationParticipant.user_id == user_id)
+
+
+@router.get("/conversations", response_model=List[ConversationResponse])
+async def get_conversations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtener mensajes del usuario."""
+    """
+    Bandeja de entrada: conversaciones del usuario (actividad más reciente
+    primero) con su último mensaje y no leídos. Una sola consulta por página
+    sobre el índice de participantes; paginación por offset o cursor.
+    """
+    rows = paginate(
+        conversations_query(db, current_user.id), response, CONVERSATIONS_ORDER,
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+    return [_conversation_item(row, current_user.id) for row in rows]
+
+
+def _mark_read(db: Session, user_id: int, read_data: ChatReadRequest) -> Dict[str, Any]:
+    """Marcar, publicar los avisos de lectura y hacer commit (en el threadpool)."""
+    sender_id = None
+    if read_data.conversation_id is not None:
+        conversation = db.query(Conversation).join(
+            ConversationParticipant, ConversationParticipant.conversation_id == Conversation.id
+        ).filter(
+            Conversation.id == read_data.conversation_id,
+            ConversationParticipant.user_id == user_id
+        ).first()
+        if not conversation or conversation.kind != "direct":
+            raise HTTPException(status_code=404, detail="Conversación no encontrada")
+        sender_id = conversation.user_b_id if conversation.user_a_id == user_id else conversation.user_a_id
+    
+    updated, read = conversations.mark_read(
+        db, user_id, message_ids=read_data.message_ids, sender_id=sender_id, until=read_data.until
+    )
+    unread_count = conversations.unread_total(db, user_id)
+    for item in read:
+        realtime.publish(db, (user_id, item["peer_id"]), "read", {
+            "conversation_id": item["conversation_id"],
+            "reader_id": user_id,
+            "message_ids": item["message_ids"],
+        })
+    db.commit()
+    
+    return {"updated": updated, "unread_count": unread_count, "conversations": read}
+
+
+@router.put("/read", response_model=ChatReadResponse)
+async def mark_messages_as_read(
+    read_data: ChatReadRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Marcar como leídos, en una sola sentencia UPDATE, los mensajes recibidos
+    de una lista de ids, de una conversación y/o hasta un instante (until:
+    p.ej. created_at del mensaje más reciente mostrado). Ajusta los no leídos
+    de las conversaciones y avisa en tiempo real al lector y a cada remitente.
+    """
+    if read_data.message_ids is not None and len(read_data.message_ids) > MAX_READ_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {MAX_READ_IDS} mensajes por petición"
+        )
+    
+    return await run_in_threadpool(_mark_read, db, current_user.id, read_data)
+
+
+def _authenticate_socket(token: Optional[str]) -> Optional[int]:
+    """user_id del token si es válido y el usuario existe (sesión corta, no se retiene durante el socket)."""
+    payload = decode_token(token) if token else None
+    try:
+        user_id = int(payload.get("sub")) if payload else None
+    except (TypeError, ValueError):
+        return None
+    if user_id is None:
+        return None
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.id == user_id).scalar()
+    finally:
+        db.close()
+
+
+def _send_from_socket(sender_id: int, message_data: ChatMessageCreate) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return _create_message(db, sender_id, message_data)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@router.websocket("/ws")
+async def chat_websocket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Mensajes de chat en tiempo real. Autenticación con ?token=<JWT> (los
+    navegadores no permiten cabeceras en WebSocket).
+    Servidor -> cliente: {"type": "message", "data": <ChatMessageResponse>}
+    Cliente -> servidor: {"type": "message", "receiver_id": ..., "message": ...}
+    (equivale a POST /chat; la confirmación es el propio evento "message") o
+    {"type": "ping"} -> {"type": "pong"}. Los errores llegan como {"type": "error"}.
+    Tras reconectar, el cliente recupera lo perdido con GET /chat.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    user_id = await run_in_threadpool(_authenticate_socket, token)
+    if user_id is None:
+        logger.warning("❌ WebSocket de chat rechazado: token inválido")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    connection = realtime.hub.connect(websocket, user_id)
+    try:
+        while True:
+            try:
+                incoming = await websocket.receive_json()
+            except ValueError:
+                connection.send("error", {"detail": "JSON inválido"})
+                continue
+            kind = incoming.get("type") if isinstance(incoming, dict) else None
+            if kind == "ping":
+                connection.send("pong")
+            elif kind == "message":
+                try:
+                    message_data = ChatMessageCreate.model_validate(incoming)
+                except ValidationError as e:
+                    connection.send("error", {"detail": e.errors(include_url=False, include_context=False)})
+                    continue
+                # La escritura va al threadpool: no bloquea al resto de sockets del event loop
+                try:
+                    await run_in_threadpool(_send_from_socket, user_id, message_data)
+                except Exception as e:
+                    logger.error("❌ Error al guardar mensaje de WebSocket: %s", e)
+                    connection.send("error", {"detail": "No se pudo enviar el mensaje"})
+            else:
+                connection.send("error", {"detail": "Tipo de evento no soportado"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        realtime.hub.disconnect(connection)
+
+
+# Orden del historial de mensajes (más recientes primero)
+MESSAGES_ORDER = [ChatMessage.created_at, ChatMessage.id]
+
+
+def messages_query(db: Session, user_id: int, receiver_id: Optional[int] = None):
+    """Mensajes del usuario (o solo los intercambiados con receiver_id), sin orden ni paginación."""
     query = db.query(ChatMessage).filter(
-        (ChatMessage.sender_id == current_user.id) | 
-        (ChatMessage.receiver_id == current_user.id)
+        (ChatMessage.sender_id == user_id) | 
+        (ChatMessage.receiver_id == user_id)
     )
     
     if receiver_id:
         query = query.filter(
-            ((ChatMessage.sender_id == current_user.id) & (ChatMessage.receiver_id == receiver_id)) |
-            ((ChatMessage.sender_id == receiver_id) & (ChatMessage.receiver_id == current_user.id))
+            ((ChatMessage.sender_id == user_id) & (ChatMessage.receiver_id == receiver_id)) |
+            ((ChatMessage.sender_id == receiver_id) & (ChatMessage.receiver_id == user_id))
         )
-    
-    messages = query.order_by(ChatMessage.created_at.desc()).offset(skip).limit(limit).all()
-    return messages
+    return query
+
+
+@router.get("/", response_model=List[ChatMessageResponse])
+async def get_messages(
+    response: Response,
+    receiver_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener mensajes del usuario (más recientes primero). Paginación por offset o cursor."""
+    return paginate(
+        messages_query(db, current_user.id, receiver_id), response, MESSAGES_ORDER,
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
 
@@ -2,12 +2,14 @@
 Router de empresas.
 Endpoints para gestión de empresas (multi-tenant).
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
 from app.core.dependencies import get_current_user, require_role
 from app.core.enums import Role
+from app.core.cache import cache, invalidate_company
+from app.core.pagination import paginate
 from app.models.company import Company
 from app.models.user import User
 from pydantic import BaseModel
@@ -59,39 +61,49 @@ async def create_company(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"🏢 Creando nueva empresa: Nombre={company_data.name}")
-    logger.info(f"👤 Usuario creador: ID={current_user.id}, Email={current_user.email}, Role={current_user.role}")
+    logger.info("🏢 Creando nueva empresa: Nombre=%s", company_data.name)
+    logger.info("👤 Usuario creador: ID=%s, Email=%s, Role=%s", current_user.id, current_user.email, current_user.role)
     
     new_company = Company(**company_data.dict())
     db.add(new_company)
     db.commit()
     db.refresh(new_company)
+    invalidate_company(new_company.id)  # Puede haber un "no encontrada" cacheado para este ID
     
-    logger.info(f"✅ Empresa creada exitosamente: ID={new_company.id}, Nombre={new_company.name}")
+    logger.info("✅ Empresa creada exitosamente: ID=%s, Nombre=%s", new_company.id, new_company.name)
     return new_company
 
 
 @router.get("/", response_model=List[CompanyResponse])
 async def get_companies(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(require_role([Role.ADMINISTRADOR])),
     db: Session = Depends(get_db)
 ):
     """
     Listar todas las empresas.
     Solo administradores del sistema pueden listar todas las empresas.
+    Paginación por offset (skip) o por cursor (cabecera X-Next-Cursor).
     """
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"📋 Listando empresas (skip={skip}, limit={limit})")
-    companies = db.query(Company).offset(skip).limit(limit).all()
-    logger.info(f"✅ {len(companies)} empresas encontradas")
+    logger.info("📋 Listando empresas (skip=%s, limit=%s, cursor=%s)", skip, limit, cursor)
+    companies = paginate(db.query(Company), response, [Company.id], skip=skip, limit=limit, cursor=cursor)
+    logger.info("✅ %s empresas encontradas", len(companies))
     
     return companies
 
 
+def _load_company(db: Session, company_id: int) -> Optional[dict]:
+    """Empresa serializada para la caché (None si no existe)."""
+    company = db.query(Company).filter(Company.id == company_id).first()
+    return CompanyResponse.model_validate(company).model_dump(mode="json") if company else None
+
+
 @router.get("/{company_id}", response_model=CompanyResponse)
 async def get_company(
     company_id: int,
@@ -102,17 +114,17 @@ async def get_company(
     import logging
     logger = logging.getLogger(__name__)
     
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await cache.aget_or_load(company_id, "company", company_id, lambda: _load_company(db, company_id))
     if not company:
-        logger.warning(f"❌ Empresa no encontrada: ID={company_id}")
+        logger.warning("❌ Empresa no encontrada: ID=%s", company_id)
         raise HTTPException(status_code=404, detail="Empresa no encontrada")
     
     # Verificar acceso - solo administradores pueden ver cualquier empresa
     if current_user.role != Role.ADMINISTRADOR.value and current_user.company_id != company_id:
-        logger.warning(f"❌ Acceso denegado a empresa {company_id} para usuario {current_user.id}")
+        logger.warning("❌ Acceso denegado a empresa %s para usuario %s", company_id, current_user.id)
         raise HTTPException(status_code=403, detail="Sin permisos")
     
-    logger.info(f"✅ Empresa obtenida: ID={company_id}, Nombre={company.name}")
+    logger.info("✅ Empresa obtenida: ID=%s, Nombre=%s", company_id, company["name"])
     return company
 
 
@@ -130,11 +142,11 @@ async def update_company(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"🔧 Actualizando empresa: ID={company_id}")
+    logger.info("🔧 Actualizando empresa: ID=%s", company_id)
     
     company = db.query(Company).filter(Company.id == company_id).first()
     if not company:
-        logger.warning(f"❌ Empresa no encontrada: ID={company_id}")
+        logger.warning("❌ Empresa no encontrada: ID=%s", company_id)
         raise HTTPException(status_code=404, detail="Empresa no encontrada")
     
     # Actualizar campos proporcionados
@@ -144,8 +156,10 @@ async def update_company(
     
     db.commit()
     db.refresh(company)
+    # Write-through: la caché queda con la versión recién guardada
+    cache.set(company_id, "company", company_id, CompanyResponse.model_validate(company).model_dump(mode="json"))
     
-    logger.info(f"✅ Empresa actualizada: ID={company_id}, Nombre={company.name}")
+    logger.info("✅ Empresa actualizada: ID=%s, Nombre=%s", company_id, company.name)
     return company
 
 
@@ -162,27 +176,28 @@ async def delete_company(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"🗑️ Eliminando empresa: ID={company_id}")
+    logger.info("🗑️ Eliminando empresa: ID=%s", company_id)
     
     company = db.query(Company).filter(Company.id == company_id).first()
     if not company:
-        logger.warning(f"❌ Empresa no encontrada: ID={company_id}")
+        logger.warning("❌ Empresa no encontrada: ID=%s", company_id)
         raise HTTPException(status_code=404, detail="Empresa no encontrada")
     
     # Verificar si hay usuarios asociados
     from app.models.user import User
     users_count = db.query(User).filter(User.company_id == company_id).count()
     if users_count > 0:
-        logger.warning(f"⚠️ Empresa tiene {users_count} usuarios asociados. Desactivando en lugar de eliminar.")
+        logger.warning("⚠️ Empresa tiene %s usuarios asociados. Desactivando en lugar de eliminar.", users_count)
         # Soft delete - desactivar en lugar de eliminar
         company.is_active = False
         db.commit()
-        logger.info(f"✅ Empresa desactivada: ID={company_id}")
+        logger.info("✅ Empresa desactivada: ID=%s", company_id)
     else:
         # Si no hay usuarios, eliminar físicamente
         db.delete(company)
         db.commit()
-        logger.info(f"✅ Empresa eliminada físicamente: ID={company_id}")
+        logger.info("✅ Empresa eliminada físicamente: ID=%s", company_id)
+    invalidate_company(company_id)
     
     return None
 
@@ -2,13 +2,23 @@
 Router de cursos.
 Endpoints para gestión de cursos, módulos y contenidos.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import or_
 from typing import List, Optional
 from app.core.database import get_db
-from app.core.dependencies import get_current_user, require_role
+from app.core.dependencies import (
+    get_current_user,
+    require_role,
+    require_module_access,
+    require_content_access,
+    CourseAccess,
+)
 from app.core.enums import Role
+from app.core.http_cache import not_modified
+from app.core.cache import cache, invalidate_course_catalog, invalidate_course_modules
+from app.core.pagination import paginate, paginate_items
+from app.core.serialization import list_response
 from app.models.course import Course, Module, ModuleContent, Enrollment
 from app.models.user import User
 from pydantic import BaseModel
@@ -16,6 +26,9 @@ from datetime import datetime
 
 router = APIRouter()
 
+# Filas del catálogo de cursos que se guardan en caché (primeras N por id)
+CATALOG_CACHE_ROWS = 500
+
 
 class CourseBase(BaseModel):
     """Esquema base de curso."""
@@ -60,7 +73,7 @@ async def create_course(
     instructor_id = course_data.instructor_id
     if not instructor_id:
         instructor_id = current_user.id
-        logger.info(f"Usando instructor_id automático: {instructor_id} (usuario actual)")
+        logger.info("Usando instructor_id automático: %s (usuario actual)", instructor_id)
     else:
         # Si especifica instructor_id, verificar que sea válido
         instructor = db.query(User).filter(User.id == instructor_id).first()
@@ -85,7 +98,7 @@ async def create_course(
     
     # Si el usuario no tiene company_id, intentar obtener o crear una empresa por defecto
     if company_id is None:
-        logger.warning(f"⚠️ Usuario sin company_id intentando crear curso: ID={current_user.id}, Role={current_user.role}")
+        logger.warning("⚠️ Usuario sin company_id intentando crear curso: ID=%s, Role=%s", current_user.id, current_user.role)
         
         from app.models.company import Company
         
@@ -95,7 +108,7 @@ async def create_course(
             default_company = db.query(Company).filter(Company.is_active == True).first()
             if default_company:
                 company_id = default_company.id
-                logger.info(f"✅ Usando empresa por defecto: ID={company_id}")
+                logger.info("✅ Usando empresa por defecto: ID=%s", company_id)
             else:
                 # Crear empresa por defecto para administradores y profesores
                 default_company = Company(
@@ -107,7 +120,7 @@ async def create_course(
                 db.commit()
                 db.refresh(default_company)
                 company_id = default_company.id
-                logger.info(f"✅ Creada empresa por defecto: ID={company_id}")
+                logger.info("✅ Creada empresa por defecto: ID=%s", company_id)
         else:
             # Para otros roles (company_admin), requerir company_id
             raise HTTPException(
@@ -121,16 +134,19 @@ async def create_course(
     db.add(new_course)
     db.commit()
     db.refresh(new_course)
+    invalidate_course_catalog(company_id)
     
-    logger.info(f"✅ Curso creado: ID={new_course.id}, Título={new_course.title}, Instructor={instructor_id}, Company={company_id}")
+    logger.info("✅ Curso creado: ID=%s, Título=%s, Instructor=%s, Company=%s", new_course.id, new_course.title, instructor_id, company_id)
     
     return new_course
 
 
 @router.get("/", response_model=List[CourseResponse])
 async def get_courses(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -139,144 +155,180 @@ async def get_courses(
     - Administradores: ven todos los cursos
     - Estudiantes sin company_id: ven todos los cursos activos (pueden inscribirse)
     - Otros roles: ven cursos de su empresa
+    Paginación por offset (skip) o por cursor (cabecera X-Next-Cursor).
     """
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"🔍 Listando cursos para usuario: ID={current_user.id}, Role={current_user.role}, Company_ID={current_user.company_id}")
+    logger.info("🔍 Listando cursos para usuario: ID=%s, Role=%s, Company_ID=%s", current_user.id, current_user.role, current_user.company_id)
+    
+    # Catálogos compartidos que se sirven desde la caché: todos los activos (None)
+    # o los de una empresa. El de profesores depende del usuario y no se cachea.
+    cacheable = True
+    catalog_company_id = None
     
     # Si es administrador del sistema, puede ver todos los cursos
     if current_user.role == Role.ADMINISTRADOR.value:
-        courses = db.query(Course).filter(
+        query = db.query(Course).filter(
             Course.is_active == True
-        ).offset(skip).limit(limit).all()
-        logger.info(f"✅ Administrador: retornando {len(courses)} cursos (todos)")
+        )
+        logger.info("✅ Administrador: listando cursos (todos)")
     elif current_user.role == Role.ESTUDIANTE.value:
         # Estudiantes pueden ver todos los cursos activos, incluso sin company_id
         # Esto les permite inscribirse en cualquier curso disponible
-        if current_user.company_id is None:
-            logger.info(f"📚 Estudiante sin company_id: mostrando todos los cursos activos")
-            courses = db.query(Course).filter(
-                Course.is_active == True
-            ).offset(skip).limit(limit).all()
-            logger.info(f"✅ Estudiante sin company_id: retornando {len(courses)} cursos (todos los activos)")
-        else:
-            # Si tiene company_id, mostrar cursos de su empresa y también todos los activos
-            # para dar más opciones
-            courses = db.query(Course).filter(
-                Course.is_active == True
-            ).offset(skip).limit(limit).all()
-            logger.info(f"✅ Estudiante con company_id {current_user.company_id}: retornando {len(courses)} cursos (todos los activos)")
+        # Si tiene company_id, también se muestran todos los activos para dar más opciones
+        query = db.query(Course).filter(
+            Course.is_active == True
+        )
+        logger.info("📚 Estudiante (company_id=%s): mostrando todos los cursos activos", current_user.company_id)
     elif current_user.role == Role.PROFESOR.value:
+        cacheable = False
         # Profesores pueden ver:
         # 1. Cursos donde son instructores (instructor_id)
         # 2. Cursos de su empresa (si tienen company_id)
         if current_user.company_id is None:
             # Si no tiene company_id, mostrar solo cursos donde es instructor
-            logger.info(f"👨‍🏫 Profesor sin company_id: mostrando cursos donde es instructor")
-            courses = db.query(Course).filter(
+            logger.info("👨‍🏫 Profesor sin company_id: mostrando cursos donde es instructor")
+            query = db.query(Course).filter(
                 Course.instructor_id == current_user.id,
                 Course.is_active == True
-            ).offset(skip).limit(limit).all()
-            logger.info(f"✅ Profesor sin company_id: retornando {len(courses)} cursos (donde es instructor)")
+            )
         else:
             # Si tiene company_id, mostrar cursos de su empresa Y cursos donde es instructor
-            logger.info(f"👨‍🏫 Profesor con company_id {current_user.company_id}: mostrando cursos de empresa e instructor")
-            courses = db.query(Course).filter(
+            logger.info("👨‍🏫 Profesor con company_id %s: mostrando cursos de empresa e instructor", current_user.company_id)
+            query = db.query(Course).filter(
                 or_(
                     Course.company_id == current_user.company_id,
                     Course.instructor_id == current_user.id
                 ),
                 Course.is_active == True
-            ).offset(skip).limit(limit).all()
-            logger.info(f"✅ Profesor con company_id: retornando {len(courses)} cursos")
+            )
     else:
         # Para otros roles (company_admin), filtrar por company_id
         if current_user.company_id is None:
-            logger.warning(f"⚠️ Usuario sin company_id: ID={current_user.id}, Role={current_user.role}")
+            logger.warning("⚠️ Usuario sin company_id: ID=%s, Role=%s", current_user.id, current_user.role)
             # Si no tiene company_id, retornar lista vacía
-            courses = []
-            logger.info(f"✅ Usuario sin company_id: retornando lista vacía")
-        else:
-            courses = db.query(Course).filter(
-                Course.company_id == current_user.company_id,
-                Course.is_active == True
-            ).offset(skip).limit(limit).all()
-            logger.info(f"✅ Usuario con company_id {current_user.company_id}: retornando {len(courses)} cursos")
+            logger.info("✅ Usuario sin company_id: retornando lista vacía")
+            return []
+        query = db.query(Course).filter(
+            Course.company_id == current_user.company_id,
+            Course.is_active == True
+        )
+        catalog_company_id = current_user.company_id
     
-    return courses
+    courses = None
+    if cacheable:
+        catalog = await cache.aget_or_load(
+            catalog_company_id, "catalog", "",
+            lambda: _load_catalog(query),
+        )
+        page = paginate_items(catalog["items"], response, Course.id, skip=skip, limit=limit, cursor=cursor)
+        # La página debe caber en las filas cacheadas (o el catálogo estar completo)
+        if catalog["complete"] or len(page) == limit:
+            courses = page
+    if courses is None:
+        courses = paginate(query, response, [Course.id], skip=skip, limit=limit, cursor=cursor)
+    logger.info("✅ Retornando %s cursos", len(courses))
+    
+    return list_response(courses, CourseResponse, response)
+
+
+def _load_catalog(query) -> dict:
+    """Primeras CATALOG_CACHE_ROWS filas del catálogo, serializadas para la caché."""
+    rows = query.order_by(Course.id.asc()).limit(CATALOG_CACHE_ROWS + 1).all()
+    return {
+        "items": [CourseResponse.model_validate(c).model_dump(mode="json") for c in rows[:CATALOG_CACHE_ROWS]],
+        "complete": len(rows) <= CATALOG_CACHE_ROWS,
+    }
+
+
+def _check_course_read_access(current_user: User, course: Course) -> None:
+    """
+    Verificar que el usuario puede leer un curso y su estructura (módulos).
+    Lanza 403 si no tiene acceso.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    course_id = course.id
+    
+    if current_user.role == Role.ADMINISTRADOR.value:
+        pass  # Administradores pueden ver cualquier curso
+    elif current_user.role == Role.ESTUDIANTE.value:
+        # Estudiantes pueden ver cualquier curso activo, incluso sin company_id
+        if not course.is_active:
+            logger.warning("❌ Estudiante intentando acceder a curso inactivo: ID=%s", course_id)
+            raise HTTPException(status_code=403, detail="El curso no está disponible")
+    elif current_user.role == Role.PROFESOR.value:
+        # Profesores pueden ver cursos donde son instructores
+        if course.instructor_id == current_user.id:
+            logger.info("✅ Profesor accediendo al curso %s (es instructor)", course_id)
+        elif current_user.company_id is None:
+            logger.warning("⚠️ Profesor sin company_id intentando acceder al curso %s (no es instructor)", course_id)
+            raise HTTPException(status_code=403, detail="No tiene permisos para acceder a este curso. No es el instructor y no tiene empresa asignada.")
+        elif course.company_id != current_user.company_id:
+            logger.warning("❌ Profesor sin acceso al curso: Curso company=%s, Usuario company=%s", course.company_id, current_user.company_id)
+            raise HTTPException(status_code=403, detail="No tiene permisos para acceder a este curso")
+        else:
+            logger.info("✅ Profesor accediendo al curso %s (misma empresa)", course_id)
+    else:
+        # Para otros roles (company_admin), verificar company_id
+        if current_user.company_id is None:
+            logger.warning("⚠️ Usuario sin company_id intentando acceder al curso %s", course_id)
+            raise HTTPException(
+                status_code=403,
+                detail="No tiene permisos para acceder a este curso. Su usuario no tiene una empresa asignada."
+            )
+        if course.company_id != current_user.company_id:
+            logger.warning("❌ Acceso denegado: Curso company=%s, Usuario company=%s", course.company_id, current_user.company_id)
+            raise HTTPException(status_code=403, detail="No tiene permisos para acceder a este curso")
+
+
+def enrollment_query(db: Session, user_id: int, course_id: int):
+    """Inscripción del usuario en el curso (a lo sumo una)."""
+    return db.query(Enrollment).filter(
+        Enrollment.user_id == user_id,
+        Enrollment.course_id == course_id
+    )
+
+
+def modules_query(db: Session, course_id: int):
+    """Módulos del curso ordenados por order."""
+    return db.query(Module).filter(Module.course_id == course_id).order_by(Module.order.asc())
+
+
+def contents_query(db: Session, module_id: int):
+    """Contenidos del módulo ordenados por order."""
+    return db.query(ModuleContent).filter(
+        ModuleContent.module_id == module_id
+    ).order_by(ModuleContent.order.asc())
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
 async def get_course(
     course_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtener curso por ID."""
+    """Obtener curso por ID. Soporta peticiones condicionales (ETag / If-None-Match)."""
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"🔍 Obteniendo curso: ID={course_id}, Usuario={current_user.id}, Company={current_user.company_id}")
+    logger.info("🔍 Obteniendo curso: ID=%s, Usuario=%s, Company=%s", course_id, current_user.id, current_user.company_id)
     
     course = db.query(Course).filter(Course.id == course_id).first()
     if not course:
-        logger.warning(f"❌ Curso no encontrado: ID={course_id}")
+        logger.warning("❌ Curso no encontrado: ID=%s", course_id)
         raise HTTPException(status_code=404, detail="Curso no encontrado")
     
-    # Si es administrador, puede ver cualquier curso
-    if current_user.role == Role.ADMINISTRADOR.value:
-        logger.info(f"✅ Administrador: acceso permitido al curso {course_id}")
-        return course
-    
-    # Estudiantes pueden ver cualquier curso activo, incluso sin company_id
-    if current_user.role == Role.ESTUDIANTE.value:
-        if not course.is_active:
-            logger.warning(f"❌ Estudiante intentando acceder a curso inactivo: ID={course_id}")
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="El curso no está disponible"
-            )
-        logger.info(f"✅ Estudiante accediendo al curso {course_id} (company_id={current_user.company_id})")
-        return course
-    
-    # Profesores pueden ver cursos donde son instructores
-    if current_user.role == Role.PROFESOR.value:
-        if course.instructor_id == current_user.id:
-            logger.info(f"✅ Profesor accediendo al curso {course_id} (es instructor)")
-            return course
-        # Si no es instructor, verificar company_id
-        if current_user.company_id is None:
-            logger.warning(f"⚠️ Profesor sin company_id intentando acceder al curso {course_id} (no es instructor)")
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tiene permisos para acceder a este curso. No es el instructor y no tiene empresa asignada."
-            )
-        if course.company_id == current_user.company_id:
-            logger.info(f"✅ Profesor accediendo al curso {course_id} (misma empresa)")
-            return course
-        logger.warning(f"❌ Profesor sin acceso: Curso company={course.company_id}, Usuario company={current_user.company_id}, Instructor={course.instructor_id}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tiene permisos para acceder a este curso"
-        )
-    
-    # Para otros roles (company_admin), verificar company_id
-    if current_user.company_id is None:
-        logger.warning(f"⚠️ Usuario sin company_id intentando acceder al curso {course_id}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tiene permisos para acceder a este curso. Su usuario no tiene una empresa asignada."
-        )
+    _check_course_read_access(current_user, course)
     
-    if course.company_id != current_user.company_id:
-        logger.warning(f"❌ Acceso denegado: Curso company={course.company_id}, Usuario company={current_user.company_id}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tiene permisos para acceder a este curso"
-        )
+    cached = not_modified(request, response, [course])
+    if cached:
+        return cached
     
-    logger.info(f"✅ Acceso permitido al curso {course_id}")
+    logger.info("✅ Acceso permitido al curso %s", course_id)
     return course
 
 
@@ -293,25 +345,22 @@ async def enroll_in_course(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"📝 Usuario {current_user.id} (Role={current_user.role}) intentando inscribirse en curso {course_id}")
+    logger.info("📝 Usuario %s (Role=%s) intentando inscribirse en curso %s", current_user.id, current_user.role, course_id)
     
     course = db.query(Course).filter(Course.id == course_id).first()
     if not course:
-        logger.warning(f"❌ Curso no encontrado: ID={course_id}")
+        logger.warning("❌ Curso no encontrado: ID=%s", course_id)
         raise HTTPException(status_code=404, detail="Curso no encontrado")
     
     if not course.is_active:
-        logger.warning(f"❌ Intento de inscripción en curso inactivo: ID={course_id}")
+        logger.warning("❌ Intento de inscripción en curso inactivo: ID=%s", course_id)
         raise HTTPException(status_code=400, detail="El curso no está disponible")
     
     # Verificar si ya está inscrito
-    existing = db.query(Enrollment).filter(
-        Enrollment.user_id == current_user.id,
-        Enrollment.course_id == course_id
-    ).first()
+    existing = enrollment_query(db, current_user.id, course_id).first()
     
     if existing:
-        logger.warning(f"⚠️ Usuario {current_user.id} ya está inscrito en curso {course_id}")
+        logger.warning("⚠️ Usuario %s ya está inscrito en curso %s", current_user.id, course_id)
         raise HTTPException(status_code=400, detail="Ya está inscrito en este curso")
     
     # Permitir inscripción incluso si el estudiante no tiene company_id
@@ -320,7 +369,7 @@ async def enroll_in_course(
     db.add(enrollment)
     db.commit()
     
-    logger.info(f"✅ Usuario {current_user.id} inscrito exitosamente en curso {course_id}")
+    logger.info("✅ Usuario %s inscrito exitosamente en curso %s", current_user.id, course_id)
     
     return {"message": "Inscripción exitosa"}
 
@@ -362,6 +411,8 @@ class ModuleResponse(ModuleBase):
 @router.get("/{course_id}/modules", response_model=List[ModuleResponse])
 async def get_course_modules(
     course_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -371,43 +422,31 @@ async def get_course_modules(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"📚 Obteniendo módulos del curso {course_id}")
+    logger.info("📚 Obteniendo módulos del curso %s", course_id)
     
     # Verificar que el curso existe y el usuario tiene acceso
     course = db.query(Course).filter(Course.id == course_id).first()
     if not course:
-        logger.warning(f"❌ Curso no encontrado: ID={course_id}")
+        logger.warning("❌ Curso no encontrado: ID=%s", course_id)
         raise HTTPException(status_code=404, detail="Curso no encontrado")
     
     # Verificar permisos de acceso al curso
-    if current_user.role == Role.ADMINISTRADOR.value:
-        pass  # Administradores pueden ver cualquier curso
-    elif current_user.role == Role.ESTUDIANTE.value:
-        if not course.is_active:
-            raise HTTPException(status_code=403, detail="El curso no está disponible")
-    elif current_user.role == Role.PROFESOR.value:
-        # Profesores pueden ver cursos donde son instructores
-        if course.instructor_id == current_user.id:
-            logger.info(f"✅ Profesor accediendo a módulos del curso {course_id} (es instructor)")
-        elif current_user.company_id is None:
-            logger.warning(f"⚠️ Profesor sin company_id intentando acceder a módulos del curso {course_id} (no es instructor)")
-            raise HTTPException(status_code=403, detail="No tiene permisos para acceder a este curso. No es el instructor y no tiene empresa asignada.")
-        elif course.company_id != current_user.company_id:
-            logger.warning(f"❌ Profesor sin acceso a módulos: Curso company={course.company_id}, Usuario company={current_user.company_id}")
-            raise HTTPException(status_code=403, detail="No tiene permisos para acceder a este curso")
-        else:
-            logger.info(f"✅ Profesor accediendo a módulos del curso {course_id} (misma empresa)")
-    else:
-        # Para otros roles (company_admin), verificar company_id
-        if current_user.company_id is None or course.company_id != current_user.company_id:
-            raise HTTPException(status_code=403, detail="No tiene permisos para acceder a este curso")
+    _check_course_read_access(current_user, course)
     
-    # Obtener módulos ordenados por order
-    modules = db.query(Module).filter(
-        Module.course_id == course_id
-    ).order_by(Module.order.asc()).all()
+    # Obtener módulos ordenados por order (desde la caché de la empresa del curso)
+    modules = await cache.aget_or_load(
+        course.company_id, "modules", course_id,
+        lambda: [
+            ModuleResponse.model_validate(m).model_dump(mode="json")
+            for m in modules_query(db, course_id).all()
+        ],
+    )
     
-    logger.info(f"✅ Retornando {len(modules)} módulos del curso {course_id}")
+    cached = not_modified(request, response, [course, *modules])
+    if cached:
+        return cached
+    
+    logger.info("✅ Retornando %s módulos del curso %s", len(modules), course_id)
     
     return modules
 
@@ -426,12 +465,12 @@ async def create_module(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"➕ Creando módulo en curso {course_id}: {module_data.title}")
+    logger.info("➕ Creando módulo en curso %s: %s", course_id, module_data.title)
     
     # Verificar que el curso existe
     course = db.query(Course).filter(Course.id == course_id).first()
     if not course:
-        logger.warning(f"❌ Curso no encontrado: ID={course_id}")
+        logger.warning("❌ Curso no encontrado: ID=%s", course_id)
         raise HTTPException(status_code=404, detail="Curso no encontrado")
     
     # Verificar permisos: solo el instructor o administradores pueden crear módulos
@@ -439,7 +478,7 @@ async def create_module(
         if course.instructor_id != current_user.id:
             # Verificar también si es company_admin de la misma empresa
             if current_user.role != Role.COMPANY_ADMIN.value or course.company_id != current_user.company_id:
-                logger.warning(f"❌ Usuario {current_user.id} no tiene permisos para crear módulos en curso {course_id}")
+                logger.warning("❌ Usuario %s no tiene permisos para crear módulos en curso %s", current_user.id, course_id)
                 raise HTTPException(
                     status_code=403,
                     detail="Solo el instructor del curso o administradores pueden crear módulos"
@@ -453,8 +492,9 @@ async def create_module(
     db.add(new_module)
     db.commit()
     db.refresh(new_module)
+    invalidate_course_modules(course.company_id, course_id)
     
-    logger.info(f"✅ Módulo creado: ID={new_module.id}, Título={new_module.title}")
+    logger.info("✅ Módulo creado: ID=%s, Título=%s", new_module.id, new_module.title)
     
     return new_module
 
@@ -463,6 +503,8 @@ async def create_module(
 async def get_module(
     course_id: int,
     module_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -478,7 +520,7 @@ async def get_module(
     ).first()
     
     if not module:
-        logger.warning(f"❌ Módulo no encontrado: ID={module_id} en curso {course_id}")
+        logger.warning("❌ Módulo no encontrado: ID=%s en curso %s", module_id, course_id)
         raise HTTPException(status_code=404, detail="Módulo no encontrado")
     
     # Verificar acceso al curso
@@ -495,6 +537,10 @@ async def get_module(
         if current_user.company_id is None or course.company_id != current_user.company_id:
             raise HTTPException(status_code=403, detail="No tiene permisos")
     
+    cached = not_modified(request, response, [module])
+    if cached:
+        return cached
+    
     return module
 
 
@@ -513,7 +559,7 @@ async def update_module(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"✏️ Actualizando módulo {module_id} del curso {course_id}")
+    logger.info("✏️ Actualizando módulo %s del curso %s", module_id, course_id)
     
     module = db.query(Module).filter(
         Module.id == module_id,
@@ -521,7 +567,7 @@ async def update_module(
     ).first()
     
     if not module:
-        logger.warning(f"❌ Módulo no encontrado: ID={module_id}")
+        logger.warning("❌ Módulo no encontrado: ID=%s", module_id)
         raise HTTPException(status_code=404, detail="Módulo no encontrado")
     
     # Verificar permisos
@@ -541,8 +587,9 @@ async def update_module(
     
     db.commit()
     db.refresh(module)
+    invalidate_course_modules(course.company_id, course_id)
     
-    logger.info(f"✅ Módulo actualizado: ID={module_id}")
+    logger.info("✅ Módulo actualizado: ID=%s", module_id)
     
     return module
 
@@ -561,7 +608,7 @@ async def delete_module(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"🗑️ Eliminando módulo {module_id} del curso {course_id}")
+    logger.info("🗑️ Eliminando módulo %s del curso %s", module_id, course_id)
     
     module = db.query(Module).filter(
         Module.id == module_id,
@@ -569,7 +616,7 @@ async def delete_module(
     ).first()
     
     if not module:
-        logger.warning(f"❌ Módulo no encontrado: ID={module_id}")
+        logger.warning("❌ Módulo no encontrado: ID=%s", module_id)
         raise HTTPException(status_code=404, detail="Módulo no encontrado")
     
     # Verificar permisos
@@ -585,8 +632,9 @@ async def delete_module(
     # Eliminar módulo (cascade eliminará los contenidos)
     db.delete(module)
     db.commit()
+    invalidate_course_modules(course.company_id, course_id)
     
-    logger.info(f"✅ Módulo eliminado: ID={module_id}")
+    logger.info("✅ Módulo eliminado: ID=%s", module_id)
     
     return None
 
@@ -627,7 +675,9 @@ class ModuleContentResponse(ModuleContentBase):
 @router.get("/modules/{module_id}/contents", response_model=List[ModuleContentResponse])
 async def get_module_contents(
     module_id: int,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    access: CourseAccess = Depends(require_module_access()),
     db: Session = Depends(get_db)
 ):
     """
@@ -636,34 +686,16 @@ async def get_module_contents(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"📄 Obteniendo contenido del módulo {module_id}")
-    
-    # Verificar que el módulo existe
-    module = db.query(Module).filter(Module.id == module_id).first()
-    if not module:
-        logger.warning(f"❌ Módulo no encontrado: ID={module_id}")
-        raise HTTPException(status_code=404, detail="Módulo no encontrado")
-    
-    # Verificar acceso al curso
-    course = db.query(Course).filter(Course.id == module.course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Curso no encontrado")
-    
-    if current_user.role == Role.ADMINISTRADOR.value:
-        pass
-    elif current_user.role == Role.ESTUDIANTE.value:
-        if not course.is_active or not module.is_active:
-            raise HTTPException(status_code=403, detail="El contenido no está disponible")
-    else:
-        if current_user.company_id is None or course.company_id != current_user.company_id:
-            raise HTTPException(status_code=403, detail="No tiene permisos")
+    logger.info("📄 Obteniendo contenido del módulo %s", module_id)
     
     # Obtener contenidos ordenados por order
-    contents = db.query(ModuleContent).filter(
-        ModuleContent.module_id == module_id
-    ).order_by(ModuleContent.order.asc()).all()
+    contents = contents_query(db, module_id).all()
     
-    logger.info(f"✅ Retornando {len(contents)} contenidos del módulo {module_id}")
+    cached = not_modified(request, response, [access.module, *contents])
+    if cached:
+        return cached
+    
+    logger.info("✅ Retornando %s contenidos del módulo %s", len(contents), module_id)
     
     return contents
 
@@ -673,6 +705,7 @@ async def create_module_content(
     module_id: int,
     content_data: ModuleContentCreate,
     current_user: User = Depends(require_role([Role.PROFESOR, Role.ADMINISTRADOR, Role.COMPANY_ADMIN])),
+    access: CourseAccess = Depends(require_module_access(write=True, denied_detail="No tiene permisos para crear contenido")),
     db: Session = Depends(get_db)
 ):
     """
@@ -682,23 +715,7 @@ async def create_module_content(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"➕ Creando contenido en módulo {module_id}: tipo={content_data.content_type}")
-    
-    # Verificar que el módulo existe
-    module = db.query(Module).filter(Module.id == module_id).first()
-    if not module:
-        logger.warning(f"❌ Módulo no encontrado: ID={module_id}")
-        raise HTTPException(status_code=404, detail="Módulo no encontrado")
-    
-    # Verificar permisos
-    course = db.query(Course).filter(Course.id == module.course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Curso no encontrado")
-    
-    if current_user.role != Role.ADMINISTRADOR.value:
-        if course.instructor_id != current_user.id:
-            if current_user.role != Role.COMPANY_ADMIN.value or course.company_id != current_user.company_id:
-                raise HTTPException(status_code=403, detail="No tiene permisos para crear contenido")
+    logger.info("➕ Creando contenido en módulo %s: tipo=%s", module_id, content_data.content_type)
     
     # Validar content_type
     valid_types = ['text', 'video', 'document', 'link']
@@ -717,7 +734,7 @@ async def create_module_content(
     db.commit()
     db.refresh(new_content)
     
-    logger.info(f"✅ Contenido creado: ID={new_content.id}, Tipo={new_content.content_type}")
+    logger.info("✅ Contenido creado: ID=%s, Tipo=%s", new_content.id, new_content.content_type)
     
     return new_content
 
@@ -726,43 +743,17 @@ async def create_module_content(
 async def get_module_content(
     module_id: int,
     content_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    access: CourseAccess = Depends(require_content_access())
 ):
     """
     Obtener un contenido específico.
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    content = db.query(ModuleContent).filter(
-        ModuleContent.id == content_id,
-        ModuleContent.module_id == module_id
-    ).first()
-    
-    if not content:
-        logger.warning(f"❌ Contenido no encontrado: ID={content_id}")
-        raise HTTPException(status_code=404, detail="Contenido no encontrado")
-    
-    # Verificar acceso
-    module = db.query(Module).filter(Module.id == module_id).first()
-    if not module:
-        raise HTTPException(status_code=404, detail="Módulo no encontrado")
-    
-    course = db.query(Course).filter(Course.id == module.course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Curso no encontrado")
-    
-    if current_user.role == Role.ADMINISTRADOR.value:
-        pass
-    elif current_user.role == Role.ESTUDIANTE.value:
-        if not course.is_active or not module.is_active:
-            raise HTTPException(status_code=403, detail="El contenido no está disponible")
-    else:
-        if current_user.company_id is None or course.company_id != current_user.company_id:
-            raise HTTPException(status_code=403, detail="No tiene permisos")
-    
-    return content
+    cached = not_modified(request, response, [access.content])
+    if cached:
+        return cached
+    return access.content
 
 
 @router.put("/modules/{module_id}/contents/{content_id}", response_model=ModuleContentResponse)
@@ -771,6 +762,7 @@ async def update_module_content(
     content_id: int,
     content_update: ModuleContentUpdate,
     current_user: User = Depends(require_role([Role.PROFESOR, Role.ADMINISTRADOR, Role.COMPANY_ADMIN])),
+    access: CourseAccess = Depends(require_content_access(write=True, denied_detail="No tiene permisos para actualizar este contenido")),
     db: Session = Depends(get_db)
 ):
     """
@@ -779,30 +771,9 @@ async def update_module_content(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"✏️ Actualizando contenido {content_id} del módulo {module_id}")
-    
-    content = db.query(ModuleContent).filter(
-        ModuleContent.id == content_id,
-        ModuleContent.module_id == module_id
-    ).first()
-    
-    if not content:
-        logger.warning(f"❌ Contenido no encontrado: ID={content_id}")
-        raise HTTPException(status_code=404, detail="Contenido no encontrado")
-    
-    # Verificar permisos
-    module = db.query(Module).filter(Module.id == module_id).first()
-    if not module:
-        raise HTTPException(status_code=404, detail="Módulo no encontrado")
+    logger.info("✏️ Actualizando contenido %s del módulo %s", content_id, module_id)
     
-    course = db.query(Course).filter(Course.id == module.course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Curso no encontrado")
-    
-    if current_user.role != Role.ADMINISTRADOR.value:
-        if course.instructor_id != current_user.id:
-            if current_user.role != Role.COMPANY_ADMIN.value or course.company_id != current_user.company_id:
-                raise HTTPException(status_code=403, detail="No tiene permisos para actualizar este contenido")
+    content = access.content
     
     # Validar content_type si se actualiza
     if content_update.content_type:
@@ -821,7 +792,7 @@ async def update_module_content(
     db.commit()
     db.refresh(content)
     
-    logger.info(f"✅ Contenido actualizado: ID={content_id}")
+    logger.info("✅ Contenido actualizado: ID=%s", content_id)
     
     return content
 
@@ -831,6 +802,7 @@ async def delete_module_content(
     module_id: int,
     content_id: int,
     current_user: User = Depends(require_role([Role.PROFESOR, Role.ADMINISTRADOR, Role.COMPANY_ADMIN])),
+    access: CourseAccess = Depends(require_content_access(write=True, denied_detail="No tiene permisos para eliminar este contenido")),
     db: Session = Depends(get_db)
 ):
     """
@@ -839,38 +811,96 @@ async def delete_module_content(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"🗑️ Eliminando contenido {content_id} del módulo {module_id}")
+    logger.info("🗑️ Eliminando contenido %s del módulo %s", content_id, module_id)
     
-    content = db.query(ModuleContent).filter(
-        ModuleContent.id == content_id,
-        ModuleContent.module_id == module_id
-    ).first()
+    # Eliminar contenido
+    db.delete(access.content)
+    db.commit()
     
-    if not content:
-        logger.warning(f"❌ Contenido no encontrado: ID={content_id}")
-        raise HTTPException(status_code=404, detail="Contenido no encontrado")
+    logger.info("✅ Contenido eliminado: ID=%s", content_id)
     
-    # Verificar permisos
-    module = db.query(Module).filter(Module.id == module_id).first()
-    if not module:
-        raise HTTPException(status_code=404, detail="Módulo no encontrado")
+    return None
+
+
+# ==================== ESTRUCTURA DEL CURSO ====================
+
+class QuizSummary(BaseModel):
+    """Resumen de evaluación incluido en la estructura del curso."""
+    id: int
+    title: str
+    passing_score: Optional[float] = None
+    total_questions: Optional[int] = None
+    is_active: bool
     
-    course = db.query(Course).filter(Course.id == module.course_id).first()
+    class Config:
+        from_attributes = True
+
+
+class ModuleOutline(ModuleResponse):
+    """Módulo con sus contenidos y evaluaciones."""
+    contents: List[ModuleContentResponse] = []
+    quizzes: List[QuizSummary] = []
+
+
+class CourseOutlineResponse(CourseResponse):
+    """Curso completo: módulos ordenados con contenidos y resumen de evaluaciones."""
+    modules: List[ModuleOutline] = []
+
+
+@router.get("/{course_id}/outline", response_model=CourseOutlineResponse)
+async def get_course_outline(
+    course_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener la estructura completa de un curso en una sola petición.
+    Módulos, contenidos y evaluaciones se cargan con selectinload: el número de
+    consultas es constante (curso + módulos + contenidos + evaluaciones),
+    independiente de la cantidad de módulos.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    logger.info("🗂️ Obteniendo estructura del curso %s", course_id)
+    
+    course = db.query(Course).options(
+        selectinload(Course.modules).selectinload(Module.contents),
+        selectinload(Course.modules).selectinload(Module.quizzes),
+    ).filter(Course.id == course_id).first()
     if not course:
+        logger.warning("❌ Curso no encontrado: ID=%s", course_id)
         raise HTTPException(status_code=404, detail="Curso no encontrado")
     
-    if current_user.role != Role.ADMINISTRADOR.value:
-        if course.instructor_id != current_user.id:
-            if current_user.role != Role.COMPANY_ADMIN.value or course.company_id != current_user.company_id:
-                raise HTTPException(status_code=403, detail="No tiene permisos para eliminar este contenido")
+    _check_course_read_access(current_user, course)
     
-    # Eliminar contenido
-    db.delete(content)
-    db.commit()
+    # Los estudiantes reciben una vista filtrada: el rol forma parte del ETag
+    rows = [course]
+    for module in course.modules:
+        rows += [module, *module.contents, *module.quizzes]
+    cached = not_modified(request, response, rows, variant=current_user.role)
+    if cached:
+        return cached
     
-    logger.info(f"✅ Contenido eliminado: ID={content_id}")
+    outline = CourseOutlineResponse.model_validate(course)
     
-    return None
+    # Los estudiantes solo ven módulos y evaluaciones activos
+    if current_user.role == Role.ESTUDIANTE.value:
+        outline.modules = [m for m in outline.modules if m.is_active]
+        for module in outline.modules:
+            module.quizzes = [q for q in module.quizzes if q.is_active]
+    
+    # Mismo orden que get_course_modules / get_module_contents
+    outline.modules.sort(key=lambda m: (m.order, m.id))
+    for module in outline.modules:
+        module.contents.sort(key=lambda c: (c.order, c.id))
+        module.quizzes.sort(key=lambda q: q.id)
+    
+    logger.info("✅ Retornando estructura del curso %s: %s módulos", course_id, len(outline.modules))
+    
+    return outline
 
 
 @router.get("/my-courses", response_model=List[CourseResponse])
@@ -884,7 +914,7 @@ async def get_my_courses(
     import logging
     logger = logging.getLogger(__name__)
     
-    logger.info(f"📚 Obteniendo cursos inscritos para usuario: ID={current_user.id}, Role={current_user.role}")
+    logger.info("📚 Obteniendo cursos inscritos para usuario: ID=%s, Role=%s", current_user.id, current_user.role)
     
     # Obtener los enrollments del usuario
     enrollments = db.query(Enrollment).filter(
@@ -895,7 +925,7 @@ async def get_my_courses(
     course_ids = [enrollment.course_id for enrollment in enrollments]
     
     if not course_ids:
-        logger.info(f"✅ Usuario {current_user.id} no tiene cursos inscritos")
+        logger.info("✅ Usuario %s no tiene cursos inscritos", current_user.id)
         return []
     
     # Obtener los cursos
@@ -904,7 +934,7 @@ async def get_my_courses(
         Course.is_active == True
     ).all()
     
-    logger.info(f"✅ Usuario {current_user.id} tiene {len(courses)} cursos inscritos")
+    logger.info("✅ Usuario %s tiene %s cursos inscritos", current_user.id, len(courses))
     
     return courses
 
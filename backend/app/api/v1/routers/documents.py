@@ -2,11 +2,12 @@
 Router de documentos.
 Endpoints para carga, procesamiento y gestión de documentos.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.pagination import paginate
 from app.models.document import Document
 from app.models.user import User
 from app.core.enums import DocumentType
@@ -84,19 +85,25 @@ async def upload_document(
     return document
 
 
+def documents_query(db: Session, company_id: Optional[int]):
+    """Documentos de la empresa, sin orden ni paginación (se pagina por Document.id)."""
+    return db.query(Document).filter(Document.company_id == company_id)
+
+
 @router.get("/", response_model=List[DocumentResponse])
 async def get_documents(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Listar documentos de la empresa."""
-    documents = db.query(Document).filter(
-        Document.company_id == current_user.company_id
-    ).offset(skip).limit(limit).all()
-    
-    return documents
+    """Listar documentos de la empresa. Paginación por offset o cursor."""
+    return paginate(
+        documents_query(db, current_user.company_id), response, [Document.id],
+        skip=skip, limit=limit, cursor=cursor
+    )
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.serialization import list_response
 from app.models.event import Event
 from app.models.user import User
 from app.core.enums import EventType
@@ -61,6 +62,22 @@ async def create_event(
     return new_event
 
 
+def events_query(
+    db: Session,
+    company_id: Optional[int],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """Eventos de la empresa en el rango dado, ordenados por inicio."""
+    query = db.query(Event).filter(Event.company_id == company_id)
+    
+    if start_date:
+        query = query.filter(Event.start_time >= start_date)
+    if end_date:
+        query = query.filter(Event.end_time <= end_date)
+    return query.order_by(Event.start_time)
+
+
 @router.get("/", response_model=List[EventResponse])
 async def get_events(
     start_date: Optional[datetime] = None,
@@ -69,13 +86,6 @@ async def get_events(
     db: Session = Depends(get_db)
 ):
     """Obtener eventos del calendario."""
-    query = db.query(Event).filter(Event.company_id == current_user.company_id)
-    
-    if start_date:
-        query = query.filter(Event.start_time >= start_date)
-    if end_date:
-        query = query.filter(Event.end_time <= end_date)
-    
-    events = query.order_by(Event.start_time).all()
-    return events
+    events = events_query(db, current_user.company_id, start_date, end_date).all()
+    return list_response(events, EventResponse)
 
@@ -2,11 +2,14 @@
 Router de notificaciones.
 Endpoints para gestión de notificaciones del usuario.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.pagination import paginate
+from app.core.serialization import list_response
 from app.models.notification import Notification
 from app.models.user import User
 from pydantic import BaseModel
@@ -14,6 +17,8 @@ from datetime import datetime
 
 router = APIRouter()
 
+MAX_READ_IDS = 1000  # Ids por petición de lectura masiva
+
 
 class NotificationResponse(BaseModel):
     """Esquema de respuesta de notificación."""
@@ -29,22 +34,83 @@ class NotificationResponse(BaseModel):
         from_attributes = True
 
 
+class NotificationReadRequest(BaseModel):
+    """Notificaciones a marcar como leídas (filtros combinables; sin filtros: todas)."""
+    notification_ids: Optional[List[int]] = None
+    until: Optional[datetime] = None  # Solo las creadas hasta este instante (inclusive)
+
+
+class NotificationReadResponse(BaseModel):
+    """Resultado de la lectura masiva."""
+    updated: int
+    unread_count: int
+
+
+# Orden del listado (más recientes primero); lo comparten scripts/explain_queries.py
+NOTIFICATIONS_ORDER = [Notification.created_at, Notification.id]
+
+
+def notifications_query(db: Session, user_id: int, unread_only: bool = False):
+    """Notificaciones del usuario, sin orden ni paginación."""
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(Notification.is_read == False)
+    return query
+
+
 @router.get("/", response_model=List[NotificationResponse])
 async def get_notifications(
+    response: Response,
     unread_only: bool = False,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Obtener notificaciones del usuario (más recientes primero). Paginación por offset o cursor."""
+    notifications = paginate(
+        notifications_query(db, current_user.id, unread_only), response, NOTIFICATIONS_ORDER,
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+    return list_response(notifications, NotificationResponse, response)
+
+
+@router.put("/read", response_model=NotificationReadResponse)
+async def mark_many_as_read(
+    read_data: NotificationReadRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtener notificaciones del usuario."""
-    query = db.query(Notification).filter(Notification.user_id == current_user.id)
+    """
+    Marcar como leídas, en una sola sentencia UPDATE, una lista de
+    notificaciones y/o todas hasta un instante (until: p.ej. created_at de la
+    más reciente mostrada). Retorna cuántas se marcaron y las no leídas restantes.
+    """
+    if read_data.notification_ids is not None and len(read_data.notification_ids) > MAX_READ_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {MAX_READ_IDS} notificaciones por petición"
+        )
     
-    if unread_only:
-        query = query.filter(Notification.is_read == False)
+    query = db.query(Notification).filter(
+        Notification.user_id == current_user.id,
+        Notification.is_read == False
+    )
+    if read_data.notification_ids is not None:
+        query = query.filter(Notification.id.in_(read_data.notification_ids))
+    if read_data.until is not None:
+        query = query.filter(Notification.created_at <= read_data.until)
+    updated = query.update({Notification.is_read: True}, synchronize_session=False)
+    
+    # Conteo sobre el índice parcial de no leídas
+    unread_count = db.query(func.count(Notification.id)).filter(
+        Notification.user_id == current_user.id,
+        Notification.is_read == False
+    ).scalar()
+    db.commit()
     
-    notifications = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
-    return notifications
+    return {"updated": updated, "unread_count": unread_count}
 
 
 @router.put("/{notification_id}/read", status_code=status.HTTP_200_OK)
@@ -2,19 +2,26 @@
 Router de evaluaciones y quizzes.
 Endpoints para gestión de evaluaciones, preguntas e intentos.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple
 from app.core.database import get_db
 from app.core.dependencies import get_current_user, require_role
+from app.core.cache import cache
 from app.core.enums import Role
-from app.models.quiz import Quiz, Question, Attempt, Answer
-from app.models.user import User
+from app.models.course import Course, Module
+from app.models.quiz import Answer, Attempt, Question, QuestionItemStats, Quiz, QuizStats
+from app.models.user import User, Profile
+from app.services.grading import aget_answer_key, answer_matches, grade, similarity_candidates, store_attempt
+from app.services import adaptive, autosave, question_pool, quiz_stats
+from app.services.similarity import answer_similarities, enabled as similarity_enabled
 from pydantic import BaseModel
-from datetime import datetime
 
 router = APIRouter()
 
+SUBMIT_RETRIES = 2  # Veces que una entrega recalcula las similitudes sin bloqueo si el borrador cambió
+
 
 class QuizResponse(BaseModel):
     """Esquema de respuesta de quiz."""
@@ -34,6 +41,136 @@ class AttemptCreate(BaseModel):
     answers: Dict[int, str]  # question_id: answer_text
 
 
+class AttemptSessionStart(BaseModel):
+    """Esquema para iniciar (o reanudar) un intento con autoguardado."""
+    quiz_id: int
+
+
+class AttemptAutosave(BaseModel):
+    """Respuestas parciales: solo las preguntas que cambiaron."""
+    answers: Dict[int, str]  # question_id: answer_text
+
+
+class AttemptSubmit(BaseModel):
+    """Entrega de un intento en curso; se combinan con lo autoguardado."""
+    answers: Dict[int, str] = {}
+
+
+class ServedQuestion(BaseModel):
+    """Pregunta servida al estudiante (sin la respuesta correcta)."""
+    id: int
+    question_text: str
+    question_type: Optional[str] = None
+    options: Optional[Any] = None
+    points: Optional[float] = None
+
+
+class AttemptSessionResponse(BaseModel):
+    """Intento en curso: preguntas servidas (en orden) y borrador de respuestas."""
+    attempt_id: int
+    quiz_id: int
+    questions: List[ServedQuestion] = []
+    answers: Dict[int, str]
+    started_at: Optional[datetime] = None
+    draft_saved_at: Optional[datetime] = None
+
+
+class AdaptiveStart(BaseModel):
+    """Esquema para iniciar un intento adaptativo."""
+    quiz_id: int
+
+
+class AdaptiveAnswer(BaseModel):
+    """Respuesta a la pregunta pendiente de un intento adaptativo."""
+    question_id: int
+    answer: str
+
+
+class AdaptiveStep(BaseModel):
+    """Estado de un intento adaptativo tras iniciar o responder."""
+    attempt_id: int
+    question: Optional[ServedQuestion] = None  # None: la evaluación terminó (llamar a finish)
+    answered: int
+    max_questions: int
+    theta: float
+    theta_se: float
+    is_complete: bool
+
+
+class HistogramBucket(BaseModel):
+    """Tramo del histograma de puntajes [from_score, to_score)."""
+    from_score: float
+    to_score: float
+    count: int
+
+
+class LeaderboardEntry(BaseModel):
+    """Mejor intento de un usuario en el ranking."""
+    user_id: int
+    attempt_id: int
+    score: float
+    name: Optional[str] = None
+
+
+class QuizLeaderboardResponse(BaseModel):
+    """Estadísticas agregadas y ranking de un quiz."""
+    quiz_id: int
+    attempt_count: int
+    pass_count: int
+    pass_rate: Optional[float] = None
+    mean_score: Optional[float] = None
+    stddev_score: Optional[float] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    histogram: List[HistogramBucket]
+    top_scores: List[LeaderboardEntry]
+
+
+class DistractorFrequency(BaseModel):
+    """Frecuencia con que se eligió una opción de la pregunta."""
+    option: str
+    count: int
+    proportion: float
+    is_correct: bool
+
+
+class QuestionItemAnalysis(BaseModel):
+    """Análisis de ítem de una pregunta (dificultad, discriminación, distractores)."""
+    question_id: int
+    question_text: str
+    order: Optional[int] = None
+    response_count: int = 0
+    difficulty: Optional[float] = None
+    discrimination: Optional[float] = None
+    distractors: List[DistractorFrequency] = []
+    computed_at: Optional[datetime] = None
+
+
+class QuizItemAnalysisResponse(BaseModel):
+    """Análisis de ítems de todas las preguntas de un quiz."""
+    quiz_id: int
+    computed_at: Optional[datetime] = None
+    questions: List[QuestionItemAnalysis]
+
+
+def _check_quiz_access(current_user: User, company_id: int) -> None:
+    """Solo el administrador global o usuarios de la empresa del curso ven las estadísticas."""
+    if current_user.role != Role.ADMINISTRADOR.value and current_user.company_id != company_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tiene acceso a las estadísticas de este quiz"
+        )
+
+
+def _load_quiz(db: Session, module_id: int):
+    """Metadatos del quiz activo de un módulo, serializados para la caché."""
+    quiz = db.query(Quiz).filter(
+        Quiz.module_id == module_id,
+        Quiz.is_active == True
+    ).first()
+    return QuizResponse.model_validate(quiz).model_dump(mode="json") if quiz else None
+
+
 @router.get("/module/{module_id}", response_model=QuizResponse)
 async def get_quiz_by_module(
     module_id: int,
@@ -41,10 +178,8 @@ async def get_quiz_by_module(
     db: Session = Depends(get_db)
 ):
     """Obtener quiz de un módulo."""
-    quiz = db.query(Quiz).filter(
-        Quiz.module_id == module_id,
-        Quiz.is_active == True
-    ).first()
+    # Los quizzes no tienen company_id propio: se cachean en el espacio global por módulo
+    quiz = await cache.aget_or_load(None, "quiz", module_id, lambda: _load_quiz(db, module_id))
     
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz no encontrado")
@@ -61,56 +196,496 @@ async def submit_attempt(
     """
     Enviar intento de evaluación.
     Calcula score y verifica si aprobó (>= 18/20).
+    La clave de respuestas viene precompilada de la caché; el intento y sus
+    respuestas se escriben con un INSERT cada uno (respuestas multi-fila) y
+    se actualizan los agregados de quiz_stats.
+    Las preguntas de texto aceptan errores menores (tildes, espacios, distancia
+    de edición) y, si la pregunta lo configura, similitud semántica: una sola
+    petición de embeddings para todas las respuestas del intento.
+    En quizzes con banco de preguntas (pool_size) se entrega la sesión en curso
+    del usuario (POST /attempt/session) con su borrador autoguardado (las
+    respuestas enviadas tienen prioridad) y solo cuentan las preguntas servidas.
     """
-    quiz = db.query(Quiz).filter(Quiz.id == attempt_data.quiz_id).first()
-    if not quiz:
+    key = await aget_answer_key(db, attempt_data.quiz_id)
+    if key is None:
         raise HTTPException(status_code=404, detail="Quiz no encontrado")
     
-    # Obtener preguntas
-    questions = db.query(Question).filter(Question.quiz_id == quiz.id).all()
+    attempt = None
+    if key.pool_size:
+        attempt = _find_open_attempt(db, current_user, key.quiz_id)
+        if attempt is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Este quiz sirve preguntas al azar: inicie el intento con POST /attempt/session"
+            )
+    return await _complete_attempt(db, current_user, key, attempt_data.answers, attempt)
+
+
+def _draft_with(attempt: Attempt, answers: Dict[int, str]) -> Dict[int, str]:
+    """Borrador autoguardado del intento (con lo pendiente en el buffer) y encima las respuestas enviadas."""
+    merged = {}
+    for question_id, answer in autosave.draft(attempt).items():
+        if str(question_id).isdigit():
+            merged[int(question_id)] = answer
+    merged.update(answers)
+    return merged
+
+
+async def _similarities(db: Session, candidates) -> Dict[int, float]:
+    """
+    Similitudes semánticas de los candidatos. Antes de la petición de embeddings
+    se termina la transacción (solo lecturas): no se retienen bloqueos ni la
+    conexión del pool mientras dura.
+    """
+    if candidates and similarity_enabled():
+        db.rollback()
+    return await answer_similarities(candidates)
+
+
+async def _complete_attempt(
+    db: Session,
+    current_user: User,
+    key,
+    answers: Dict[int, str],
+    attempt: Optional[Attempt] = None,
+) -> Dict[str, Any]:
+    """
+    Calificar y guardar un intento (nuevo, o la sesión en curso attempt, cargada
+    sin bloqueo, con su borrador bajo las respuestas enviadas) con los
+    agregados de quiz_stats, y hacer commit. Si el intento tiene preguntas
+    servidas de un banco, solo esas se califican.
+    Las similitudes semánticas se piden sin bloquear el intento; después se
+    bloquea, se verifica que siga abierto y se vuelve a leer el borrador: si
+    trae respuestas que aún requieren similitud se repite (tras SUBMIT_RETRIES,
+    con el bloqueo).
+    """
+    user_id = current_user.id  # La sesión puede terminar su transacción (expira los objetos)
+    attempt_id = None
+    if attempt is not None:
+        attempt_id = attempt.id
+        key = key.subset(attempt.question_ids)
+    scores: Dict[Tuple[int, str], Optional[float]] = {}  # (pregunta, respuesta) -> similitud
+    locked = False
+    for retry in range(SUBMIT_RETRIES + 1):
+        merged = _draft_with(attempt, answers) if attempt is not None else answers
+        pending = [c for c in similarity_candidates(key, merged) if c[:2] not in scores]
+        # Sin sesión en curso no hay fila que bloquear
+        final = attempt is None or (locked and (not pending or retry == SUBMIT_RETRIES))
+        if pending:
+            if final and attempt is not None:
+                results = await answer_similarities(pending)  # Último reintento: con el bloqueo
+            else:
+                results = await _similarities(db, pending)
+            scores.update((candidate[:2], results.get(candidate[0])) for candidate in pending)
+        if final:
+            break
+        attempt = _load_open_attempt(db, attempt_id, user_id, lock=True)
+        locked = True
+    
+    similarities = {
+        question_id: score for (question_id, answer), score in scores.items()
+        if score is not None and merged.get(question_id, "") == answer
+    }
+    result = grade(key, merged, similarities)
+    attempt_id = store_attempt(db, user_id, key.quiz_id, result, attempt_id=attempt_id)
+    # Agregados del quiz en la misma transacción (bloquea su fila hasta el commit)
+    quiz_stats.record_attempt(db, key.quiz_id, user_id, attempt_id, result.score, result.is_passed)
+    db.commit()
+    if attempt is not None:
+        autosave.discard(attempt_id)
+        cache.invalidate(None, "attempt_session", attempt_id)
+    
+    return {
+        "attempt_id": attempt_id,
+        "score": result.score,
+        "is_passed": result.is_passed,
+        "passing_score": result.passing_score
+    }
+
+
+def _session_response(db: Session, attempt: Attempt) -> Dict[str, Any]:
+    return {
+        "attempt_id": attempt.id,
+        "quiz_id": attempt.quiz_id,
+        "questions": question_pool.load_questions(db, attempt.quiz_id, attempt.question_ids),
+        "answers": autosave.draft(attempt),
+        "started_at": attempt.started_at,
+        "draft_saved_at": attempt.draft_saved_at,
+    }
+
+
+def _load_open_attempt(db: Session, attempt_id: int, user_id: int, lock: bool = False) -> Attempt:
+    """Intento con autoguardado del usuario, aún sin entregar (lock: bloqueado y releído)."""
+    query = db.query(Attempt).filter(
+        Attempt.id == attempt_id, Attempt.user_id == user_id, Attempt.mode == "fixed"
+    )
+    attempt = (query.with_for_update().populate_existing() if lock else query).first()
+    if attempt is None:
+        raise HTTPException(status_code=404, detail="Intento no encontrado")
+    if attempt.completed_at is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El intento ya fue entregado")
+    return attempt
+
+
+def _find_open_attempt(db: Session, current_user: User, quiz_id: int) -> Optional[Attempt]:
+    """Último intento con autoguardado del usuario en el quiz, aún sin entregar."""
+    query = (
+        db.query(Attempt)
+        .filter(
+            Attempt.user_id == current_user.id,
+            Attempt.quiz_id == quiz_id,
+            Attempt.completed_at.is_(None),
+            Attempt.mode == "fixed",
+        )
+        .order_by(Attempt.id.desc())
+    )
+    return query.first()
+
+
+def _load_session_owner(db: Session, attempt_id: int):
+    row = db.query(Attempt.user_id, Attempt.quiz_id, Attempt.completed_at, Attempt.mode).filter(
+        Attempt.id == attempt_id
+    ).first()
+    if row is None:
+        return None
+    return {"user_id": row.user_id, "open": row.completed_at is None and row.mode == "fixed"}
+
+
+@router.post("/attempt/session", response_model=AttemptSessionResponse, status_code=status.HTTP_201_CREATED)
+async def start_attempt_session(
+    session_data: AttemptSessionStart,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Iniciar un intento con autoguardado, o reanudar el que el usuario tiene en
+    curso en ese quiz (p.ej. tras cerrar el navegador) con su borrador.
+    Retorna las preguntas a responder: en quizzes con banco (pool_size), una
+    selección al azar fija para el intento (semilla: id del intento).
+    """
+    attempt = _find_open_attempt(db, current_user, session_data.quiz_id)
+    if attempt is None:
+        key = await aget_answer_key(db, session_data.quiz_id)
+        if key is None:
+            raise HTTPException(status_code=404, detail="Quiz no encontrado")
+        attempt = Attempt(user_id=current_user.id, quiz_id=key.quiz_id, score=0.0, mode="fixed")
+        db.add(attempt)
+        db.flush()  # id del intento: semilla de la selección
+        attempt.question_ids = question_pool.select_questions(key, attempt.id)
+        db.commit()
+        db.refresh(attempt)
+    
+    return _session_response(db, attempt)
+
+
+@router.patch("/attempt/{attempt_id}/autosave", status_code=status.HTTP_202_ACCEPTED)
+async def autosave_attempt(
+    attempt_id: int,
+    autosave_data: AttemptAutosave,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Autoguardar respuestas parciales (pensado para llamarse con frecuencia).
+    Con AUTOSAVE_BACKEND=redis (o memory, un solo proceso) las respuestas se
+    agrupan en el buffer de autoguardado y se escriben en lotes cada
+    AUTOSAVE_FLUSH_SECONDS; en modo direct, un UPDATE por petición.
+    La propiedad del intento se verifica contra la caché de aplicación.
+    """
+    session = await cache.aget_or_load(None, "attempt_session", attempt_id, lambda: _load_session_owner(db, attempt_id))
+    if session is None or session["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Intento no encontrado")
+    if not session["open"]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El intento ya fue entregado")
+    
+    if autosave.save(db, attempt_id, autosave_data.answers):
+        background_tasks.add_task(autosave.flush_in_background)
     
-    # Calcular score
-    total_points = 0.0
-    max_points = sum(q.points for q in questions)
+    return {"attempt_id": attempt_id, "saved": len(autosave_data.answers)}
+
+
+@router.get("/attempt/{attempt_id}/draft", response_model=AttemptSessionResponse)
+async def get_attempt_draft(
+    attempt_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Borrador actual del intento (lo guardado más lo pendiente de volcar)."""
+    return _session_response(db, _load_open_attempt(db, attempt_id, current_user.id))
+
+
+@router.post("/attempt/{attempt_id}/submit")
+async def submit_attempt_session(
+    attempt_id: int,
+    submit_data: AttemptSubmit,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Entregar un intento con autoguardado: se califican el borrador (incluido lo
+    pendiente en el buffer) y las respuestas enviadas, que tienen prioridad,
+    solo en las preguntas servidas al intento. Misma respuesta que POST /attempt.
+    """
+    attempt = _load_open_attempt(db, attempt_id, current_user.id)
+    key = await aget_answer_key(db, attempt.quiz_id)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Quiz no encontrado")
     
-    # Crear intento
+    return await _complete_attempt(db, current_user, key, submit_data.answers, attempt)
+
+
+def _adaptive_step(db: Session, attempt: Attempt, state: Dict[str, Any], theta: float, theta_se: float):
+    pending = state["pending"]
+    question = question_pool.load_questions(db, attempt.quiz_id, [pending]) if pending is not None else []
+    return {
+        "attempt_id": attempt.id,
+        "question": question[0] if question else None,
+        "answered": len(state["served"]) - (1 if pending is not None else 0),
+        "max_questions": state["max_questions"],
+        "theta": theta,
+        "theta_se": theta_se,
+        "is_complete": pending is None,
+    }
+
+
+def _load_adaptive_attempt(db: Session, attempt_id: int, user_id: int, lock: bool = True) -> Attempt:
+    """Intento adaptativo en curso del usuario; lock: bloqueado hasta el commit y releído (respuestas en orden)."""
+    query = db.query(Attempt).filter(
+        Attempt.id == attempt_id, Attempt.user_id == user_id, Attempt.mode == "adaptive"
+    )
+    attempt = (query.with_for_update().populate_existing() if lock else query).first()
+    if attempt is None:
+        raise HTTPException(status_code=404, detail="Intento no encontrado")
+    if attempt.completed_at is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El intento ya fue finalizado")
+    return attempt
+
+
+def _check_pending(state: Dict[str, Any], question_id: int) -> None:
+    if state["pending"] is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No hay preguntas pendientes: finalice el intento")
+    if question_id != state["pending"]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="La pregunta no es la pendiente del intento")
+
+
+async def _load_adaptive_keys(db: Session, quiz_id: int):
+    """Clave de respuestas y modelo IRT del quiz (ambos desde la caché)."""
+    key = await aget_answer_key(db, quiz_id)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Quiz no encontrado")
+    model = await adaptive.aget_model(db, quiz_id)
+    if model is None:
+        raise HTTPException(status_code=404, detail="El quiz no tiene modo adaptativo calibrado")
+    return key, model
+
+
+@router.post("/attempt/adaptive/start", response_model=AdaptiveStep, status_code=status.HTTP_201_CREATED)
+async def start_adaptive_attempt(
+    start_data: AdaptiveStart,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Iniciar un intento adaptativo: en lugar de las total_questions preguntas
+    fijas, se sirve una a una la más informativa para la habilidad estimada,
+    hasta alcanzar la precisión objetivo o el tope de total_questions.
+    """
+    key, model = await _load_adaptive_keys(db, start_data.quiz_id)
+    total_questions = db.query(Quiz.total_questions).filter(Quiz.id == key.quiz_id).scalar()
+    available = [entry.question_id for entry in key.entries if entry.question_id in model.items]
+    if not available:
+        raise HTTPException(status_code=404, detail="El quiz no tiene modo adaptativo calibrado")
+    
+    state = adaptive.new_state(model, min(total_questions or len(available), len(available)))
+    theta, theta_se = adaptive.estimate(model, state)
+    first = adaptive.select_question(model, theta, (), available)
+    state = {**state, "served": [first], "pending": first}
     attempt = Attempt(
-        user_id=current_user.id,
-        quiz_id=quiz.id,
-        score=0.0
+        user_id=current_user.id, quiz_id=key.quiz_id, score=0.0, mode="adaptive",
+        theta=theta, theta_se=theta_se, adaptive_state=state,
     )
     db.add(attempt)
-    db.flush()
-    
-    # Procesar respuestas
-    for question in questions:
-        user_answer = attempt_data.answers.get(question.id, "")
-        is_correct = user_answer.lower().strip() == question.correct_answer.lower().strip()
-        points = question.points if is_correct else 0.0
-        
-        answer = Answer(
-            attempt_id=attempt.id,
-            question_id=question.id,
-            answer_text=user_answer,
-            is_correct=is_correct,
-            points_earned=points
-        )
-        db.add(answer)
-        total_points += points
+    db.commit()
     
-    # Calcular score final (sobre 20)
-    score = (total_points / max_points) * 20 if max_points > 0 else 0
-    attempt.score = score
-    attempt.is_passed = score >= quiz.passing_score
-    attempt.completed_at = datetime.utcnow()
+    return _adaptive_step(db, attempt, state, theta, theta_se)
+
+
+@router.post("/attempt/{attempt_id}/next", response_model=AdaptiveStep)
+async def answer_adaptive_question(
+    attempt_id: int,
+    answer_data: AdaptiveAnswer,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Responder la pregunta pendiente y obtener la siguiente. La posterior de la
+    habilidad se actualiza sobre la grilla y la siguiente pregunta sale de la
+    tabla de información precalculada (sin reajustar el modelo).
+    La similitud semántica se pide antes de bloquear el intento; bloqueado, se
+    verifica de nuevo que la pregunta siga pendiente.
+    """
+    user_id = current_user.id
+    attempt = _load_adaptive_attempt(db, attempt_id, user_id, lock=False)
+    _check_pending(attempt.adaptive_state, answer_data.question_id)
+    
+    key, model = await _load_adaptive_keys(db, attempt.quiz_id)
+    entries = {entry.question_id: entry for entry in key.entries}
+    entry = entries.get(answer_data.question_id)
+    if entry is not None and entry.question_id not in model.items:
+        entry = None
+    similarities = {}
+    if entry is not None:
+        similarities = await _similarities(db, similarity_candidates(key, {entry.question_id: answer_data.answer}))
+    
+    attempt = _load_adaptive_attempt(db, attempt_id, user_id)
+    state = attempt.adaptive_state
+    _check_pending(state, answer_data.question_id)
+    if entry is None:
+        # La pregunta se eliminó después de servirla: se descarta sin calificar
+        state = {**state, "served": [q for q in state["served"] if q != state["pending"]], "pending": None}
+    else:
+        is_correct = answer_matches(entry, answer_data.answer, similarities.get(entry.question_id))
+        db.add(Answer(
+            attempt_id=attempt.id, question_id=entry.question_id, answer_text=answer_data.answer,
+            is_correct=is_correct, points_earned=entry.points if is_correct else 0.0,
+        ))
+        state = adaptive.record_response(model, state, entry.question_id, is_correct)
+    
+    theta, theta_se = adaptive.estimate(model, state)
+    if not adaptive.is_complete(state, theta_se):
+        available = [q for q in entries if q in model.items]
+        following = adaptive.select_question(model, theta, state["served"], available)
+        if following is not None:
+            state = {**state, "served": state["served"] + [following], "pending": following}
+    
+    # El JSON se reasigna (no se muta) para que el ORM detecte el cambio
+    attempt.adaptive_state = state
+    attempt.theta, attempt.theta_se = theta, theta_se
+    db.commit()
+    
+    return _adaptive_step(db, attempt, state, theta, theta_se)
+
+
+@router.post("/attempt/{attempt_id}/finish")
+async def finish_adaptive_attempt(
+    attempt_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Finalizar un intento adaptativo. El puntaje (sobre 20) es la fracción de
+    puntos del quiz completo esperada para la habilidad estimada (curva
+    característica del test), comparable con el de un intento fijo.
+    """
+    attempt = _load_adaptive_attempt(db, attempt_id, current_user.id)
+    state = attempt.adaptive_state
+    if state["pending"] is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="La evaluación adaptativa aún no termina")
     
+    key, model = await _load_adaptive_keys(db, attempt.quiz_id)
+    theta, theta_se = adaptive.estimate(model, state)
+    attempt.score = adaptive.score_for(model, theta)
+    attempt.is_passed = attempt.score >= key.passing_score
+    attempt.theta, attempt.theta_se = theta, theta_se
+    attempt.completed_at = datetime.utcnow()
+    quiz_stats.record_attempt(db, attempt.quiz_id, current_user.id, attempt.id, attempt.score, attempt.is_passed)
     db.commit()
-    db.refresh(attempt)
     
     return {
         "attempt_id": attempt.id,
-        "score": score,
+        "score": attempt.score,
         "is_passed": attempt.is_passed,
-        "passing_score": quiz.passing_score
+        "passing_score": key.passing_score,
+        "theta": theta,
+        "theta_se": theta_se,
+        "questions_answered": len(state["served"]),
     }
 
+
+@router.get("/{quiz_id}/leaderboard", response_model=QuizLeaderboardResponse)
+async def get_quiz_leaderboard(
+    quiz_id: int,
+    current_user: User = Depends(require_role([Role.PROFESOR, Role.COMPANY_ADMIN, Role.ADMINISTRADOR])),
+    db: Session = Depends(get_db)
+):
+    """
+    Estadísticas (tasa de aprobación, media, desviación, histograma) y ranking
+    de un quiz, leídos de la fila agregada de quiz_stats sin recorrer attempts.
+    Solo para instructores y admins: el ranking incluye nombres y puntajes.
+    """
+    row = (
+        db.query(Quiz.id, Course.company_id, QuizStats)
+        .join(Module, Module.id == Quiz.module_id)
+        .join(Course, Course.id == Module.course_id)
+        .outerjoin(QuizStats, QuizStats.quiz_id == Quiz.id)
+        .filter(Quiz.id == quiz_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Quiz no encontrado")
+    
+    _, company_id, stats = row
+    _check_quiz_access(current_user, company_id)
+    
+    summary = quiz_stats.summarize(stats)
+    # Nombres del ranking: una consulta acotada a LEADERBOARD_SIZE usuarios
+    user_ids = [entry["user_id"] for entry in summary["top_scores"]]
+    names = {}
+    if user_ids:
+        names = {
+            user_id: f"{first_name} {last_name}"
+            for user_id, first_name, last_name in db.query(
+                Profile.user_id, Profile.first_name, Profile.last_name
+            ).filter(Profile.user_id.in_(user_ids))
+        }
+    summary["top_scores"] = [{**entry, "name": names.get(entry["user_id"])} for entry in summary["top_scores"]]
+    
+    return {"quiz_id": quiz_id, **summary}
+
+
+@router.get("/{quiz_id}/item-analysis", response_model=QuizItemAnalysisResponse)
+async def get_quiz_item_analysis(
+    quiz_id: int,
+    current_user: User = Depends(require_role([Role.PROFESOR, Role.COMPANY_ADMIN, Role.ADMINISTRADOR])),
+    db: Session = Depends(get_db)
+):
+    """
+    Análisis de ítems del quiz para el instructor: dificultad (índice p),
+    discriminación (punto-biserial corregida) y frecuencia de distractores por
+    pregunta. Se lee de question_item_stats, calculado por el job por lotes
+    scripts/run_item_analysis.py; las preguntas aún no analizadas van sin métricas.
+    """
+    company_id = (
+        db.query(Course.company_id)
+        .join(Module, Module.course_id == Course.id)
+        .join(Quiz, Quiz.module_id == Module.id)
+        .filter(Quiz.id == quiz_id)
+        .scalar()
+    )
+    if company_id is None:
+        raise HTTPException(status_code=404, detail="Quiz no encontrado")
+    _check_quiz_access(current_user, company_id)
+    
+    rows = (
+        db.query(Question.id, Question.question_text, Question.order, QuestionItemStats)
+        .outerjoin(QuestionItemStats, QuestionItemStats.question_id == Question.id)
+        .filter(Question.quiz_id == quiz_id)
+        .order_by(Question.order, Question.id)
+        .all()
+    )
+    questions = []
+    for question_id, question_text, order, stats in rows:
+        item = {"question_id": question_id, "question_text": question_text, "order": order}
+        if stats is not None:
+            item.update(
+                response_count=stats.response_count,
+                difficulty=stats.difficulty,
+                discrimination=stats.discrimination,
+                distractors=stats.distractors or [],
+                computed_at=stats.computed_at,
+            )
+        questions.append(item)
+    
+    computed = [q["computed_at"] for q in questions if q.get("computed_at")]
+    return {"quiz_id": quiz_id, "computed_at": max(computed) if computed else None, "questions": questions}
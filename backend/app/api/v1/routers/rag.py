@@ -2,10 +2,12 @@
 Router de RAG (Retrieval Augmented Generation).
 Endpoints para chat con IA usando documentos indexados.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.metrics import time_rag_stage
+from app.core.pagination import paginate
 from app.models.user import User
 from app.models.chat import ChatLog
 from pydantic import BaseModel
@@ -46,20 +48,24 @@ async def query_rag(
     """
     company_id = rag_query.company_id or current_user.company_id
     
-    # Placeholder - implementar lógica RAG completa
-    response_text = f"Respuesta a: {rag_query.query}"
+    # Cada etapa se mide con time_rag_stage (rag_stage_duration_seconds en /metrics);
+    # las etapas de embedding y retrieval se agregarán al implementar el pipeline
+    with time_rag_stage("generation"):
+        # Placeholder - implementar lógica RAG completa
+        response_text = f"Respuesta a: {rag_query.query}"
     
     # Guardar en log
-    chat_log = ChatLog(
-        user_id=current_user.id,
-        company_id=company_id,
-        query=rag_query.query,
-        response=response_text,
-        sources=[],
-        model_used="deepseek"
-    )
-    db.add(chat_log)
-    db.commit()
+    with time_rag_stage("log_write"):
+        chat_log = ChatLog(
+            user_id=current_user.id,
+            company_id=company_id,
+            query=rag_query.query,
+            response=response_text,
+            sources=[],
+            model_used="deepseek"
+        )
+        db.add(chat_log)
+        db.commit()
     
     return RAGResponse(
         response=response_text,
@@ -68,17 +74,29 @@ async def query_rag(
     )
 
 
+# Orden del historial (más recientes primero)
+HISTORY_ORDER = [ChatLog.created_at, ChatLog.id]
+
+
+def history_query(db: Session, user_id: int):
+    """Consultas RAG del usuario, sin orden ni paginación."""
+    return db.query(ChatLog).filter(ChatLog.user_id == user_id)
+
+
 @router.get("/history", response_model=List[dict])
 async def get_rag_history(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtener historial de consultas RAG."""
-    logs = db.query(ChatLog).filter(
-        ChatLog.user_id == current_user.id
-    ).order_by(ChatLog.created_at.desc()).offset(skip).limit(limit).all()
+    """Obtener historial de consultas RAG. Paginación por offset o cursor."""
+    logs = paginate(
+        history_query(db, current_user.id), response, HISTORY_ORDER,
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
     
     return [
         {
@@ -2,32 +2,39 @@
 Router de usuarios.
 Endpoints para gestión de usuarios y perfiles.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.core.dependencies import get_current_user, require_role
 from app.core.enums import Role
+from app.core.pagination import paginate
+from app.core.serialization import list_response
 from app.models.user import User, Profile
 from app.schemas.user import ProfileCreate, ProfileUpdate, ProfileResponse, UserResponse, UserUpdate
 
 router = APIRouter()
 
 
+def users_query(db: Session, current_user: User):
+    """Usuarios visibles para un admin: todos (ADMINISTRADOR) o los de su empresa."""
+    if current_user.role == Role.ADMINISTRADOR.value:
+        return db.query(User)
+    return db.query(User).filter(User.company_id == current_user.company_id)
+
+
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(require_role([Role.ADMINISTRADOR, Role.COMPANY_ADMIN])),
     db: Session = Depends(get_db)
 ):
-    """Listar usuarios (solo admins)."""
-    if current_user.role == Role.ADMINISTRADOR.value:
-        users = db.query(User).offset(skip).limit(limit).all()
-    else:
-        users = db.query(User).filter(User.company_id == current_user.company_id).offset(skip).limit(limit).all()
-    
-    return users
+    """Listar usuarios (solo admins). Paginación por offset o cursor."""
+    users = paginate(users_query(db, current_user), response, [User.id], skip=skip, limit=limit, cursor=cursor)
+    return list_response(users, UserResponse, response)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
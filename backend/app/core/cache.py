@@ -0,0 +1,363 @@
+"""
+Caché de aplicación para modelos de lectura frecuentes, separada por empresa.
+Backends intercambiables:
+  - memory: LRU en el proceso (por defecto; cada worker/instancia tiene la suya)
+  - redis:  compartida entre procesos (CACHE_BACKEND=redis, usa REDIS_URL)
+  - none:   deshabilitada
+
+Las claves se agrupan por empresa: "<prefijo>:c<company_id>:<tipo>:<id>"
+("global" para datos sin empresa). Los handlers que escriben invalidan o
+reescriben las claves afectadas después del commit.
+
+Protección contra estampida: cada valor tiene una expiración "blanda"; al
+vencer, solo quien obtiene el lock lo recalcula y el resto sigue sirviendo el
+valor anterior hasta la expiración "dura" (TTL + CACHE_STALE_SECONDS). En un
+fallo en frío quien no obtiene el lock espera brevemente (LOCK_WAIT_SECONDS)
+el valor que calcula el otro antes de ir a la base. Los handlers async usan
+aget_or_load, que hace esa espera con asyncio.sleep para no bloquear el event
+loop (el resto del camino no cede el control mientras retiene la conexión).
+
+Invalidación: invalidate no borra la entrada, la vence (expiración blanda),
+así el recálculo pasa por el mismo camino con un solo loader. Cada entrada
+lleva una generación que invalidate y set incrementan; un loader solo guarda
+su resultado si la generación no cambió desde que empezó (un valor leído de
+la base antes de un commit no sobrescribe la invalidación de ese commit).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "guiame"
+LOCK_SECONDS = 10  # Máximo que se mantiene el lock de recálculo de una clave
+LOCK_WAIT_SECONDS = 0.5  # Espera máxima de un fallo en frío por el valor que calcula otro
+LOCK_POLL_SECONDS = 0.02
+
+# (valor serializado o None si solo queda la generación, fresco hasta (epoch), generación)
+Entry = Tuple[Optional[bytes], float, int]
+
+_WAIT = object()  # Fallo en frío sin el lock: esperar el valor que calcula otro
+
+try:
+    import orjson
+
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:  # pragma: no cover - dependencia opcional
+    _dumps = lambda value: json.dumps(value).encode("utf-8")  # noqa: E731
+    _loads = json.loads
+
+
+# ==================== BACKENDS ====================
+
+class MemoryBackend:
+    """LRU en memoria con expiración por clave. Seguro entre hilos."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # clave -> (expira, valor, fresco hasta, generación)
+        self._locks = {}
+        self._mutex = threading.Lock()
+
+    def _live(self, key: str) -> Optional[tuple]:
+        item = self._data.get(key)
+        if item is not None and item[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._mutex:
+            item = self._live(key)
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[1:]
+
+    def put(self, key: str, value: bytes, fresh_until: float, ttl: float, generation: Optional[int] = None) -> bool:
+        """Guardar si la generación sigue siendo `generation` (None: siempre, incrementándola)."""
+        with self._mutex:
+            item = self._live(key)
+            current = item[3] if item is not None else 0
+            if generation is None:
+                current += 1
+            elif generation != current:
+                return False
+            self._data[key] = (time.monotonic() + ttl, value, fresh_until, current)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def expire(self, key: str, ttl: float, keep_value: bool) -> None:
+        """Vencer la entrada (expiración blanda) e incrementar su generación."""
+        with self._mutex:
+            item = self._live(key)
+            value = item[1] if item is not None and keep_value else None
+            generation = item[3] + 1 if item is not None else 1
+            self._data[key] = (time.monotonic() + ttl, value, 0.0, generation)
+            self._data.move_to_end(key)
+
+    def acquire_lock(self, key: str) -> bool:
+        with self._mutex:
+            expires = self._locks.get(key)
+            now = time.monotonic()
+            if expires is not None and expires > now:
+                return False
+            self._locks[key] = now + LOCK_SECONDS
+            return True
+
+    def release_lock(self, key: str) -> None:
+        with self._mutex:
+            self._locks.pop(key, None)
+
+
+# Hash por clave: v (valor), f (fresco hasta), g (generación). Las claves de tipo
+# string de versiones anteriores se reemplazan al guardar.
+# KEYS[1]; ARGV: valor, fresco hasta, TTL (ms), generación esperada ('' = siempre, incrementándola)
+_PUT_SCRIPT = """
+if redis.call('TYPE', KEYS[1]).ok == 'string' then redis.call('DEL', KEYS[1]) end
+local generation = tonumber(redis.call('HGET', KEYS[1], 'g') or '0')
+if ARGV[4] == '' then
+  generation = generation + 1
+elseif generation ~= tonumber(ARGV[4]) then
+  return 0
+end
+redis.call('HSET', KEYS[1], 'v', ARGV[1], 'f', ARGV[2], 'g', generation)
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# KEYS[1]; ARGV: TTL (ms), conservar el valor ('1'/'0')
+_EXPIRE_SCRIPT = """
+if redis.call('TYPE', KEYS[1]).ok == 'string' then redis.call('DEL', KEYS[1]) end
+if ARGV[2] ~= '1' then redis.call('HDEL', KEYS[1], 'v') end
+redis.call('HINCRBY', KEYS[1], 'g', 1)
+redis.call('HSET', KEYS[1], 'f', 0)
+redis.call('PEXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class RedisBackend:
+    """Redis (cliente síncrono). Los errores de conexión se tratan como fallo de caché."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._errors = (redis.RedisError,)
+        self._put = self._client.register_script(_PUT_SCRIPT)
+        self._expire = self._client.register_script(_EXPIRE_SCRIPT)
+
+    def _safe(self, func, *args, default=None):
+        try:
+            return func(*args)
+        except self._errors as e:
+            logger.warning("⚠️ Error de Redis en caché: %s", e)
+            return default
+
+    def get(self, key: str) -> Optional[Entry]:
+        fields = self._safe(self._client.hmget, key, "v", "f", "g")
+        if not fields or fields[2] is None:
+            return None
+        value, fresh_until, generation = fields
+        return value, float(fresh_until or 0), int(generation)
+
+    def put(self, key: str, value: bytes, fresh_until: float, ttl: float, generation: Optional[int] = None) -> bool:
+        args = [value, repr(fresh_until), int(ttl * 1000), "" if generation is None else generation]
+        return bool(self._safe(lambda: self._put(keys=[key], args=args), default=False))
+
+    def expire(self, key: str, ttl: float, keep_value: bool) -> None:
+        self._safe(lambda: self._expire(keys=[key], args=[int(ttl * 1000), "1" if keep_value else "0"]))
+
+    def acquire_lock(self, key: str) -> bool:
+        return bool(self._safe(lambda: self._client.set(f"{key}:lock", b"1", nx=True, ex=LOCK_SECONDS), default=True))
+
+    def release_lock(self, key: str) -> None:
+        self._safe(self._client.delete, f"{key}:lock")
+
+
+# ==================== CACHÉ POR EMPRESA ====================
+
+class TenantCache:
+    """Caché de valores JSON con claves separadas por empresa."""
+
+    def __init__(self, backend, ttl: float, stale: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale = stale
+
+    @staticmethod
+    def key(company_id: Optional[int], kind: str, ident: Any = "") -> str:
+        namespace = "global" if company_id is None else f"c{company_id}"
+        return f"{KEY_PREFIX}:{namespace}:{kind}:{ident}"
+
+    def get_or_load(
+        self,
+        company_id: Optional[int],
+        kind: str,
+        ident: Any,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Retornar el valor cacheado o calcularlo con `loader` (debe retornar datos
+        serializables a JSON, p.ej. esquema.model_dump(mode="json")).
+        """
+        value = self._lookup(company_id, kind, ident, loader, ttl)
+        if value is not _WAIT:
+            return value
+        key = self.key(company_id, kind, ident)
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            value = self._waited(key, kind)
+            if value is not _WAIT:
+                return value
+        return loader()  # Sin guardar: el dueño del lock escribirá el suyo
+
+    async def aget_or_load(
+        self,
+        company_id: Optional[int],
+        kind: str,
+        ident: Any,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """get_or_load desde un handler async: la espera de un fallo en frío no bloquea el event loop."""
+        value = self._lookup(company_id, kind, ident, loader, ttl)
+        if value is not _WAIT:
+            return value
+        key = self.key(company_id, kind, ident)
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            value = self._waited(key, kind)
+            if value is not _WAIT:
+                return value
+        return loader()
+
+    def _lookup(
+        self,
+        company_id: Optional[int],
+        kind: str,
+        ident: Any,
+        loader: Callable[[], Any],
+        ttl: Optional[float],
+    ) -> Any:
+        """Valor cacheado o calculado, o _WAIT si otro tiene el lock de un fallo en frío."""
+        if self.backend is None:
+            return loader()
+
+        key = self.key(company_id, kind, ident)
+        entry = self.backend.get(key)
+        generation = entry[2] if entry is not None else 0
+        if entry is not None and entry[0] is not None:
+            raw, fresh_until, _ = entry
+            if fresh_until > time.time():
+                CACHE_REQUESTS.inc(kind, "hit")
+                return _loads(raw)
+            # Expiración blanda (o invalidación): un solo recálculo, el resto sirve el valor anterior
+            if not self.backend.acquire_lock(key):
+                CACHE_REQUESTS.inc(kind, "stale")
+                return _loads(raw)
+            try:
+                CACHE_REQUESTS.inc(kind, "refresh")
+                value = loader()
+                self._store(key, value, ttl, generation)
+                return value
+            finally:
+                self.backend.release_lock(key)
+
+        CACHE_REQUESTS.inc(kind, "miss")
+        if self.backend.acquire_lock(key):
+            try:
+                value = loader()
+                self._store(key, value, ttl, generation)
+                return value
+            finally:
+                self.backend.release_lock(key)
+        # Otro proceso o hilo está calculando la misma clave
+        return _WAIT
+
+    def _waited(self, key: str, kind: str) -> Any:
+        """Valor que guardó el dueño del lock, o _WAIT si aún no está."""
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] is not None:
+            CACHE_REQUESTS.inc(kind, "wait")
+            return _loads(entry[0])
+        return _WAIT
+
+    def _store(self, key: str, value: Any, ttl: Optional[float], generation: Optional[int] = None) -> bool:
+        ttl = self.ttl if ttl is None else ttl
+        return self.backend.put(key, _dumps(value), time.time() + ttl, ttl + self.stale, generation)
+
+    def set(self, company_id: Optional[int], kind: str, ident: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """Escritura directa (write-through) de un valor ya calculado (descarta los recálculos en curso)."""
+        if self.backend is not None:
+            self._store(self.key(company_id, kind, ident), value, ttl)
+
+    def invalidate(self, company_id: Optional[int], kind: str, ident: Any = "") -> None:
+        """
+        Vencer la clave: la próxima lectura la recalcula (una sola, el resto
+        sirve el valor anterior mientras tanto) y los recálculos ya en curso
+        no guardan su resultado.
+        """
+        if self.backend is not None:
+            self.backend.expire(
+                self.key(company_id, kind, ident), max(self.stale, LOCK_SECONDS), keep_value=self.stale > 0
+            )
+
+
+def _build_backend():
+    backend = settings.CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "redis":
+        try:
+            return RedisBackend(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("⚠️ CACHE_BACKEND=redis pero el paquete redis no está instalado; usando memoria")
+    return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+
+
+cache = TenantCache(_build_backend(), settings.CACHE_TTL_SECONDS, settings.CACHE_STALE_SECONDS)
+
+
+# ==================== CLAVES DE LOS MODELOS DE LECTURA ====================
+# Funciones de invalidación usadas por los handlers de escritura
+
+def invalidate_course_catalog(company_id: Optional[int]) -> None:
+    """Catálogo de cursos activos de la empresa y catálogo global (admins/estudiantes)."""
+    cache.invalidate(company_id, "catalog")
+    cache.invalidate(None, "catalog")
+
+
+def invalidate_course_modules(company_id: Optional[int], course_id: int) -> None:
+    cache.invalidate(company_id, "modules", course_id)
+
+
+def invalidate_company(company_id: int) -> None:
+    cache.invalidate(company_id, "company", company_id)
+
+
+def invalidate_quiz(module_id: int) -> None:
+    cache.invalidate(None, "quiz", module_id)
+
+
+def invalidate_answer_key(quiz_id: int) -> None:
+    """Clave de respuestas precompilada del motor de calificación (app.services.grading)."""
+    cache.invalidate(None, "answer_key", quiz_id)
+
+
+def invalidate_irt_model(quiz_id: int) -> None:
+    """Calibración IRT del modo adaptativo (app.services.adaptive)."""
+    cache.invalidate(None, "irt_model", quiz_id)
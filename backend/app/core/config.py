@@ -3,9 +3,8 @@ Configuración centralizada de la aplicación.
 Manejo de variables de entorno y configuración global.
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
-from pathlib import Path
 
 
 class Settings(BaseSettings):
@@ -72,12 +71,31 @@ class Settings(BaseSettings):
             return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         raise ValueError("Debe proporcionar DATABASE_URL o todas las variables POSTGRES_*")
     
+    # Estrategia de conexiones: "null" (NullPool, serverless detrás del pooler de
+    # Supabase), "queue" (pool persistente para uvicorn) o "auto" (null en Vercel/Lambda)
+    DB_POOL_MODE: str = "auto"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0  # Segundos esperando una conexión libre antes de fallar
+    DB_POOL_RECYCLE: int = 1800  # Menor que el timeout de inactividad del servidor/pooler
+    DB_POOL_PRE_PING: bool = True  # Solo modo queue: verificar la conexión en cada checkout
+    
+    # Réplicas de lectura (JSON), p.ej. DATABASE_REPLICA_URLS=["postgresql://...@replica-1/db"]
+    DATABASE_REPLICA_URLS: List[str] = []
+    READ_AFTER_WRITE_SECONDS: float = 5.0  # Tras escribir, el usuario lee de la primaria
+    REPLICA_MAX_LAG_SECONDS: float = 2.0  # Con más retraso la réplica no recibe lecturas
+    REPLICA_LAG_CHECK_SECONDS: float = 5.0  # Intervalo entre mediciones del retraso por proceso
+    
     # Seguridad
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Pool de hashing de contraseñas (bcrypt)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Operaciones en espera antes de responder 503
+    
     # Supabase
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
@@ -89,6 +107,16 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OPENAI_API_KEY: str = ""
     
+    # Calificación de preguntas de texto
+    GRADING_FUZZY_THRESHOLD: float = 0.85  # Similitud mínima (1 - distancia de edición/longitud)
+    # Similitud semántica opcional: "none", "openai" (OPENAI_API_KEY) u "ollama" (OLLAMA_BASE_URL)
+    GRADING_EMBEDDING_BACKEND: str = "none"
+    GRADING_EMBEDDING_MODEL: str = ""  # Vacío: text-embedding-3-small / nomic-embed-text
+    GRADING_EMBEDDING_TIMEOUT: float = 5.0
+    # TTL de la clave de respuestas con CACHE_BACKEND=memory: los cambios hechos
+    # desde otro proceso (scripts, otro worker) no invalidan esa caché
+    GRADING_KEY_MEMORY_TTL_SECONDS: float = 30.0
+    
     # ChromaDB
     CHROMADB_HOST: str = "localhost"
     CHROMADB_PORT: int = 8000
@@ -97,6 +125,26 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Caché de aplicación: "memory" (LRU por proceso), "redis" (usa REDIS_URL) o "none"
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_STALE_SECONDS: float = 30.0  # Tiempo extra sirviendo el valor anterior mientras se recalcula
+    CACHE_MAX_ENTRIES: int = 2048
+    
+    # Autoguardado de evaluaciones en curso: "direct" (un UPDATE por petición; válido
+    # en serverless y con varios workers), "redis" (respuestas agrupadas en REDIS_URL
+    # y escritas en lotes cada AUTOSAVE_FLUSH_SECONDS) o "memory" (lotes en el proceso:
+    # solo con un único proceso, la entrega debe llegar al mismo que el autoguardado)
+    AUTOSAVE_BACKEND: str = "direct"
+    AUTOSAVE_FLUSH_SECONDS: float = 5.0
+    AUTOSAVE_BATCH_SIZE: int = 500  # Intentos por sentencia UPDATE
+    
+    # Chat en tiempo real (WebSocket /api/v1/chat/ws). Propagación entre procesos:
+    # "memory" (un solo proceso), "postgres" (LISTEN/NOTIFY) o "redis" (pub/sub en REDIS_URL)
+    REALTIME_BACKEND: str = "memory"
+    REALTIME_DATABASE_URL: str = ""  # Conexión directa para LISTEN (no pgbouncer en modo transacción); vacío: DATABASE_URL
+    REALTIME_QUEUE_SIZE: int = 256  # Eventos pendientes por socket antes de cerrar un cliente lento
+    
     # Google Drive
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
@@ -123,13 +171,46 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    # Niveles por logger en JSON, p.ej. LOG_LEVELS={"sqlalchemy.engine": "WARNING"}
+    LOG_LEVELS: Dict[str, str] = {}
+    LOG_JSON: bool = True
+    LOG_TO_FILE: bool = True
+    LOG_AUTH_SAMPLE_PER_SECOND: float = 5.0  # Máximo de logs INFO de autenticación por segundo
+    # Muestreo de otros loggers de alto volumen: logs INFO por segundo por logger, en JSON
+    LOG_SAMPLE_RATES: Dict[str, float] = {
+        "app.api.v1.routers.courses": 5.0,
+        "app.api.v1.routers.quizzes": 5.0,
+    }
+    
+    # Instrumentación de consultas SQL por petición
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 10  # Repeticiones de una misma sentencia para avisar de N+1
+    # Presupuesto de consultas por ruta en JSON, p.ej. QUERY_BUDGETS={"GET /api/v1/courses/{course_id}/outline": 5}
+    QUERY_BUDGETS: Dict[str, int] = {}
+    QUERY_BUDGET_STRICT: bool = False  # En CI: fallar la petición si supera el presupuesto
+    
+    # Serialización rápida (TypeAdapter + orjson) en los endpoints de listado
+    FAST_JSON_RESPONSES: bool = True
+    
+    # Métricas Prometheus (/metrics)
+    METRICS_ENABLED: bool = True
+    # Token para leer /metrics (Authorization: Bearer <token>). Sin token el
+    # endpoint solo responde con ENVIRONMENT=development
+    METRICS_TOKEN: str = ""
+    
+    # Arranque en frío: importar cada router de /api/v1 en la primera petición a su
+    # prefijo en lugar de al importar app.main (api/index.py lo activa en Vercel)
+    LAZY_ROUTERS: bool = False
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
         extra = "ignore"  # Ignorar campos extra en .env que no están definidos en el modelo
 
 
-# Crear directorio de uploads si no existe
+# El directorio de uploads se crea al guardar el primer archivo (documents.py),
+# no al importar la configuración
 settings = Settings()
-Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 
@@ -2,25 +2,29 @@
 Dependencias compartidas para rutas.
 Autenticación, autorización y validación de permisos.
 """
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.core.database import get_db
 from app.core.security import decode_token
 from app.models.user import User
+from app.models.course import Course, Module, ModuleContent
 from app.core.enums import Role
 
 security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Obtener usuario actual desde token JWT.
-    Valida token y retorna usuario autenticado.
+    Valida token y retorna usuario autenticado. El id queda en
+    request.state.user_id (enrutado a réplicas, app.core.replicas).
     """
     import logging
     logger = logging.getLogger(__name__)
@@ -34,7 +38,7 @@ async def get_current_user(
         )
     
     token = credentials.credentials
-    logger.info(f"🔐 Validando token (longitud: {len(token) if token else 0})")
+    logger.info("🔐 Validando token (longitud: %d)", len(token) if token else 0)
     
     payload = decode_token(token)
     
@@ -46,7 +50,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    logger.info(f"✅ Token decodificado correctamente. Payload: user_id={payload.get('sub')}, role={payload.get('role')}")
+    logger.info("✅ Token decodificado correctamente. Payload: user_id=%s, role=%s", payload.get('sub'), payload.get('role'))
     
     # JWT almacena "sub" como string, convertir a int
     user_id_str = payload.get("sub")
@@ -60,21 +64,23 @@ async def get_current_user(
     try:
         user_id = int(user_id_str)
     except (ValueError, TypeError):
-        logger.warning(f"❌ user_id no es un número válido: {user_id_str}")
+        logger.warning("❌ user_id no es un número válido: %s", user_id_str)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido",
         )
     
+    # Antes de la primera consulta: la sesión elige primaria o réplica con este usuario
+    request.state.user_id = user_id
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        logger.warning(f"❌ Usuario no encontrado con ID: {user_id}")
+        logger.warning("❌ Usuario no encontrado con ID: %s", user_id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario no encontrado",
         )
     
-    logger.info(f"✅ Usuario autenticado: ID={user.id}, Email={user.email}, Role={user.role}")
+    logger.info("✅ Usuario autenticado: ID=%s, Email=%s, Role=%s", user.id, user.email, user.role)
     return user
 
 
@@ -89,16 +95,16 @@ def require_role(allowed_roles: list[Role]):
         
         # Comparar el valor del rol (string) con los valores de los roles permitidos
         allowed_role_values = [role.value if isinstance(role, Role) else role for role in allowed_roles]
-        logger.info(f"🔐 Verificando rol: Usuario={current_user.role}, Permitidos={allowed_role_values}")
+        logger.info("🔐 Verificando rol: Usuario=%s, Permitidos=%s", current_user.role, allowed_role_values)
         
         if current_user.role not in allowed_role_values:
-            logger.warning(f"❌ Acceso denegado: Usuario={current_user.role}, Requeridos={allowed_role_values}")
+            logger.warning("❌ Acceso denegado: Usuario=%s, Requeridos=%s", current_user.role, allowed_role_values)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"No tiene permisos suficientes. Rol requerido: {allowed_role_values}, Rol actual: {current_user.role}"
             )
         
-        logger.info(f"✅ Acceso permitido para rol: {current_user.role}")
+        logger.info("✅ Acceso permitido para rol: %s", current_user.role)
         return current_user
     
     return role_checker
@@ -126,3 +132,122 @@ def require_company_access():
     
     return company_checker
 
+
+
+# ==================== ACCESO A CURSOS / MÓDULOS / CONTENIDOS ====================
+
+@dataclass
+class CourseAccess:
+    """Resultado de resolver el acceso a un módulo (y opcionalmente a un contenido)."""
+    course: Course
+    module: Module
+    content: Optional[ModuleContent] = None
+    can_edit: bool = False
+
+
+def can_edit_course(user: User, course: Course) -> bool:
+    """Administradores, el instructor del curso o el company_admin de su empresa."""
+    if user.role == Role.ADMINISTRADOR.value:
+        return True
+    if course.instructor_id == user.id:
+        return True
+    return user.role == Role.COMPANY_ADMIN.value and course.company_id == user.company_id
+
+
+def _check_read_access(user: User, course: Course, module: Module) -> None:
+    """Regla de lectura de módulos y contenidos."""
+    if user.role == Role.ADMINISTRADOR.value:
+        return
+    if user.role == Role.ESTUDIANTE.value:
+        if not course.is_active or not module.is_active:
+            raise HTTPException(status_code=403, detail="El contenido no está disponible")
+        return
+    if user.company_id is None or course.company_id != user.company_id:
+        raise HTTPException(status_code=403, detail="No tiene permisos")
+
+
+def _resolve_access(
+    request: Request,
+    user: User,
+    db: Session,
+    module_id: int,
+    content_id: Optional[int],
+    write: bool,
+    denied_detail: str,
+) -> CourseAccess:
+    """
+    Cargar contenido, módulo y curso en una sola consulta y validar permisos.
+    La decisión se memoriza en request.state para el resto de la petición.
+    """
+    cache = getattr(request.state, "course_access", None)
+    if cache is None:
+        cache = {}
+        request.state.course_access = cache
+    key = (module_id, content_id, write)
+    if key in cache:
+        return cache[key]
+
+    if content_id is None:
+        row = db.query(Module, Course).join(Course, Module.course_id == Course.id).filter(
+            Module.id == module_id
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Módulo no encontrado")
+        module, course = row
+        content = None
+    else:
+        row = db.query(ModuleContent, Module, Course).join(
+            Module, ModuleContent.module_id == Module.id
+        ).join(
+            Course, Module.course_id == Course.id
+        ).filter(
+            ModuleContent.id == content_id,
+            ModuleContent.module_id == module_id
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Contenido no encontrado")
+        content, module, course = row
+
+    can_edit = can_edit_course(user, course)
+    if write:
+        if not can_edit:
+            raise HTTPException(status_code=403, detail=denied_detail)
+    else:
+        _check_read_access(user, course, module)
+
+    access = CourseAccess(course=course, module=module, content=content, can_edit=can_edit)
+    cache[key] = access
+    return access
+
+
+def require_module_access(write: bool = False, denied_detail: str = "No tiene permisos"):
+    """
+    Dependencia que resuelve el acceso a /modules/{module_id}.
+    Retorna CourseAccess con el módulo y su curso.
+    """
+    async def module_access(
+        module_id: int,
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ) -> CourseAccess:
+        return _resolve_access(request, current_user, db, module_id, None, write, denied_detail)
+
+    return module_access
+
+
+def require_content_access(write: bool = False, denied_detail: str = "No tiene permisos"):
+    """
+    Dependencia que resuelve el acceso a /modules/{module_id}/contents/{content_id}.
+    Retorna CourseAccess con el contenido, su módulo y su curso.
+    """
+    async def content_access(
+        module_id: int,
+        content_id: int,
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ) -> CourseAccess:
+        return _resolve_access(request, current_user, db, module_id, content_id, write, denied_detail)
+
+    return content_access
@@ -0,0 +1,9 @@
+"""
+Excepciones de aplicación con handler propio en app.main.
+Viven en un módulo sin dependencias para que registrar los handlers no importe
+los módulos que las lanzan (security importa jose, bcrypt y bleach).
+"""
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """El pool de hashing de contraseñas está saturado."""
@@ -0,0 +1,112 @@
+"""
+Caché HTTP condicional (ETag / Last-Modified) para lecturas de cursos.
+El ETag se calcula a partir de (id, updated_at) de las filas que forman la
+respuesta, sin serializarla; si coincide con If-None-Match se responde 304.
+
+Los datos son por empresa y requieren autenticación: solo caché privada del
+navegador, siempre revalidada (private, no-cache) y variando por Authorization.
+"""
+import hashlib
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response, status
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _stamp(row: Any) -> Optional[datetime]:
+    """updated_at o created_at de una fila ORM o de un dict serializado (p.ej. desde la caché)."""
+    if isinstance(row, Mapping):
+        value = row.get("updated_at") or row.get("created_at")
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+    return getattr(row, "updated_at", None) or getattr(row, "created_at", None)
+
+
+def row_version(row: Any) -> tuple:
+    """Versión de una fila: (tabla, id, updated_at o created_at)."""
+    stamp = _stamp(row)
+    row_id = row["id"] if isinstance(row, Mapping) else row.id
+    return (getattr(row, "__tablename__", ""), row_id, stamp.isoformat() if stamp else None)
+
+
+def last_modified_of(rows: Iterable[Any]) -> Optional[datetime]:
+    """Fecha de modificación más reciente entre las filas."""
+    stamps = []
+    for row in rows:
+        stamp = _stamp(row)
+        if stamp is not None:
+            stamps.append(stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc))
+    return max(stamps) if stamps else None
+
+
+def compute_etag(rows: Iterable[Any], variant: str = "") -> str:
+    """
+    ETag débil a partir de las versiones de las filas.
+    `variant` distingue respuestas distintas para las mismas filas (p.ej. el rol,
+    porque los estudiantes reciben una vista filtrada).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(variant.encode("utf-8"))
+    for row in rows:
+        digest.update(repr(row_version(row)).encode("utf-8"))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    rows: Iterable[Any],
+    variant: str = "",
+) -> Optional[Response]:
+    """
+    Fijar ETag, Last-Modified y Cache-Control en `response` y, si el cliente ya
+    tiene la versión actual, retornar una respuesta 304 sin cuerpo.
+    Uso en un endpoint:
+        cached = not_modified(request, response, [course], current_user.role)
+        if cached:
+            return cached
+    """
+    rows = list(rows)
+    etag = compute_etag(rows, variant)
+    last_modified = last_modified_of(rows)
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return None
+
+    # If-Modified-Since solo se evalúa sin If-None-Match (RFC 9110, 13.2.2) y para
+    # un único recurso: en listados, borrar una fila no cambia la fecha máxima
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None and len(rows) == 1:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.replace(microsecond=0) <= since:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
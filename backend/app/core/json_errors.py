@@ -0,0 +1,79 @@
+"""
+Middleware que garantiza respuestas de error en JSON.
+Middleware ASGI puro: solo intercepta respuestas de error (status >= 400) con
+content-type text/plain; el resto (incluidas las respuestas en streaming) pasa
+sin buffer ni tareas adicionales.
+"""
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _json_message(status_code: int, detail: str, headers=()):
+    """Mensajes ASGI de una respuesta JSON {"detail": ...}."""
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    headers = [
+        (name, value) for name, value in headers
+        if name.lower() not in (b"content-type", b"content-length")
+    ]
+    headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+    return (
+        {"type": "http.response.start", "status": status_code, "headers": headers},
+        {"type": "http.response.body", "body": body},
+    )
+
+
+class JSONErrorMiddleware:
+    """Convertir errores text/plain en JSON y excepciones no manejadas en 500 JSON."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        held_start = None  # http.response.start retenido mientras se lee el cuerpo de error
+        chunks = []
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal held_start, started
+            if message["type"] == "http.response.start":
+                content_type = b""
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value
+                        break
+                if message["status"] >= 400 and b"text/plain" in content_type:
+                    held_start = message
+                    return
+                started = True
+                await send(message)
+                return
+
+            if held_start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            error_text = b"".join(chunks).decode("utf-8", errors="replace")
+            logger.warning("Respuesta text/plain detectada, convirtiendo a JSON: %s", error_text[:100])
+            start, body = _json_message(held_start["status"], error_text, held_start.get("headers", []))
+            started = True
+            await send(start)
+            await send(body)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if started:
+                raise
+            logger.exception("Error en middleware")
+            start, body = _json_message(500, f"Error en middleware: {str(e)}")
+            await send(start)
+            await send(body)
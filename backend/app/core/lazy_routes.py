@@ -0,0 +1,26 @@
+"""
+Carga perezosa de routers (LAZY_ROUTERS) para arranques en frío serverless.
+Middleware ASGI puro que, antes del enrutado, incluye en la aplicación el
+router correspondiente al prefijo de la petición. Las peticiones al esquema
+OpenAPI incluyen todos los routers para documentar la API completa.
+"""
+from app.api.v1 import include_router, include_routers, router_for_path
+
+
+class LazyRouterMiddleware:
+    """Incluir el router de /api/v1/<nombre> la primera vez que se pide una de sus rutas."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            fastapi_app = scope["app"]
+            path = scope["path"]
+            if path == fastapi_app.openapi_url:
+                include_routers(fastapi_app)
+            else:
+                name = router_for_path(path)
+                if name is not None:
+                    include_router(fastapi_app, name)
+        await self.app(scope, receive, send)
@@ -0,0 +1,150 @@
+"""
+Configuración de logging.
+Pipeline no bloqueante (QueueHandler/QueueListener), registros JSON y muestreo
+de los logs por petición de autenticación y de los routers más usados.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+
+# Atributos estándar de LogRecord que no se copian como campos extra
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()) | {"message", "asctime"}
+
+# Loggers que emiten varias líneas por petición autenticada
+AUTH_LOGGERS = ("app.core.security", "app.core.dependencies")
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formateador de registros como una línea JSON por evento."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        # Campos estructurados pasados con extra={...}
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Muestreo por tasa (token bucket) para logs de alto volumen.
+    Deja pasar como máximo `rate` registros por segundo por logger;
+    WARNING y superiores nunca se descartan.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if self.rate <= 0:
+            self.dropped += 1
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.dropped += 1
+            return False
+
+
+class _QueueHandler(QueueHandler):
+    """QueueHandler que no formatea en el hilo de la petición."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # El formateo (incluido json.dumps) ocurre en el hilo del listener.
+        # Solo se resuelven los argumentos para no retener objetos mutables.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _build_output_handlers() -> list[logging.Handler]:
+    """Crear los handlers reales (archivo y consola) que usa el listener."""
+    if settings.LOG_JSON:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if settings.LOG_TO_FILE:
+        backend_dir = Path(__file__).parent.parent.parent
+        log_dir = backend_dir / "logs"
+        try:
+            log_dir.mkdir(exist_ok=True)
+            handlers.append(logging.FileHandler(log_dir / "app.log", encoding='utf-8', mode='a'))
+        except OSError:
+            # Sistemas de archivos de solo lectura (serverless): solo consola
+            pass
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging() -> None:
+    """
+    Configurar el logging de la aplicación.
+    Idempotente: si ya hay handlers en el root logger no hace nada.
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # Niveles por logger, p.ej. {"sqlalchemy.engine": "WARNING"}
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    # Muestreo de los logs por petición: autenticación y LOG_SAMPLE_RATES
+    # (por defecto los routers de cursos y quizzes)
+    rates = {name: settings.LOG_AUTH_SAMPLE_PER_SECOND for name in AUTH_LOGGERS}
+    rates.update(settings.LOG_SAMPLE_RATES)
+    for name, rate in rates.items():
+        logging.getLogger(name).addFilter(RateLimitFilter(rate))
+
+    _listener = QueueListener(log_queue, *_build_output_handlers(), respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Vaciar la cola y detener el listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,239 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus.
+Implementación propia y sin dependencias: contadores e histogramas en memoria
+del proceso, middleware ASGI puro (funciona con uvicorn y con Mangum) y
+métricas del pool de conexiones calculadas en cada lectura de /metrics.
+
+En serverless cada instancia tiene sus propios contadores; Prometheus debe
+sumar por instancia.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Límites (segundos) de los buckets de latencia
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette agrega charset=utf-8
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    """Contador monotónico con etiquetas."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """Valor instantáneo sin etiquetas."""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def collect(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self._value}",
+        ]
+
+
+class Histogram:
+    """Histograma con etiquetas y buckets fijos."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [conteos por bucket (+Inf al final), suma]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        names = self.labelnames + ("le",)
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# ==================== MÉTRICAS ====================
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Peticiones HTTP por método, ruta y código de estado",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latencia de peticiones HTTP por método y ruta",
+    ("method", "route"),
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Peticiones HTTP en curso")
+RAG_STAGE_LATENCY = Histogram(
+    "rag_stage_duration_seconds", "Latencia de cada etapa del pipeline RAG",
+    ("stage",),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Lecturas de la caché de aplicación por tipo y resultado (hit/miss/stale/refresh/wait)",
+    ("kind", "result"),
+)
+
+DB_SESSION_ROUTING = Counter(
+    "db_session_routing_total", "Sesiones entregadas por get_db según destino (primary/replica) y motivo",
+    ("target", "reason"),
+)
+
+QUIZ_AUTOSAVE = Counter(
+    "quiz_autosave_total",
+    "Autoguardado de evaluaciones: peticiones recibidas, intentos escritos y lotes (sentencias UPDATE)",
+    ("event",),
+)
+
+REALTIME_CONNECTIONS = Gauge("realtime_connections", "WebSockets de chat abiertos en el proceso")
+REALTIME_EVENTS = Counter(
+    "realtime_events_total",
+    "Eventos en tiempo real: publicados, recibidos de otros procesos, entregados a sockets y descartados",
+    ("event",),
+)
+
+
+@contextmanager
+def time_rag_stage(stage: str) -> Iterator[None]:
+    """Medir una etapa del pipeline RAG (embedding, retrieval, generation, ...)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        RAG_STAGE_LATENCY.observe(time.perf_counter() - start, stage)
+
+
+def _pool_metrics() -> List[str]:
+    """Estado del pool de conexiones de SQLAlchemy en el momento de la lectura."""
+    from app.core.database import pool_stats
+
+    stats = pool_stats()
+    if stats is None:
+        return []  # Sin peticiones a la base de datos todavía: no crear el pool
+    values = {
+        "db_pool_size": ("gauge", "Tamaño configurado del pool", stats.get("size")),
+        "db_pool_checked_out": ("gauge", "Conexiones prestadas", stats.get("checked_out")),
+        "db_pool_overflow": ("gauge", "Conexiones de overflow abiertas", stats.get("overflow")),
+        "db_pool_checked_in": ("gauge", "Conexiones libres en el pool", stats.get("checked_in")),
+        # Con NullPool cada checkout abre una conexión: connects == checkouts
+        "db_pool_connects_total": ("counter", "Conexiones físicas abiertas", stats["connects"]),
+        "db_pool_checkouts_total": ("counter", "Conexiones entregadas por el pool", stats["checkouts"]),
+    }
+    lines = [
+        "# HELP db_pool_info Estrategia de conexiones activa",
+        "# TYPE db_pool_info gauge",
+        f"db_pool_info{_format_labels(('mode', 'pool_class'), (stats['mode'], stats['pool_class']))} 1",
+    ]
+    for name, (kind, documentation, value) in values.items():
+        if value is None:
+            continue  # NullPool no expone tamaño ni conexiones prestadas
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return lines
+
+
+def render() -> str:
+    """Todas las métricas en formato de exposición de texto de Prometheus."""
+    lines: List[str] = []
+    for metric in (HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT, RAG_STAGE_LATENCY, CACHE_REQUESTS, DB_SESSION_ROUTING,
+                   QUIZ_AUTOSAVE, REALTIME_CONNECTIONS, REALTIME_EVENTS):
+        lines += metric.collect()
+    lines += _pool_metrics()
+    return "\n".join(lines) + "\n"
+
+
+# ==================== MIDDLEWARE ASGI ====================
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro: peticiones en curso, conteo por código de estado y
+    latencia por ruta. La ruta se etiqueta con su plantilla (/courses/{course_id})
+    para no generar una serie por cada ID; las rutas no encontradas usan "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_LATENCY.observe(time.perf_counter() - start, method, route)
@@ -0,0 +1,114 @@
+"""
+Paginación por cursor (keyset) y por offset.
+Cursores opacos codificados en base64 a partir de las columnas de orden.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query
+
+# Cabecera donde se devuelve el cursor de la página siguiente.
+# Se usa una cabecera para no cambiar el cuerpo (lista) de los endpoints existentes.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Codificar los valores de la última fila como cursor opaco."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decodificar un cursor y convertir sus valores al tipo de cada columna.
+    Lanza 400 si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("longitud inválida")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.expression.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+
+def paginate_items(
+    items: Sequence[dict],
+    response: Response,
+    order_column: Any,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> list:
+    """
+    Paginar en memoria una lista ya ordenada de forma ascendente por `order_column`
+    (p.ej. un listado completo servido desde la caché). Misma semántica que paginate().
+    """
+    key = order_column.key
+    if cursor:
+        (boundary,) = decode_cursor(cursor, [order_column])
+        items = [item for item in items if item[key] > boundary]
+    elif skip:
+        items = items[skip:]
+    page = list(items[:limit])
+
+    if page and len(page) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([page[-1][key]])
+    return page
+
+
+def page_query(
+    query: Query,
+    order_columns: Sequence[Any],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Query:
+    """
+    Consulta de una página (sin ejecutar), con orden estable.
+    - Con `cursor`: modo keyset, filtra por (col1, col2, ...) </> valores del cursor e ignora `skip`.
+    - Sin `cursor`: modo offset (compatibilidad hacia atrás).
+    """
+    if cursor:
+        values = decode_cursor(cursor, order_columns)
+        key = tuple_(*order_columns)
+        boundary = tuple_(*values)
+        query = query.filter(key < boundary if descending else key > boundary)
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in order_columns])
+    if not cursor and skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def paginate(
+    query: Query,
+    response: Response,
+    order_columns: Sequence[Any],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> list:
+    """
+    Paginar una consulta con orden estable (ver page_query).
+    Si la página está llena se devuelve el cursor siguiente en X-Next-Cursor.
+    """
+    rows = page_query(query, order_columns, skip=skip, limit=limit, cursor=cursor, descending=descending).all()
+
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, c.key) for c in order_columns])
+    return rows
@@ -0,0 +1,165 @@
+"""
+Instrumentación de consultas SQL por petición.
+Cuenta consultas y tiempo de base de datos, expone los valores en la cabecera
+Server-Timing, detecta patrones N+1 y permite fijar presupuestos de consultas
+por ruta (modo estricto para CI).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Listas de parámetros de longitud variable: IN (?, ?, ?) / IN (%(p1)s, %(p2)s)
+_PARAM_LIST_RE = re.compile(r"\(\s*(?:\?|%\([^)]+\)s|%s|\$\d+)(?:\s*,\s*(?:\?|%\([^)]+\)s|%s|\$\d+))*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceededError(RuntimeError):
+    """Una ruta ejecutó más consultas que su presupuesto (solo en modo estricto)."""
+
+
+@dataclass
+class QueryStats:
+    """Estadísticas de consultas de una petición."""
+    count: int = 0
+    duration: float = 0.0  # segundos
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        """Formas de sentencia que se repiten al menos `threshold` veces."""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalizar una sentencia: espacios y listas de parámetros de longitud variable."""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    return _PARAM_LIST_RE.sub("(?)", shape)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Estadísticas de la petición en curso (None fuera de una petición)."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Contar las consultas ejecutadas dentro del bloque.
+    Útil en scripts y pruebas: `with track_queries() as stats: ...; assert stats.count <= 5`.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# ==================== EVENTOS DE SQLALCHEMY ====================
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Marcar el inicio de la consulta en la conexión."""
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Acumular la consulta en las estadísticas de la petición."""
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def install(engine) -> None:
+    """Registrar los listeners de instrumentación en el engine."""
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+# ==================== MIDDLEWARE ASGI ====================
+
+def _route_key(scope) -> str:
+    """Clave de presupuesto: 'METODO /ruta/{param}' (plantilla de la ruta, no la URL)."""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI puro que activa el conteo de consultas por petición.
+    - Agrega Server-Timing: db;dur=<ms>;desc="<n> queries"
+    - Registra un warning si una misma sentencia se repite >= QUERY_N_PLUS_ONE_THRESHOLD
+    - Con QUERY_BUDGET_STRICT, falla la petición si supera QUERY_BUDGETS[ruta]
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Las consultas del handler ya se ejecutaron (salvo respuestas en streaming)
+                self._check(scope, stats)
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    (
+                        f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+                        f"app;dur={(time.perf_counter() - start) * 1000:.2f}"
+                    ).encode("latin-1"),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+
+    @staticmethod
+    def _check(scope, stats: QueryStats) -> None:
+        route = _route_key(scope)
+        for shape, n in stats.repeated_shapes(settings.QUERY_N_PLUS_ONE_THRESHOLD).items():
+            logger.warning(
+                "⚠️ Posible N+1 en %s: %d ejecuciones de %s",
+                route, n, shape[:300],
+                extra={"route": route, "query_count": stats.count, "repeated": n},
+            )
+
+        budget = settings.QUERY_BUDGETS.get(route)
+        if budget is not None and stats.count > budget:
+            message = f"{route} ejecutó {stats.count} consultas (presupuesto: {budget})"
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceededError(message)
+            logger.warning("⚠️ Presupuesto de consultas excedido: %s", message)
@@ -0,0 +1,49 @@
+"""
+Rate limiting con slowapi, construido en el primer uso.
+slowapi (y limits) se importan solo cuando un router pide el limiter o cuando
+se produce un 429, no en cada arranque. Es opcional en requirements.txt.
+
+Uso en un router:
+    limiter = get_limiter()
+
+    @router.post("/login")
+    @limiter.limit("5/minute")
+    async def login(request: Request, ...): ...
+"""
+import threading
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Limiter global por IP."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                from slowapi import Limiter
+                from slowapi.util import get_remote_address
+
+                _limiter = Limiter(key_func=get_remote_address)
+    return _limiter
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """True si `exc` es el RateLimitExceeded de slowapi (solo posible si el limiter existe)."""
+    if _limiter is None:
+        return False
+    from slowapi.errors import RateLimitExceeded
+
+    return isinstance(exc, RateLimitExceeded)
+
+
+def rate_limit_exceeded_response(request: Request, exc: Exception) -> JSONResponse:
+    """Respuesta 429 de slowapi, con las cabeceras X-RateLimit-* del limiter."""
+    from slowapi import _rate_limit_exceeded_handler
+
+    request.app.state.limiter = get_limiter()
+    return _rate_limit_exceeded_handler(request, exc)
@@ -0,0 +1,324 @@
+"""
+Entrega de eventos en tiempo real por WebSocket (chat).
+
+Cada proceso mantiene un registro de conexiones (usuario -> sockets) y un bus
+de reparto en memoria: un evento se serializa una sola vez y se encola en la
+cola de cada socket del usuario; una tarea escritora por conexión lo envía.
+Un cliente lento no frena al resto: si su cola (REALTIME_QUEUE_SIZE) se llena
+se cierra su conexión y el cliente se reconecta y se pone al día con GET /chat.
+
+Los eventos se publican sobre la sesión de base de datos (publish) y solo se
+entregan si la transacción hace commit (listeners de sesión al final del
+módulo). Propagación entre procesos (REALTIME_BACKEND), para varios workers
+o instancias:
+  - memory:   solo el proceso local (un worker, desarrollo)
+  - postgres: pg_notify en la misma transacción que el mensaje y LISTEN en
+              una conexión dedicada por proceso (REALTIME_DATABASE_URL debe
+              ser una conexión directa: pgbouncer en modo transacción no
+              soporta LISTEN). Los eventos de más de PG_NOTIFY_LIMIT bytes
+              viajan sin su contenido ("truncated": el cliente lo pide por HTTP)
+  - redis:    PUBLISH tras el commit y SUBSCRIBE en REDIS_URL
+El proceso que publica entrega a sus propios sockets directamente y descarta
+su eco del broker. La entrega es best-effort: la fuente de verdad es la base.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import KEY_PREFIX
+from app.core.config import settings
+from app.core.metrics import REALTIME_CONNECTIONS, REALTIME_EVENTS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+PROCESS_ID = uuid.uuid4().hex[:12]  # Origen de los eventos publicados por este proceso
+CHANNEL = f"{KEY_PREFIX}_realtime"  # Canal de LISTEN/NOTIFY y de Redis
+PG_NOTIFY_LIMIT = 7900  # NOTIFY admite payloads de hasta 8000 bytes
+RECONNECT_SECONDS = 2.0
+SLOW_CLIENT_CLOSE_CODE = 1013  # "Try again later"
+
+_PENDING_EVENTS = "realtime_events"
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _backend() -> str:
+    return settings.REALTIME_BACKEND.lower()
+
+
+# ==================== CONEXIONES ====================
+
+class Connection:
+    """WebSocket de un usuario con su cola de salida (solo la tarea escritora envía)."""
+
+    def __init__(self, websocket, user_id: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.REALTIME_QUEUE_SIZE)
+        self.writer: Optional[asyncio.Task] = None
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # Socket cerrado: el endpoint lo quita del registro al recibir la desconexión
+
+    def start(self) -> None:
+        self.writer = asyncio.create_task(self._write())
+
+    def send(self, event_type: str, data: Any = None) -> bool:
+        """Encolar un evento solo para este socket (respuestas a lo que envió el cliente)."""
+        try:
+            self.queue.put_nowait(_dumps({"type": event_type, "data": data}))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def close(self, code: int) -> None:
+        if self.writer is not None:
+            self.writer.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # Ya cerrado por el cliente
+
+
+class Hub:
+    """Registro de conexiones del proceso y reparto local de eventos."""
+
+    def __init__(self):
+        self._connections: Dict[int, Set[Connection]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._redis = None
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(sockets) for sockets in self._connections.values())
+
+    def connect(self, websocket, user_id: int) -> Connection:
+        """Registrar un socket ya aceptado (en el event loop del servidor)."""
+        self._loop = asyncio.get_running_loop()
+        connection = Connection(websocket, user_id)
+        connection.start()
+        self._connections.setdefault(user_id, set()).add(connection)
+        REALTIME_CONNECTIONS.inc()
+        self._ensure_listener()
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        sockets = self._connections.get(connection.user_id)
+        if sockets is not None and connection in sockets:
+            sockets.discard(connection)
+            if not sockets:
+                del self._connections[connection.user_id]
+            REALTIME_CONNECTIONS.dec()
+        if connection.writer is not None:
+            connection.writer.cancel()
+
+    def deliver_local(self, user_ids: Iterable[int], text: str) -> int:
+        """Encolar el evento en los sockets locales de los usuarios (solo desde el event loop)."""
+        delivered = 0
+        for user_id in user_ids:
+            for connection in tuple(self._connections.get(user_id, ())):
+                try:
+                    connection.queue.put_nowait(text)
+                    delivered += 1
+                except asyncio.QueueFull:
+                    REALTIME_EVENTS.inc("dropped")
+                    logger.warning("⚠️ Cliente lento (usuario %s): se cierra su WebSocket", user_id)
+                    self.disconnect(connection)
+                    asyncio.ensure_future(connection.close(SLOW_CLIENT_CLOSE_CODE))
+        if delivered:
+            REALTIME_EVENTS.inc("delivered", amount=delivered)
+        return delivered
+
+    def deliver_threadsafe(self, user_ids: List[int], text: str) -> None:
+        """Reparto local desde cualquier hilo (p.ej. el commit en el threadpool)."""
+        loop = self._loop
+        if loop is None or not self._connections:
+            return  # Sin sockets en este proceso
+        try:
+            if asyncio.get_running_loop() is loop:
+                self.deliver_local(user_ids, text)
+                return
+        except RuntimeError:
+            pass  # Hilo sin event loop
+        try:
+            loop.call_soon_threadsafe(self.deliver_local, user_ids, text)
+        except RuntimeError:
+            pass  # Event loop cerrado (apagado del servidor)
+
+    def receive(self, raw) -> None:
+        """Evento de otro proceso recibido del broker (en el event loop)."""
+        try:
+            envelope = json.loads(raw)
+        except ValueError:
+            logger.warning("⚠️ Evento en tiempo real inválido descartado")
+            return
+        if envelope.get("o") == PROCESS_ID:
+            return  # Eco propio: ya se entregó localmente
+        REALTIME_EVENTS.inc("remote")
+        self.deliver_local(envelope.get("u", ()), _dumps(envelope.get("e")))
+
+    # ==================== BROKER ENTRE PROCESOS ====================
+
+    def _ensure_listener(self) -> None:
+        backend = _backend()
+        if backend not in ("postgres", "redis"):
+            return
+        if self._listener is None or self._listener.done():
+            runner = self._listen_postgres if backend == "postgres" else self._listen_redis
+            self._listener = asyncio.create_task(runner())
+
+    async def _listen_postgres(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+        from sqlalchemy.engine import make_url
+
+        url = make_url(settings.REALTIME_DATABASE_URL or settings.get_database_url()).set(drivername="postgresql")
+        dsn = url.render_as_string(hide_password=False)
+        loop = asyncio.get_running_loop()
+        while True:
+            conn = None
+            try:
+                conn = await loop.run_in_executor(
+                    None,
+                    lambda: psycopg2.connect(dsn, keepalives=1, keepalives_idle=30, keepalives_interval=10,
+                                             keepalives_count=3),
+                )
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                lost = loop.create_future()
+
+                def on_readable():
+                    try:
+                        conn.poll()
+                    except Exception as e:
+                        if not lost.done():
+                            lost.set_exception(e)
+                        return
+                    while conn.notifies:
+                        self.receive(conn.notifies.pop(0).payload)
+
+                loop.add_reader(conn.fileno(), on_readable)
+                logger.info("📡 Escuchando eventos en tiempo real (LISTEN %s)", CHANNEL)
+                try:
+                    await lost
+                finally:
+                    loop.remove_reader(conn.fileno())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("⚠️ LISTEN de tiempo real interrumpido (%s); reintentando", e)
+            finally:
+                if conn is not None:
+                    conn.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def _listen_redis(self) -> None:
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.Redis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                logger.info("📡 Escuchando eventos en tiempo real (Redis %s)", CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.receive(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("⚠️ Suscripción de tiempo real interrumpida (%s); reintentando", e)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    def publish_remote(self, envelope: str) -> None:
+        """PUBLISH en Redis (tras el commit). En PostgreSQL el NOTIFY ya viajó en la transacción."""
+        if _backend() != "redis":
+            return
+        try:
+            if self._redis is None:
+                import redis
+
+                self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5,
+                                                   socket_connect_timeout=0.5)
+            self._redis.publish(CHANNEL, envelope)
+        except Exception as e:
+            logger.warning("⚠️ No se pudo publicar el evento en Redis: %s", e)
+
+    async def stop(self) -> None:
+        """Cerrar el listener y todos los sockets (apagado del servidor)."""
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        for sockets in list(self._connections.values()):
+            for connection in list(sockets):
+                self.disconnect(connection)
+                await connection.close(1001)
+
+
+hub = Hub()
+
+
+# ==================== PUBLICACIÓN TRANSACCIONAL ====================
+
+def _envelope(user_ids: List[int], event_data: Dict[str, Any]) -> str:
+    return _dumps({"o": PROCESS_ID, "u": user_ids, "e": event_data})
+
+
+def publish(db: Session, user_ids: Iterable[int], event_type: str, data: Dict[str, Any]) -> None:
+    """
+    Publicar un evento para los usuarios cuando la transacción de db haga
+    commit (data ya serializable a JSON). Con rollback no se entrega nada.
+    """
+    users = sorted({user_id for user_id in user_ids if user_id is not None})
+    if not users:
+        return
+    event_data = {"type": event_type, "data": data}
+    envelope = _envelope(users, event_data)
+    if _backend() == "postgres":
+        if len(envelope.encode()) > PG_NOTIFY_LIMIT:
+            envelope = _envelope(users, {"type": event_type, "data": {"id": data.get("id")}, "truncated": True})
+        db.execute(select(func.pg_notify(CHANNEL, envelope)))
+    pending: List[Tuple[List[int], str, str]] = db.info.setdefault(_PENDING_EVENTS, [])
+    pending.append((users, _dumps(event_data), envelope))
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_committed_events(session: Session) -> None:
+    for users, text, envelope in session.info.pop(_PENDING_EVENTS, ()):
+        REALTIME_EVENTS.inc("published")
+        hub.deliver_threadsafe(users, text)
+        hub.publish_remote(envelope)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_events(session: Session) -> None:
+    session.info.pop(_PENDING_EVENTS, None)
@@ -0,0 +1,153 @@
+"""
+Enrutado de sesiones entre la base primaria y réplicas de lectura.
+Con DATABASE_REPLICA_URLS configurado, la sesión de get_db elige en su primera
+sentencia (database.RoutingSession) una réplica para las peticiones GET/HEAD y
+la primaria para el resto. Para entonces get_current_user ya dejó el usuario
+del token en request.state. Se usa la primaria aunque la petición sea GET cuando:
+  - el usuario escribió hace menos de READ_AFTER_WRITE_SECONDS (lee lo que escribió)
+  - el retraso de todas las réplicas supera REPLICA_MAX_LAG_SECONDS o no responden
+
+El retraso de cada réplica se consulta como mucho cada REPLICA_LAG_CHECK_SECONDS
+por proceso. Las marcas "usar primaria" se guardan en el backend de la caché de
+aplicación (compartidas entre procesos con CACHE_BACKEND=redis).
+"""
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+from app.core.metrics import DB_SESSION_ROUTING
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# 0 si el servidor no es réplica (pg_is_in_recovery() falso) o ya aplicó todo el WAL recibido
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass
+class Replica:
+    """Réplica de lectura con su último retraso medido."""
+
+    url: str
+    engine: Engine
+    lag_seconds: float = 0.0
+    healthy: bool = True
+    checked_at: float = float("-inf")
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def refresh_lag(self) -> None:
+        """Medir el retraso si la última medición venció (un solo hilo mide a la vez)."""
+        if time.monotonic() - self.checked_at < settings.REPLICA_LAG_CHECK_SECONDS:
+            return
+        if not self.lock.acquire(blocking=False):
+            return  # Otro hilo está midiendo: usar el último valor
+        try:
+            if self.engine.dialect.name == "postgresql":
+                with self.engine.connect() as connection:
+                    self.lag_seconds = float(connection.execute(LAG_QUERY).scalar() or 0)
+            self.healthy = True
+        except Exception as e:
+            logger.warning("⚠️ Réplica no disponible (%s): %s", self.engine.url.host, e)
+            self.healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+            self.lock.release()
+
+    @property
+    def usable(self) -> bool:
+        return self.healthy and self.lag_seconds <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+_replicas: Optional[List[Replica]] = None
+_replicas_lock = threading.Lock()
+_round_robin = itertools.count()
+_pins = None
+
+
+def get_replicas() -> List[Replica]:
+    """Réplicas configuradas, con sus engines creados en el primer uso."""
+    global _replicas
+    if _replicas is None:
+        with _replicas_lock:
+            if _replicas is None:
+                from app.core.database import build_engine
+
+                _replicas = [
+                    Replica(url=url, engine=build_engine(database_url=url))
+                    for url in settings.DATABASE_REPLICA_URLS
+                ]
+    return _replicas
+
+
+def _pin_store():
+    """Backend donde se guardan las marcas (el de la caché, o memoria si está deshabilitada)."""
+    global _pins
+    if _pins is None:
+        from app.core.cache import MemoryBackend, cache
+
+        _pins = cache.backend or MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    return _pins
+
+
+def _pin_key(user_id) -> str:
+    from app.core.cache import TenantCache
+
+    return TenantCache.key(None, "primary_pin", user_id)
+
+
+def pin_to_primary(user_id) -> None:
+    """Enviar las lecturas de `user_id` a la primaria durante READ_AFTER_WRITE_SECONDS."""
+    if settings.DATABASE_REPLICA_URLS and user_id is not None and settings.READ_AFTER_WRITE_SECONDS > 0:
+        ttl = settings.READ_AFTER_WRITE_SECONDS
+        _pin_store().put(_pin_key(user_id), b"1", time.time() + ttl, ttl)
+
+
+def is_pinned(user_id) -> bool:
+    return user_id is not None and _pin_store().get(_pin_key(user_id)) is not None
+
+
+def request_user_id(connection: HTTPConnection) -> Optional[int]:
+    """Usuario que get_current_user ya obtuvo del token en esta petición (None: anónima)."""
+    return getattr(connection.state, "user_id", None)
+
+
+def choose_replica(connection: HTTPConnection) -> Optional[Engine]:
+    """
+    Engine de réplica para esta petición, o None si debe usar la primaria.
+    Las peticiones que escriben marcan al usuario para leer de la primaria.
+    """
+    replicas = get_replicas()
+    if not replicas:
+        return None
+
+    user_id = request_user_id(connection)
+    if connection.scope.get("method", "GET") not in SAFE_METHODS or connection.scope["type"] != "http":
+        pin_to_primary(user_id)
+        DB_SESSION_ROUTING.inc("primary", "write")
+        return None
+    if is_pinned(user_id):
+        DB_SESSION_ROUTING.inc("primary", "read_after_write")
+        return None
+
+    start = next(_round_robin)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        replica.refresh_lag()
+        if replica.usable:
+            DB_SESSION_ROUTING.inc("replica", "read")
+            return replica.engine
+    DB_SESSION_ROUTING.inc("primary", "replica_lag")
+    return None
@@ -2,10 +2,14 @@
 Utilidades de seguridad.
 JWT, hash de contraseñas, validación de tokens y sanitización.
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.exceptions import PasswordHashingBusyError
+import asyncio
+import threading
 import bleach
 import bcrypt
 
@@ -42,6 +46,58 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+# Pool dedicado para bcrypt (~250 ms de CPU por operación).
+# bcrypt libera el GIL, por lo que un pool de hilos basta para no bloquear el event loop.
+# Se crea de forma perezosa para no pagar el costo en cada arranque serverless.
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_slots: Optional[threading.BoundedSemaphore] = None
+_password_pool_lock = threading.Lock()
+
+
+def _get_password_pool() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    """Obtener (creando si es necesario) el pool de hashing y su semáforo de capacidad."""
+    global _password_executor, _password_slots
+    if _password_executor is None:
+        with _password_pool_lock:
+            if _password_executor is None:
+                workers = max(1, settings.PASSWORD_HASH_WORKERS)
+                # Capacidad total = operaciones en ejecución + operaciones en cola
+                _password_slots = threading.BoundedSemaphore(workers + max(0, settings.PASSWORD_HASH_MAX_QUEUE))
+                _password_executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="password-hash"
+                )
+    return _password_executor, _password_slots
+
+
+async def _run_in_password_pool(func, *args):
+    """
+    Ejecutar una operación bcrypt en el pool dedicado.
+    Falla inmediatamente con PasswordHashingBusyError si la cola está llena.
+    """
+    executor, slots = _get_password_pool()
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusyError("Servicio de autenticación saturado, intente nuevamente")
+    try:
+        future = executor.submit(func, *args)
+    except Exception:
+        slots.release()
+        raise
+    # Liberar el cupo cuando termine el hilo, aunque la petición se cancele antes
+    future.add_done_callback(lambda _: slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verificar contraseña sin bloquear el event loop."""
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generar hash de contraseña sin bloquear el event loop."""
+    return await _run_in_password_pool(get_password_hash, password)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Crear token JWT de acceso.
@@ -73,15 +129,16 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     logger = logging.getLogger(__name__)
     
     try:
-        logger.info(f"🔍 Intentando decodificar token. SECRET_KEY length: {len(settings.SECRET_KEY) if settings.SECRET_KEY else 0}, ALGORITHM: {settings.ALGORITHM}")
+        # Formato perezoso: el mensaje solo se construye si el registro pasa el muestreo
+        logger.debug("🔍 Intentando decodificar token. ALGORITHM: %s", settings.ALGORITHM)
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        logger.info(f"✅ Token decodificado exitosamente. Payload keys: {list(payload.keys())}")
+        logger.info("✅ Token decodificado exitosamente. Payload keys: %s", list(payload.keys()))
         return payload
     except JWTError as e:
-        logger.error(f"❌ Error JWT al decodificar token: {type(e).__name__}: {str(e)}")
+        logger.error("❌ Error JWT al decodificar token: %s: %s", type(e).__name__, e)
         return None
     except Exception as e:
-        logger.error(f"❌ Error inesperado al decodificar token: {type(e).__name__}: {str(e)}")
+        logger.error("❌ Error inesperado al decodificar token: %s: %s", type(e).__name__, e)
         return None
 
 
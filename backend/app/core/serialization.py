@@ -0,0 +1,54 @@
+"""
+Serialización rápida de listas para endpoints de listado.
+Valida las filas ORM una sola vez con un TypeAdapter de Pydantic v2
+(from_attributes) y serializa con orjson, devolviendo la respuesta ya
+construida para que FastAPI no vuelva a validar contra el response_model.
+
+orjson es opcional: si no está instalado se usa TypeAdapter.dump_json.
+"""
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Type, Union
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter de List[schema], construido una vez por esquema."""
+    return TypeAdapter(List[schema])
+
+
+def _forward_headers(response: Optional[Response]) -> dict:
+    """Cabeceras fijadas por el endpoint en el Response inyectado (p.ej. X-Next-Cursor)."""
+    if response is None:
+        return {}
+    return {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+
+
+def list_response(
+    rows: Sequence[Any],
+    schema: Type[BaseModel],
+    response: Optional[Response] = None,
+) -> Union[Sequence[Any], Response]:
+    """
+    Construir la respuesta de un listado.
+    Con FAST_JSON_RESPONSES desactivado retorna las filas tal cual (ruta estándar de FastAPI).
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return rows
+
+    adapter = _list_adapter(schema)
+    items = adapter.validate_python(rows, from_attributes=True)
+    headers = _forward_headers(response)
+    if orjson is not None:
+        return ORJSONResponse(adapter.dump_python(items), headers=headers)
+    return Response(adapter.dump_json(items), media_type="application/json", headers=headers)
@@ -1,13 +1,21 @@
 """
 Cliente de Supabase para backend.
 Usa Service Key para operaciones administrativas.
+
+El cliente se construye en el primer uso (get_supabase()), no al importar el
+módulo: el paquete supabase y sus dependencias HTTP no se cargan en cada
+arranque en frío.
 """
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional
 from app.core.config import settings
+import threading
 import warnings
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     """
     Crear y retornar cliente de Supabase con Service Key.
     
@@ -31,8 +39,10 @@ def get_supabase_client() -> Client:
             "⚠️ IMPORTANTE: Service Key solo debe usarse en backend, nunca en frontend."
         )
     
+    from supabase import create_client
+
     # Crear cliente con Service Key (para operaciones administrativas)
-    supabase: Client = create_client(
+    supabase: "Client" = create_client(
         settings.SUPABASE_URL,
         settings.SUPABASE_SERVICE_KEY
     )
@@ -40,12 +50,34 @@ def get_supabase_client() -> Client:
     return supabase
 
 
-# Cliente global (se crea al importar el módulo)
-try:
-    supabase = get_supabase_client()
-except ValueError as e:
-    # En desarrollo, permitir que el cliente no se cree si faltan variables
-    # pero mostrar advertencia
-    warnings.warn(f"⚠️ Cliente de Supabase no inicializado: {e}")
-    supabase = None
+# Cliente global (se crea en el primer uso)
+_supabase: Optional["Client"] = None
+_supabase_initialized = False
+_supabase_lock = threading.Lock()
+
+
+def get_supabase() -> Optional["Client"]:
+    """
+    Cliente global de Supabase, creado una sola vez.
+    Retorna None si faltan variables de entorno (se muestra una advertencia).
+    """
+    global _supabase, _supabase_initialized
+    if not _supabase_initialized:
+        with _supabase_lock:
+            if not _supabase_initialized:
+                try:
+                    _supabase = get_supabase_client()
+                except ValueError as e:
+                    # En desarrollo, permitir que el cliente no se cree si faltan variables
+                    # pero mostrar advertencia
+                    warnings.warn(f"⚠️ Cliente de Supabase no inicializado: {e}")
+                    _supabase = None
+                _supabase_initialized = True
+    return _supabase
+
 
+def __getattr__(name: str):
+    # Compatibilidad con `from app.core.supabase_client import supabase`
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
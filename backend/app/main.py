@@ -5,43 +5,25 @@ Configuración de la aplicación, middleware, CORS y rutas principales.
 from fastapi import FastAPI, Request, status, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-import uvicorn
+import hmac
 import traceback
 import logging
-from pathlib import Path
 
 from app.core.config import settings
+from app.core.logging_config import setup_logging
 
-# Configurar logging para escribir en archivo
-# Obtener la ruta absoluta del directorio backend
-backend_dir = Path(__file__).parent.parent
-log_dir = backend_dir / "logs"
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / "app.log"
-
-# Configurar el logger solo si no está ya configurado
-if not logging.getLogger().handlers:
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8', mode='a'),
-            logging.StreamHandler()  # También mostrar en consola
-        ]
-    )
+# Configurar logging no bloqueante (cola + listener en segundo plano)
+setup_logging()
 
 logger = logging.getLogger(__name__)
-logger.info(f"Logging configurado. Archivo de log: {log_file}")
-from app.core.database import engine, Base
-from app.api.v1 import api_router
-
-# Inicializar rate limiter
-limiter = Limiter(key_func=get_remote_address)
+logger.info("Logging configurado")
+from app.core.exceptions import PasswordHashingBusyError
+from app.core.json_errors import JSONErrorMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core import metrics, rate_limit
+from app.api.v1 import include_routers
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -53,10 +35,6 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
-# Configurar rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # Configurar CORS - Permitir todos los orígenes en desarrollo
 # IMPORTANTE: En desarrollo, permitir todos los orígenes para facilitar el desarrollo
 if settings.DEBUG or settings.ENVIRONMENT == "development":
@@ -92,45 +70,21 @@ app.add_middleware(
     max_age=3600,
 )
 
-# Middleware para asegurar que todas las respuestas sean JSON
-@app.middleware("http")
-async def ensure_json_response(request: Request, call_next):
-    """Middleware para asegurar que todas las respuestas tengan content-type JSON."""
-    try:
-        response = await call_next(request)
-        # Si la respuesta es un error (status >= 400) y tiene content-type text/plain, forzar JSON
-        content_type = response.headers.get("content-type", "")
-        if response.status_code >= 400 and "text/plain" in content_type:
-            # Leer el cuerpo de la respuesta usando response.body si está disponible
-            try:
-                # Para respuestas de Starlette, necesitamos leer el body de manera diferente
-                if hasattr(response, 'body'):
-                    error_text = response.body.decode("utf-8") if isinstance(response.body, bytes) else str(response.body)
-                else:
-                    # Si no tiene body, usar el status text
-                    error_text = "Internal Server Error"
-                
-                print(f"[WARNING] Respuesta text/plain detectada, convirtiendo a JSON: {error_text[:100]}")
-                return JSONResponse(
-                    status_code=response.status_code,
-                    content={"detail": error_text}
-                )
-            except Exception as e:
-                print(f"[WARNING] Error al convertir respuesta a JSON: {e}")
-                # Si falla, devolver error genérico en JSON
-                return JSONResponse(
-                    status_code=response.status_code,
-                    content={"detail": "Error en el servidor"}
-                )
-        return response
-    except Exception as e:
-        # Si hay un error en el middleware, devolver JSON
-        error_trace = traceback.format_exc()
-        print(f"[ERROR] Error en middleware: {error_trace}")
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={"detail": f"Error en middleware: {str(e)}"}
-        )
+# Routers de /api/v1: en serverless se importan en la primera petición a su prefijo
+if settings.LAZY_ROUTERS:
+    from app.core.lazy_routes import LazyRouterMiddleware
+
+    app.add_middleware(LazyRouterMiddleware)
+else:
+    include_routers(app)
+
+# Middleware para asegurar que las respuestas de error sean JSON (ASGI puro, no
+# bufferiza ni rompe respuestas en streaming)
+app.add_middleware(JSONErrorMiddleware)
+
+# Conteo de consultas SQL por petición (Server-Timing y detección de N+1)
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
 
 # Middleware de seguridad - Deshabilitar en desarrollo para evitar problemas con CORS
 # En desarrollo, no usar TrustedHostMiddleware para evitar conflictos con CORS
@@ -140,6 +94,11 @@ if not (settings.DEBUG or settings.ENVIRONMENT == "development"):
         allowed_hosts=settings.ALLOWED_HOSTS
     )
 
+# Métricas por ruta (peticiones, latencia, en curso); se agrega al final para
+# ser el más externo y medir todo (el último middleware agregado envuelve al resto)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Handler para errores de validación (debe ir ANTES del handler general)
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -167,6 +126,25 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content={"detail": detail}
     )
 
+# Handler para 429: el limiter de slowapi se construye en su primer uso
+# (app.core.rate_limit), por eso no se registra su excepción por clase
+@app.exception_handler(status.HTTP_429_TOO_MANY_REQUESTS)
+async def rate_limit_exceeded_handler(request: Request, exc: Exception):
+    """Respuesta de slowapi para RateLimitExceeded; el resto de 429 como HTTPException."""
+    if rate_limit.is_rate_limit_error(exc):
+        return rate_limit.rate_limit_exceeded_response(request, exc)
+    return await http_exception_handler(request, exc)
+
+# Handler para saturación del pool de hashing de contraseñas
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusyError):
+    """Responder 503 rápido cuando el pool de bcrypt está lleno."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
 # Handler global de excepciones para asegurar que siempre se devuelva JSON
 # Este debe ir DESPUÉS de los handlers específicos
 @app.exception_handler(Exception)
@@ -194,10 +172,6 @@ async def global_exception_handler(request: Request, exc: Exception):
             content={"detail": "Error interno del servidor"}
         )
 
-# Incluir routers
-app.include_router(api_router, prefix="/api/v1")
-
-
 @app.on_event("startup")
 async def startup_event():
     """Eventos de inicio de la aplicación."""
@@ -207,6 +181,25 @@ async def startup_event():
     pass
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Cerrar los WebSockets de chat y el listener de eventos en tiempo real, y
+    volcar el autoguardado pendiente en memoria (AUTOSAVE_BACKEND=memory).
+    """
+    import sys
+    from starlette.concurrency import run_in_threadpool
+    
+    # Solo si algún WebSocket llegó a abrirse (el módulo se importa con el router de chat)
+    realtime = sys.modules.get("app.core.realtime")
+    if realtime is not None:
+        await realtime.hub.stop()
+    
+    autosave = sys.modules.get("app.services.autosave")
+    if autosave is not None and isinstance(autosave.buffer, autosave.MemoryBuffer):
+        await run_in_threadpool(autosave.flush_in_background)
+
+
 @app.get("/")
 async def root():
     """Endpoint raíz de la API."""
@@ -223,7 +216,30 @@ async def health_check():
     return {"status": "healthy"}
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint(request: Request):
+        """
+        Métricas en formato de texto de Prometheus. Requiere METRICS_TOKEN
+        (Authorization: Bearer <token>); sin token configurado solo responde en
+        desarrollo, para no exponer rutas, saturación del pool ni tasas de error.
+        """
+        if settings.METRICS_TOKEN:
+            scheme, _, token = request.headers.get("authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token de métricas requerido",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        elif settings.ENVIRONMENT != "development":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+        return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
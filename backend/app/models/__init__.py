@@ -5,9 +5,9 @@ Importaciones centralizadas de todos los modelos.
 from app.models.user import User, Profile
 from app.models.company import Company
 from app.models.course import Course, Module, ModuleContent, Enrollment
-from app.models.quiz import Quiz, Question, Attempt, Answer
+from app.models.quiz import Quiz, Question, Attempt, Answer, QuizStats, QuestionItemStats, QuizIrtModel
 from app.models.document import Document
-from app.models.chat import ChatMessage, ChatLog
+from app.models.chat import ChatMessage, Conversation, ConversationParticipant, ChatLog
 from app.models.event import Event
 from app.models.notification import Notification
 
@@ -23,8 +23,13 @@ __all__ = [
     "Question",
     "Attempt",
     "Answer",
+    "QuizStats",
+    "QuestionItemStats",
+    "QuizIrtModel",
     "Document",
     "ChatMessage",
+    "Conversation",
+    "ConversationParticipant",
     "ChatLog",
     "Event",
     "Notification",
@@ -2,7 +2,7 @@
 Modelos de chat.
 Chat tradicional y logs de chat con IA.
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -11,6 +11,13 @@ from app.core.database import Base
 class ChatMessage(Base):
     """Modelo de mensaje de chat tradicional."""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Paginación keyset por remitente/destinatario ordenada por (created_at, id)
+        Index("idx_chat_messages_sender_created_id", "sender_id", "created_at", "id"),
+        Index("idx_chat_messages_receiver_created_id", "receiver_id", "created_at", "id"),
+        # Conversación entre dos usuarios (filtro por par sender/receiver)
+        Index("idx_chat_messages_pair_created", "sender_id", "receiver_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -23,9 +30,55 @@ class ChatMessage(Base):
     user = relationship("User", back_populates="chat_messages", foreign_keys=[sender_id])
 
 
+class Conversation(Base):
+    """
+    Conversación entre dos usuarios (o grupo) con el último mensaje
+    desnormalizado, mantenida en la misma transacción que cada mensaje
+    (app.services.conversations).
+    """
+    __tablename__ = "conversations"
+    __table_args__ = (
+        # Una conversación directa por par (user_a_id <= user_b_id); en grupos ambos son NULL
+        Index("uq_conversations_pair", "user_a_id", "user_b_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False, default="direct", server_default="direct")  # direct, group
+    user_a_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_b_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    last_message_id = Column(Integer, ForeignKey("chat_messages.id", ondelete="SET NULL"), nullable=True)
+    last_activity = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relaciones
+    last_message = relationship("ChatMessage", foreign_keys=[last_message_id])
+    participants = relationship("ConversationParticipant", back_populates="conversation", cascade="all, delete-orphan")
+
+
+class ConversationParticipant(Base):
+    """Participante de una conversación con su contador de mensajes no leídos."""
+    __tablename__ = "conversation_participants"
+    __table_args__ = (
+        # Bandeja de entrada: WHERE user_id = ? ORDER BY last_activity DESC, conversation_id DESC
+        Index("idx_conversation_participants_inbox", "user_id", "last_activity", "conversation_id"),
+    )
+    
+    conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # Copia para el índice
+    
+    # Relaciones
+    conversation = relationship("Conversation", back_populates="participants")
+
+
 class ChatLog(Base):
     """Modelo de log de chat con IA (RAG)."""
     __tablename__ = "chat_logs"
+    __table_args__ = (
+        # Historial RAG: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("idx_chat_logs_user_created_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
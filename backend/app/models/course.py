@@ -2,7 +2,7 @@
 Modelos de cursos y módulos.
 Gestión de cursos, módulos, contenidos e inscripciones.
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Float, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -30,6 +30,9 @@ class Course(Base):
 class Module(Base):
     """Modelo de módulo dentro de un curso."""
     __tablename__ = "modules"
+    __table_args__ = (
+        Index("idx_modules_course_order", "course_id", "order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
@@ -49,6 +52,9 @@ class Module(Base):
 class ModuleContent(Base):
     """Modelo de contenido dentro de un módulo."""
     __tablename__ = "module_contents"
+    __table_args__ = (
+        Index("idx_module_contents_module_order", "module_id", "order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     module_id = Column(Integer, ForeignKey("modules.id"), nullable=False)
@@ -57,6 +63,7 @@ class ModuleContent(Base):
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
     order = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relaciones
     module = relationship("Module", back_populates="contents")
@@ -66,6 +73,10 @@ class ModuleContent(Base):
 class Enrollment(Base):
     """Modelo de inscripción de usuario a curso."""
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # Verificación de inscripción duplicada en enroll_in_course
+        UniqueConstraint("user_id", "course_id", name="enrollments_user_id_course_id_key"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
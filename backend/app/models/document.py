@@ -2,7 +2,7 @@
 Modelo de documentos.
 Gestión de documentos, procesamiento y embeddings.
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,10 @@ from app.core.enums import DocumentType
 class Document(Base):
     """Modelo de documento procesado."""
     __tablename__ = "documents"
+    __table_args__ = (
+        # Paginación keyset: WHERE company_id = ? ORDER BY id
+        Index("idx_documents_company_id_id", "company_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -2,7 +2,7 @@
 Modelo de eventos del calendario.
 Gestión de eventos, sesiones y recordatorios.
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,10 @@ from app.core.enums import EventType
 class Event(Base):
     """Modelo de evento del calendario."""
     __tablename__ = "events"
+    __table_args__ = (
+        # Calendario: WHERE company_id = ? AND start_time >= ? ORDER BY start_time
+        Index("idx_events_company_start", "company_id", "start_time"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -2,7 +2,7 @@
 Modelo de notificaciones.
 Sistema de notificaciones push y correo.
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, Enum as SQLEnum, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,16 @@ from app.core.enums import NotificationType
 class Notification(Base):
     """Modelo de notificación."""
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Paginación keyset: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("idx_notifications_user_created_id", "user_id", "created_at", "id"),
+        # Listado de no leídas (unread_only): índice parcial, solo filas con is_read = false
+        Index(
+            "idx_notifications_user_unread_created",
+            "user_id", text("created_at DESC"), text("id DESC"),
+            postgresql_where=text("is_read = false")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -2,9 +2,11 @@
 Modelos de evaluaciones y cuestionarios.
 Gestión de quizzes, preguntas, intentos y respuestas.
 """
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Float, Integer as SQLInteger
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Float, JSON, Index, Integer as SQLInteger
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
+from app.core.cache import invalidate_answer_key, invalidate_quiz
 from app.core.database import Base
 
 
@@ -18,6 +20,7 @@ class Quiz(Base):
     description = Column(Text, nullable=True)
     passing_score = Column(Float, default=18.0)  # 18/20 para aprobar
     total_questions = Column(SQLInteger, default=20)
+    pool_size = Column(SQLInteger, nullable=True)  # Preguntas al azar del banco por intento (None: todas, en orden)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -26,6 +29,8 @@ class Quiz(Base):
     module = relationship("Module", back_populates="quizzes")
     questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan")
     attempts = relationship("Attempt", back_populates="quiz")
+    stats = relationship("QuizStats", back_populates="quiz", uselist=False, cascade="all, delete-orphan")
+    irt_model = relationship("QuizIrtModel", back_populates="quiz", uselist=False, cascade="all, delete-orphan")
 
 
 class Question(Base):
@@ -40,16 +45,24 @@ class Question(Base):
     options = Column(Text, nullable=True)  # JSON string para opciones múltiples
     points = Column(Float, default=1.0)
     order = Column(Integer, default=0)
+    # Umbrales de calificación por pregunta (None: configuración global; ver app.services.grading)
+    fuzzy_threshold = Column(Float, nullable=True)  # Similitud mínima por distancia de edición
+    semantic_threshold = Column(Float, nullable=True)  # Similitud coseno mínima de embeddings
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relaciones
     quiz = relationship("Quiz", back_populates="questions")
     answers = relationship("Answer", back_populates="question")
+    item_stats = relationship("QuestionItemStats", back_populates="question", uselist=False, cascade="all, delete-orphan")
 
 
 class Attempt(Base):
     """Modelo de intento de evaluación."""
     __tablename__ = "attempts"
+    __table_args__ = (
+        # Sesión en curso del usuario en un quiz (reanudar tras cerrar el navegador)
+        Index("idx_attempts_user_quiz_completed", "user_id", "quiz_id", "completed_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -58,6 +71,13 @@ class Attempt(Base):
     is_passed = Column(Boolean, default=False)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    mode = Column(String, nullable=False, default="fixed", server_default="fixed")  # fixed, adaptive
+    theta = Column(Float, nullable=True)  # Habilidad estimada (modo adaptativo)
+    theta_se = Column(Float, nullable=True)  # Error estándar de theta
+    adaptive_state = Column(JSON, nullable=True)  # Posterior sobre la grilla y pregunta pendiente
+    draft_answers = Column(JSON, nullable=True)  # Autoguardado del intento en curso {question_id: respuesta}
+    draft_saved_at = Column(DateTime(timezone=True), nullable=True)
+    question_ids = Column(JSON, nullable=True)  # Preguntas servidas, en orden (quiz con banco; None: todas)
     
     # Relaciones
     user = relationship("User", back_populates="attempts")
@@ -81,3 +101,116 @@ class Answer(Base):
     attempt = relationship("Attempt", back_populates="answers")
     question = relationship("Question", back_populates="answers")
 
+
+class QuizStats(Base):
+    """
+    Agregados de intentos por quiz, actualizados en la misma transacción que
+    cada intento (app.services.quiz_stats). Permiten calcular tasa de
+    aprobación, media, desviación estándar, histograma y ranking sin recorrer
+    la tabla attempts.
+    """
+    __tablename__ = "quiz_stats"
+    
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sq_sum = Column(Float, nullable=False, default=0.0)  # Suma de cuadrados (varianza)
+    min_score = Column(Float, nullable=True)
+    max_score = Column(Float, nullable=True)
+    histogram = Column(JSON, nullable=False, default=list)  # Conteo por tramo de 2 puntos sobre 20
+    top_scores = Column(JSON, nullable=False, default=list)  # Mejor intento de los primeros usuarios
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relaciones
+    quiz = relationship("Quiz", back_populates="stats")
+
+
+class QuestionItemStats(Base):
+    """
+    Análisis de ítems (teoría clásica de tests) por pregunta, calculado por el
+    job por lotes scripts/run_item_analysis.py (app.services.item_analysis).
+    """
+    __tablename__ = "question_item_stats"
+    __table_args__ = (
+        # Lectura de todas las preguntas de un quiz para el instructor
+        Index("idx_question_item_stats_quiz", "quiz_id"),
+    )
+    
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    response_count = Column(Integer, nullable=False, default=0)
+    difficulty = Column(Float, nullable=True)  # Índice p: proporción de aciertos
+    discrimination = Column(Float, nullable=True)  # Punto-biserial corregida (ítem vs resto del test)
+    distractors = Column(JSON, nullable=False, default=list)  # Frecuencia de cada opción elegida
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relaciones
+    question = relationship("Question", back_populates="item_stats")
+
+
+class QuizIrtModel(Base):
+    """
+    Calibración IRT de 2 parámetros de las preguntas de un quiz, ajustada fuera
+    de línea por scripts/fit_irt_models.py (app.services.adaptive). Incluye la
+    tabla de información precalculada: para cada punto de la grilla de
+    habilidad, las preguntas ordenadas de más a menos informativa.
+    """
+    __tablename__ = "quiz_irt_models"
+    
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    theta_grid = Column(JSON, nullable=False)  # Puntos de habilidad (ascendentes)
+    items = Column(JSON, nullable=False)  # {question_id: [discriminación a, dificultad b]}
+    ranking = Column(JSON, nullable=False)  # Por punto de la grilla: question_ids por información
+    expected_score = Column(JSON, nullable=False)  # Fracción de puntos esperada en cada punto
+    response_count = Column(Integer, nullable=False, default=0)
+    iterations = Column(Integer, nullable=False, default=0)
+    fitted_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relaciones
+    quiz = relationship("Quiz", back_populates="irt_model")
+
+
+# ==================== INVALIDACIÓN DE CACHÉ ====================
+# Cualquier cambio ORM en preguntas o quizzes (endpoints, scripts, admin)
+# invalida la clave de respuestas del motor de calificación (y, si cambió el
+# quiz, el quiz cacheado de su módulo) después del commit; un rollback las deja
+# intactas. Los listeners viven junto a los modelos para estar activos en todo
+# proceso que los use. La invalidación llega a los workers de la API solo con
+# CACHE_BACKEND=redis (con memoria, cada proceso invalida su propia caché).
+# Los borrados/updates masivos (query.delete()/update()) no pasan por el
+# flush: llamar a invalidate_answer_key / invalidate_quiz explícitamente.
+
+_PENDING_KEY = "answer_keys_to_invalidate"
+_PENDING_MODULES = "quiz_modules_to_invalidate"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_quizzes(session: Session, flush_context, instances) -> None:
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    modules = session.info.setdefault(_PENDING_MODULES, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Question):
+            # Incluye el quiz anterior si la pregunta se movió de quiz
+            history = inspect(obj).attrs.quiz_id.history
+            pending.update(q for q in (obj.quiz_id, *history.deleted) if q is not None)
+        elif isinstance(obj, Quiz):
+            if obj.id is not None:
+                pending.add(obj.id)
+            # Un quiz nuevo reemplaza un "sin quiz" cacheado; incluye el módulo anterior si se movió
+            history = inspect(obj).attrs.module_id.history
+            modules.update(m for m in (obj.module_id, *history.deleted) if m is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_quizzes(session: Session) -> None:
+    for quiz_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_answer_key(quiz_id)
+    for module_id in session.info.pop(_PENDING_MODULES, ()):
+        invalidate_quiz(module_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_quizzes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_PENDING_MODULES, None)
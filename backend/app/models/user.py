@@ -2,7 +2,7 @@
 Modelos de usuario y perfil.
 Gestión de usuarios, autenticación y perfiles extendidos.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,10 @@ from app.core.enums import Role
 class User(Base):
     """Modelo de usuario para autenticación."""
     __tablename__ = "users"
+    __table_args__ = (
+        # Paginación keyset: WHERE company_id = ? ORDER BY id
+        Index("idx_users_company_id_id", "company_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
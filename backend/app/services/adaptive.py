@@ -0,0 +1,276 @@
+"""
+Modo adaptativo de evaluaciones (teoría de respuesta al ítem, modelo 2PL).
+
+Fuera de línea (scripts/fit_irt_models.py, requiere NumPy):
+  fit_quiz ajusta la discriminación (a) y la dificultad (b) de cada pregunta
+  con máxima verosimilitud marginal (EM con cuadratura sobre una grilla de
+  habilidad) a partir de las respuestas históricas, y precalcula la tabla de
+  información: para cada punto de la grilla, las preguntas ordenadas por
+  información de Fisher a²·P·(1-P), además de la curva característica del test
+  (fracción de puntos esperada en cada punto) para calificar.
+
+En línea (endpoints /quizzes/attempt/..., Python puro, sin reajustar nada):
+  la posterior de la habilidad se guarda en el intento como log-densidad sobre
+  la grilla; cada respuesta la actualiza en O(puntos de la grilla), la
+  siguiente pregunta se busca con bisect en la grilla (O(log n)) y se toma la
+  primera no servida de la fila precalculada.
+"""
+import bisect
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.models.quiz import Question, QuizIrtModel
+from app.services import item_analysis
+from app.services.grading import MAX_SCORE
+
+GRID_POINTS = 41
+GRID_LIMIT = 4.0  # Grilla de habilidad en [-4, 4] (escala normal estándar)
+MIN_RESPONSES = 30  # Respuestas mínimas para calibrar una pregunta
+MIN_QUESTIONS = 5  # Preguntas mínimas antes de aplicar el criterio de error
+TARGET_SE = 0.4  # Se detiene cuando el error estándar de theta baja de aquí (fiabilidad ≈ 0.84)
+
+# Ajuste EM
+MAX_ITERATIONS = 200
+TOLERANCE = 1e-6  # Cambio relativo de la log-verosimilitud para converger
+NEWTON_STEPS = 3  # Pasos de Newton por pregunta en cada paso M
+PRIOR_WEIGHT = 0.5  # Regularización leve hacia a=1, b=0 (preguntas con pocos datos)
+A_RANGE = (0.1, 4.0)
+B_RANGE = (-GRID_LIMIT, GRID_LIMIT)
+
+
+def theta_grid() -> List[float]:
+    step = 2 * GRID_LIMIT / (GRID_POINTS - 1)
+    return [-GRID_LIMIT + i * step for i in range(GRID_POINTS)]
+
+
+# ==================== AJUSTE FUERA DE LÍNEA ====================
+
+def fit_2pl(x, m, grid: Sequence[float], max_iterations: int = MAX_ITERATIONS):
+    """
+    Ajuste 2PL por EM (Bock-Aitkin) de todas las preguntas a la vez.
+    x, m: matrices intentos x preguntas de aciertos y de respuestas presentes.
+    Retorna (a, b, iteraciones, log-verosimilitud).
+    """
+    np = item_analysis.require_numpy()
+    q = np.asarray(grid, dtype=np.float64)
+    log_prior = -0.5 * q ** 2
+    log_prior -= np.logaddexp.reduce(log_prior)
+    miss = m - x
+
+    # Inicio: a=1 y el intercepto desde la proporción de aciertos
+    p = np.clip(x.sum(axis=0) / np.maximum(m.sum(axis=0), 1), 0.02, 0.98)
+    a = np.ones(x.shape[1])
+    c = np.log(p / (1 - p))  # logit P = a·theta + c  (b = -c / a)
+    previous, iteration = -np.inf, 0
+    for iteration in range(1, max_iterations + 1):
+        # Paso E: posterior de cada intento sobre la grilla
+        z = np.outer(q, a) + c
+        log_p, log_q = -np.logaddexp(0, -z), -np.logaddexp(0, z)
+        joint = x @ log_p.T + miss @ log_q.T + log_prior
+        norm = np.logaddexp.reduce(joint, axis=1)
+        posterior = np.exp(joint - norm[:, None])
+        loglik = float(norm.sum())
+        r = posterior.T @ x  # Aciertos esperados por punto y pregunta
+        n = posterior.T @ m  # Respuestas esperadas por punto y pregunta
+
+        # Paso M: regresión logística ponderada por pregunta (Newton 2x2 vectorizado)
+        for _ in range(NEWTON_STEPS):
+            prob = 1 / (1 + np.exp(-(np.outer(q, a) + c)))
+            residual = r - n * prob
+            weight = n * prob * (1 - prob)
+            g_a = (residual * q[:, None]).sum(axis=0) - PRIOR_WEIGHT * (a - 1)
+            g_c = residual.sum(axis=0) - PRIOR_WEIGHT * c
+            h_aa = (weight * (q ** 2)[:, None]).sum(axis=0) + PRIOR_WEIGHT
+            h_ac = (weight * q[:, None]).sum(axis=0)
+            h_cc = weight.sum(axis=0) + PRIOR_WEIGHT
+            det = h_aa * h_cc - h_ac ** 2
+            a = np.clip(a + (h_cc * g_a - h_ac * g_c) / det, *A_RANGE)
+            c = c + (h_aa * g_c - h_ac * g_a) / det
+            c = -a * np.clip(-c / a, *B_RANGE)
+
+        if abs(loglik - previous) <= TOLERANCE * abs(loglik):
+            break
+        previous = loglik
+    return a, -c / a, iteration, loglik
+
+
+def fit_quiz(db: Session, quiz_id: int, chunk_size: int = item_analysis.DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Calibrar las preguntas del quiz y guardar su modelo (sin commit; invalidar
+    la caché con invalidate_irt_model después del commit). Retorna un resumen.
+    """
+    np = item_analysis.require_numpy()
+    start = time.perf_counter()
+    questions = (
+        db.query(Question.id, Question.correct_answer, Question.options, Question.points)
+        .filter(Question.quiz_id == quiz_id)
+        .all()
+    )
+    matrix = item_analysis.load_matrix(db, quiz_id, questions, chunk_size)
+    x, m = item_analysis.to_dense(matrix)
+
+    # Solo preguntas con suficientes respuestas
+    calibrated = m.sum(axis=0) >= MIN_RESPONSES
+    question_ids = matrix.question_ids[calibrated]
+    x, m = x[:, calibrated], m[:, calibrated]
+    db.execute(delete(QuizIrtModel).where(QuizIrtModel.quiz_id == quiz_id))
+    if not len(question_ids):
+        return {"quiz_id": quiz_id, "questions": 0, "skipped": len(matrix.question_ids),
+                "answers": matrix.rows_read, "iterations": 0, "seconds": time.perf_counter() - start}
+
+    grid = theta_grid()
+    a, b, iterations, loglik = fit_2pl(x, m, grid)
+
+    # Tabla de información y curva característica sobre la grilla
+    q = np.asarray(grid)
+    prob = 1 / (1 + np.exp(-a * (q[:, None] - b)))
+    information = a ** 2 * prob * (1 - prob)
+    order = np.argsort(-information, axis=1, kind="stable")
+    points_by_id = {question.id: question.points if question.points is not None else 1.0 for question in questions}
+    points = np.array([points_by_id[qid] for qid in question_ids.tolist()])
+    expected = prob @ points / points.sum() if points.sum() > 0 else prob.mean(axis=1)
+
+    db.execute(insert(QuizIrtModel).values(
+        quiz_id=quiz_id,
+        theta_grid=grid,
+        items={str(qid): [float(ai), float(bi)] for qid, ai, bi in zip(question_ids.tolist(), a, b)},
+        ranking=question_ids[order].tolist(),
+        expected_score=expected.tolist(),
+        response_count=int(m.sum()),
+        iterations=iterations,
+    ))
+    return {
+        "quiz_id": quiz_id,
+        "questions": len(question_ids),
+        "skipped": int((~calibrated).sum()),
+        "answers": matrix.rows_read,
+        "iterations": iterations,
+        "loglik": loglik,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# ==================== EN LÍNEA ====================
+
+@dataclass(frozen=True)
+class AdaptiveModel:
+    """Modelo calibrado de un quiz, listo para seleccionar y puntuar."""
+    quiz_id: int
+    grid: Tuple[float, ...]
+    items: Dict[int, Tuple[float, float]]  # question_id -> (a, b)
+    ranking: Tuple[Tuple[int, ...], ...]  # Por punto de la grilla
+    expected_score: Tuple[float, ...]
+
+    @classmethod
+    def from_cached(cls, data: Dict[str, Any]) -> "AdaptiveModel":
+        return cls(
+            quiz_id=data["quiz_id"],
+            grid=tuple(data["theta_grid"]),
+            items={int(qid): tuple(params) for qid, params in data["items"].items()},
+            ranking=tuple(tuple(row) for row in data["ranking"]),
+            expected_score=tuple(data["expected_score"]),
+        )
+
+
+def _load_model(db: Session, quiz_id: int) -> Optional[Dict[str, Any]]:
+    row = db.query(QuizIrtModel).filter(QuizIrtModel.quiz_id == quiz_id).first()
+    if row is None:
+        return None
+    return {
+        "quiz_id": row.quiz_id,
+        "theta_grid": row.theta_grid,
+        "items": row.items,
+        "ranking": row.ranking,
+        "expected_score": row.expected_score,
+    }
+
+
+def get_model(db: Session, quiz_id: int) -> Optional[AdaptiveModel]:
+    """Modelo calibrado del quiz desde la caché, o None si aún no se calibró."""
+    data = cache.get_or_load(None, "irt_model", quiz_id, lambda: _load_model(db, quiz_id))
+    return AdaptiveModel.from_cached(data) if data else None
+
+
+async def aget_model(db: Session, quiz_id: int) -> Optional[AdaptiveModel]:
+    """get_model para handlers async (ver TenantCache.aget_or_load)."""
+    data = await cache.aget_or_load(None, "irt_model", quiz_id, lambda: _load_model(db, quiz_id))
+    return AdaptiveModel.from_cached(data) if data else None
+
+
+def _probability(a: float, b: float, theta: float) -> float:
+    z = a * (theta - b)
+    if z >= 0:
+        return 1 / (1 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1 + e)
+
+
+def new_state(model: AdaptiveModel, max_questions: int) -> Dict[str, Any]:
+    """Estado inicial de un intento: posterior = normal estándar sobre la grilla."""
+    return {
+        "log_posterior": [-0.5 * theta * theta for theta in model.grid],
+        "served": [],
+        "pending": None,
+        "max_questions": max_questions,
+    }
+
+
+def estimate(model: AdaptiveModel, state: Dict[str, Any]) -> Tuple[float, float]:
+    """Habilidad estimada (media posterior, EAP) y su error estándar."""
+    log_posterior = state["log_posterior"]
+    top = max(log_posterior)
+    weights = [math.exp(value - top) for value in log_posterior]
+    total = sum(weights)
+    theta = sum(w * q for w, q in zip(weights, model.grid)) / total
+    variance = sum(w * (q - theta) ** 2 for w, q in zip(weights, model.grid)) / total
+    return theta, math.sqrt(variance)
+
+
+def record_response(model: AdaptiveModel, state: Dict[str, Any], question_id: int, correct: bool) -> Dict[str, Any]:
+    """Nuevo estado tras responder la pregunta pendiente (multiplica la verosimilitud del ítem)."""
+    a, b = model.items[question_id]
+    log_posterior = []
+    for value, theta in zip(state["log_posterior"], model.grid):
+        p = _probability(a, b, theta)
+        log_posterior.append(value + math.log(max(p if correct else 1 - p, 1e-300)))
+    return {**state, "log_posterior": log_posterior, "pending": None}
+
+
+def select_question(model: AdaptiveModel, theta: float, exclude: Iterable[int], available: Iterable[int]) -> Optional[int]:
+    """Pregunta más informativa en el punto de la grilla más cercano a theta."""
+    grid = model.grid
+    index = bisect.bisect_left(grid, theta)
+    if index == len(grid) or (index > 0 and theta - grid[index - 1] <= grid[index] - theta):
+        index -= 1
+    exclude, available = set(exclude), set(available)
+    for question_id in model.ranking[index]:
+        if question_id not in exclude and question_id in available:
+            return question_id
+    return None
+
+
+def is_complete(state: Dict[str, Any], theta_se: float) -> bool:
+    """Criterio de parada: precisión alcanzada o tope de preguntas."""
+    answered = len(state["served"]) - (1 if state["pending"] is not None else 0)
+    if answered >= state["max_questions"]:
+        return True
+    return answered >= MIN_QUESTIONS and theta_se <= TARGET_SE
+
+
+def score_for(model: AdaptiveModel, theta: float) -> float:
+    """Puntaje sobre MAX_SCORE: fracción de puntos del quiz esperada con esa habilidad."""
+    grid, expected = model.grid, model.expected_score
+    if theta <= grid[0]:
+        return expected[0] * MAX_SCORE
+    if theta >= grid[-1]:
+        return expected[-1] * MAX_SCORE
+    index = bisect.bisect_right(grid, theta)
+    left, right = grid[index - 1], grid[index]
+    weight = (theta - left) / (right - left)
+    return (expected[index - 1] + weight * (expected[index] - expected[index - 1])) * MAX_SCORE
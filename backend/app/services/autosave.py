@@ -0,0 +1,364 @@
+"""
+Autoguardado de intentos en curso (sesiones de evaluación).
+
+Con un buffer compartido las respuestas parciales no se escriben en cada
+petición: se acumulan por intento (las nuevas sobrescriben a las anteriores
+de la misma pregunta) y se vuelcan a attempts.draft_answers en lotes:
+  - como tarea en segundo plano de la petición de autoguardado que encuentra
+    vencido el intervalo AUTOSAVE_FLUSH_SECONDS (sin un proceso periódico)
+  - al entregar el intento (se califican junto con lo ya guardado)
+
+Cada lote son dos sentencias para hasta AUTOSAVE_BATCH_SIZE intentos: un
+SELECT ... FOR UPDATE de los borradores actuales y un único UPDATE (en
+PostgreSQL con json_to_recordset; en otros motores executemany).
+
+Un lote tomado del buffer queda "en vuelo" hasta que su escritura hace
+commit: draft() lo sigue viendo, de modo que una entrega que bloquea el
+intento mientras el volcado espera no califica sin esas respuestas.
+
+Modos (AUTOSAVE_BACKEND):
+  - direct: sin buffer, cada autoguardado se escribe en su petición (por
+    defecto; el único seguro en serverless o con varios workers sin Redis)
+  - redis:  buffer compartido entre procesos e instancias (un hash por
+    intento); un lock con expiración limita el volcado a uno por intervalo en
+    todo el clúster
+  - memory: buffer por proceso, solo para un único proceso: draft() y la
+    entrega solo ven lo pendiente del proceso que lo recibió, y lo pendiente
+    se pierde si el proceso muere antes del siguiente volcado (al apagarse
+    ordenadamente se vuelca, ver app.main)
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Mapping, Optional
+
+from sqlalchemy import JSON, Integer, bindparam, cast, column, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import KEY_PREFIX
+from app.core.config import settings
+from app.core.metrics import QUIZ_AUTOSAVE
+from app.models.quiz import Attempt
+
+logger = logging.getLogger(__name__)
+
+Answers = Dict[str, str]  # question_id (texto, como en JSON) -> respuesta
+
+AUTOSAVE_PREFIX = f"{KEY_PREFIX}:autosave"
+REDIS_TTL_SECONDS = 24 * 3600  # Respuestas pendientes de intentos abandonados
+
+
+def _as_answers(answers: Mapping) -> Answers:
+    return {str(question_id): answer for question_id, answer in answers.items()}
+
+
+# ==================== BUFFERS ====================
+
+def _unwritten(inflight: Answers, written: Answers) -> Answers:
+    """Respuestas en vuelo que no escribió el lote (las sobrescribió un lote posterior)."""
+    return {key: value for key, value in inflight.items() if written.get(key) != value}
+
+
+class MemoryBuffer:
+    """Respuestas pendientes por intento en el proceso. Seguro entre hilos."""
+
+    def __init__(self):
+        self._pending: Dict[int, Answers] = {}
+        self._inflight: Dict[int, Answers] = {}  # Lotes tomados, aún sin commit
+        self._mutex = threading.Lock()
+        self._next_flush = time.monotonic() + settings.AUTOSAVE_FLUSH_SECONDS
+
+    def add(self, attempt_id: int, answers: Answers) -> None:
+        with self._mutex:
+            self._pending.setdefault(attempt_id, {}).update(answers)
+
+    def peek(self, attempt_id: int) -> Answers:
+        with self._mutex:
+            return {**self._inflight.get(attempt_id, {}), **self._pending.get(attempt_id, {})}
+
+    def take(self, attempt_id: int) -> Answers:
+        with self._mutex:
+            return {**self._inflight.pop(attempt_id, {}), **self._pending.pop(attempt_id, {})}
+
+    def take_batch(self, limit: int) -> Dict[int, Answers]:
+        with self._mutex:
+            attempt_ids = list(self._pending)[:limit]
+            batch = {attempt_id: self._pending.pop(attempt_id) for attempt_id in attempt_ids}
+            for attempt_id, answers in batch.items():
+                self._inflight.setdefault(attempt_id, {}).update(answers)
+            return batch
+
+    def _release(self, batch: Dict[int, Answers]) -> None:
+        for attempt_id, answers in batch.items():
+            remaining = _unwritten(self._inflight.get(attempt_id, {}), answers)
+            if remaining:
+                self._inflight[attempt_id] = remaining
+            else:
+                self._inflight.pop(attempt_id, None)
+
+    def done(self, batch: Dict[int, Answers]) -> None:
+        """El lote hizo commit: deja de estar en vuelo."""
+        with self._mutex:
+            self._release(batch)
+
+    def restore(self, batch: Dict[int, Answers]) -> None:
+        """Devolver un lote que no se pudo escribir (lo recibido después tiene prioridad)."""
+        with self._mutex:
+            for attempt_id, answers in batch.items():
+                self._pending[attempt_id] = {**answers, **self._pending.get(attempt_id, {})}
+            self._release(batch)
+
+    def flush_due(self) -> bool:
+        """¿Toca volcar? Reserva el turno: solo una petición por intervalo lo obtiene."""
+        with self._mutex:
+            now = time.monotonic()
+            if not self._pending or now < self._next_flush:
+                return False
+            self._next_flush = now + settings.AUTOSAVE_FLUSH_SECONDS
+            return True
+
+
+# Mover los hashes pendientes a su hash en vuelo. KEYS: pares (pendiente, en vuelo); ARGV[1]: TTL
+_TAKE_BATCH_SCRIPT = """
+local result = {}
+for i = 1, #KEYS, 2 do
+  local data = redis.call('HGETALL', KEYS[i])
+  if #data > 0 then
+    redis.call('HSET', KEYS[i + 1], unpack(data))
+    redis.call('EXPIRE', KEYS[i + 1], ARGV[1])
+    redis.call('DEL', KEYS[i])
+  end
+  result[#result + 1] = data
+end
+return result
+"""
+
+# Quitar del hash en vuelo (KEYS[1]) lo escrito (ARGV: pares pregunta, respuesta) si no cambió
+_RELEASE_SCRIPT = """
+for i = 1, #ARGV, 2 do
+  if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+    redis.call('HDEL', KEYS[1], ARGV[i])
+  end
+end
+return 0
+"""
+
+
+class RedisBuffer:
+    """Hash de respuestas por intento y conjunto de intentos con cambios pendientes."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._dirty = f"{AUTOSAVE_PREFIX}:dirty"
+        self._take_batch = self._client.register_script(_TAKE_BATCH_SCRIPT)
+        self._release = self._client.register_script(_RELEASE_SCRIPT)
+
+    def _key(self, attempt_id: int) -> str:
+        return f"{AUTOSAVE_PREFIX}:{attempt_id}"
+
+    def _inflight_key(self, attempt_id: int) -> str:
+        return f"{AUTOSAVE_PREFIX}:{attempt_id}:inflight"
+
+    @staticmethod
+    def _decode(raw: Mapping[bytes, bytes]) -> Answers:
+        return {key.decode(): value.decode() for key, value in raw.items()}
+
+    @staticmethod
+    def _pairs(answers: Answers) -> list:
+        return [item for pair in answers.items() for item in pair]
+
+    def add(self, attempt_id: int, answers: Answers) -> None:
+        key = self._key(attempt_id)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hset(key, mapping=answers)
+        pipe.expire(key, REDIS_TTL_SECONDS)
+        pipe.sadd(self._dirty, attempt_id)
+        pipe.execute()
+
+    def peek(self, attempt_id: int) -> Answers:
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hgetall(self._inflight_key(attempt_id))
+        pipe.hgetall(self._key(attempt_id))
+        inflight, pending = pipe.execute()
+        return {**self._decode(inflight), **self._decode(pending)}
+
+    def take(self, attempt_id: int) -> Answers:
+        key, inflight_key = self._key(attempt_id), self._inflight_key(attempt_id)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hgetall(inflight_key)
+        pipe.hgetall(key)
+        pipe.delete(key, inflight_key)
+        pipe.srem(self._dirty, attempt_id)
+        inflight, pending, _, _ = pipe.execute()
+        return {**self._decode(inflight), **self._decode(pending)}
+
+    def take_batch(self, limit: int) -> Dict[int, Answers]:
+        attempt_ids = [int(a) for a in self._client.spop(self._dirty, limit) or []]
+        if not attempt_ids:
+            return {}
+        # Todos los intentos pasan a "en vuelo" de forma atómica (lo que llegue después queda para el próximo lote)
+        keys = [key for attempt_id in attempt_ids for key in (self._key(attempt_id), self._inflight_key(attempt_id))]
+        results = self._take_batch(keys=keys, args=[REDIS_TTL_SECONDS])
+        batch = {
+            attempt_id: {flat[i].decode(): flat[i + 1].decode() for i in range(0, len(flat), 2)}
+            for attempt_id, flat in zip(attempt_ids, results)
+        }
+        return {attempt_id: answers for attempt_id, answers in batch.items() if answers}
+
+    def done(self, batch: Dict[int, Answers]) -> None:
+        pipe = self._client.pipeline(transaction=True)
+        for attempt_id, answers in batch.items():
+            self._release(keys=[self._inflight_key(attempt_id)], args=self._pairs(answers), client=pipe)
+        pipe.execute()
+
+    def restore(self, batch: Dict[int, Answers]) -> None:
+        pipe = self._client.pipeline(transaction=True)
+        for attempt_id, answers in batch.items():
+            key = self._key(attempt_id)
+            for question_id, answer in answers.items():
+                pipe.hsetnx(key, question_id, answer)  # Lo recibido después tiene prioridad
+            pipe.expire(key, REDIS_TTL_SECONDS)
+            pipe.sadd(self._dirty, attempt_id)
+            self._release(keys=[self._inflight_key(attempt_id)], args=self._pairs(answers), client=pipe)
+        pipe.execute()
+
+    def flush_due(self) -> bool:
+        # El lock expira solo: a lo sumo un volcado por intervalo en todo el clúster
+        ttl_ms = int(settings.AUTOSAVE_FLUSH_SECONDS * 1000)
+        return bool(self._client.set(f"{AUTOSAVE_PREFIX}:flush", b"1", nx=True, px=ttl_ms))
+
+
+def _build_buffer():
+    """Buffer según AUTOSAVE_BACKEND, o None (escritura directa)."""
+    backend = settings.AUTOSAVE_BACKEND.lower()
+    if backend == "redis":
+        try:
+            return RedisBuffer(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("⚠️ AUTOSAVE_BACKEND=redis pero el paquete redis no está instalado; escritura directa")
+    elif backend == "memory":
+        return MemoryBuffer()
+    return None
+
+
+buffer = _build_buffer()
+
+
+# ==================== ESCRITURA EN LOTES ====================
+
+def _write_drafts(db: Session, batch: Dict[int, Answers]) -> int:
+    """Fusionar las respuestas pendientes con los borradores guardados (sin commit)."""
+    current = db.execute(
+        select(Attempt.id, Attempt.draft_answers)
+        .where(Attempt.id.in_(list(batch)), Attempt.completed_at.is_(None))
+        .order_by(Attempt.id)  # Mismo orden de bloqueo en volcados concurrentes
+        .with_for_update()
+    ).all()
+    rows = [{"id": attempt_id, "answers": {**(draft or {}), **batch[attempt_id]}} for attempt_id, draft in current]
+    if not rows:
+        return 0  # Intentos ya entregados: el borrador ya no importa
+
+    attempts = Attempt.__table__
+    now = datetime.utcnow()
+    if db.get_bind().dialect.name == "postgresql":
+        # Un UPDATE ... FROM json_to_recordset(:drafts) para todo el lote
+        data = (
+            func.json_to_recordset(cast(bindparam("drafts", rows, type_=JSON), JSON))
+            .table_valued(column("id", Integer), column("answers", JSON))
+            .render_derived(name="data", with_types=True)
+        )
+        db.execute(
+            update(attempts)
+            .where(attempts.c.id == data.c.id)
+            .values(draft_answers=data.c.answers, draft_saved_at=now)
+        )
+    else:
+        db.execute(
+            update(attempts)
+            .where(attempts.c.id == bindparam("attempt_id"))
+            .values(draft_answers=bindparam("answers"), draft_saved_at=now),
+            [{"attempt_id": row["id"], "answers": row["answers"]} for row in rows],
+        )
+    return len(rows)
+
+
+def flush(db: Session, limit: Optional[int] = None) -> int:
+    """Volcar todas las respuestas pendientes, un lote por transacción. Retorna intentos escritos."""
+    if buffer is None:
+        return 0
+    limit = limit or settings.AUTOSAVE_BATCH_SIZE
+    written = 0
+    while True:
+        batch = buffer.take_batch(limit)
+        if not batch:
+            return written
+        try:
+            count = _write_drafts(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            buffer.restore(batch)
+            raise
+        try:
+            buffer.done(batch)
+        except Exception as e:  # Ya escrito; lo en vuelo expira solo (REDIS_TTL_SECONDS)
+            logger.warning("⚠️ No se pudo liberar un lote de autoguardado ya escrito: %s", e)
+        written += count
+        QUIZ_AUTOSAVE.inc("flushed", amount=count)
+        QUIZ_AUTOSAVE.inc("batch")
+
+
+def flush_in_background() -> None:
+    """Tarea en segundo plano (BackgroundTasks): sesión propia, errores solo al log."""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = flush(db)
+        logger.info("💾 Autoguardado: %d intentos escritos", written)
+    except Exception as e:
+        logger.error("❌ Error al volcar autoguardados: %s", e)
+    finally:
+        db.close()
+
+
+# ==================== API DEL SERVICIO ====================
+
+def save(db: Session, attempt_id: int, answers: Mapping) -> bool:
+    """
+    Registrar respuestas parciales. Retorna True si esta petición debe volcar
+    el buffer (programar flush_in_background). Sin buffer (modo direct) o si
+    no está disponible (p.ej. Redis caído) se escribe directamente este intento.
+    """
+    answers = _as_answers(answers)
+    QUIZ_AUTOSAVE.inc("received")
+    if buffer is not None:
+        try:
+            buffer.add(attempt_id, answers)
+            return buffer.flush_due()
+        except Exception as e:
+            logger.warning("⚠️ Buffer de autoguardado no disponible (%s): escritura directa", e)
+    _write_drafts(db, {attempt_id: answers})
+    db.commit()
+    QUIZ_AUTOSAVE.inc("flushed")
+    QUIZ_AUTOSAVE.inc("batch")
+    return False
+
+
+def draft(attempt: Attempt) -> Answers:
+    """Borrador completo del intento: lo guardado más lo pendiente o en vuelo en el buffer."""
+    pending = buffer.peek(attempt.id) if buffer is not None else {}
+    return {**(attempt.draft_answers or {}), **pending}
+
+
+def discard(attempt_id: int) -> None:
+    """Descartar lo pendiente de un intento ya entregado."""
+    if buffer is None:
+        return
+    try:
+        buffer.take(attempt_id)
+    except Exception as e:
+        logger.warning("⚠️ No se pudo limpiar el autoguardado del intento %s: %s", attempt_id, e)
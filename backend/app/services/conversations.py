@@ -0,0 +1,254 @@
+"""
+Conversaciones de chat (tablas conversations y conversation_participants).
+record_message actualiza, dentro de la transacción del mensaje, el último
+mensaje y la última actividad de la conversación y suma un no leído a cada
+participante salvo el remitente: dos sentencias UPDATE (más la creación de la
+conversación en el primer mensaje del par). La bandeja de entrada se lee del
+índice (user_id, last_activity, conversation_id) de participantes.
+
+Las conversaciones directas se identifican por el par ordenado
+(user_a_id <= user_b_id). Los mensajes sin destinatario no tienen miembros
+definidos y no generan conversación.
+mark_read marca como leídos los mensajes recibidos (por ids, por remitente
+o hasta un instante) y descuenta los no leídos de sus conversaciones.
+rebuild recalcula todas las conversaciones directas desde chat_messages
+(backfill o corrección).
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatMessage, Conversation, ConversationParticipant
+
+
+def pair_of(sender_id: int, receiver_id: int) -> Tuple[int, int]:
+    """Par ordenado que identifica la conversación directa."""
+    return (sender_id, receiver_id) if sender_id <= receiver_id else (receiver_id, sender_id)
+
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _create_if_missing(db: Session, user_a_id: int, user_b_id: int, activity: datetime) -> None:
+    """Crear la conversación del par y sus participantes (seguro ante mensajes concurrentes)."""
+    dialect_insert = _dialect_insert(db)
+    conversation = {"kind": "direct", "user_a_id": user_a_id, "user_b_id": user_b_id, "last_activity": activity}
+    if dialect_insert is not None:
+        db.execute(
+            dialect_insert(Conversation).values(**conversation)
+            .on_conflict_do_nothing(index_elements=["user_a_id", "user_b_id"])
+        )
+    else:
+        try:
+            with db.begin_nested():
+                db.execute(insert(Conversation).values(**conversation))
+        except IntegrityError:
+            pass  # Otra transacción la creó primero
+
+    conversation_id = db.execute(
+        select(Conversation.id).where(Conversation.user_a_id == user_a_id, Conversation.user_b_id == user_b_id)
+    ).scalar_one()
+    participants = [
+        {"conversation_id": conversation_id, "user_id": user_id, "unread_count": 0, "last_activity": activity}
+        for user_id in sorted({user_a_id, user_b_id})
+    ]
+    if dialect_insert is not None:
+        db.execute(
+            dialect_insert(ConversationParticipant).values(participants)
+            .on_conflict_do_nothing(index_elements=["conversation_id", "user_id"])
+        )
+    else:
+        try:
+            with db.begin_nested():
+                db.execute(insert(ConversationParticipant).values(participants))
+        except IntegrityError:
+            pass
+
+
+def _touch(db: Session, user_a_id: int, user_b_id: int, message: ChatMessage) -> Optional[int]:
+    """Último mensaje y actividad de la conversación; None si aún no existe."""
+    # Si un mensaje más nuevo del par hizo commit antes, se conserva ese
+    newer = Conversation.last_message_id > message.id
+    return db.execute(
+        update(Conversation)
+        .where(Conversation.user_a_id == user_a_id, Conversation.user_b_id == user_b_id)
+        .values(
+            last_message_id=case((newer, Conversation.last_message_id), else_=message.id),
+            last_activity=case((newer, Conversation.last_activity), else_=message.created_at),
+        )
+        .returning(Conversation.id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+
+
+def record_message(db: Session, message: ChatMessage) -> Optional[int]:
+    """
+    Reflejar un mensaje ya insertado (con id y created_at) en su conversación
+    (sin commit: misma transacción que el mensaje). Retorna el id de la
+    conversación, o None si el mensaje no tiene destinatario.
+    """
+    if message.receiver_id is None:
+        return None
+    user_a_id, user_b_id = pair_of(message.sender_id, message.receiver_id)
+    conversation_id = _touch(db, user_a_id, user_b_id, message)
+    if conversation_id is None:
+        _create_if_missing(db, user_a_id, user_b_id, message.created_at)
+        conversation_id = _touch(db, user_a_id, user_b_id, message)
+
+    db.execute(
+        update(ConversationParticipant)
+        .where(ConversationParticipant.conversation_id == conversation_id)
+        .values(
+            unread_count=ConversationParticipant.unread_count
+            + case((ConversationParticipant.user_id != message.sender_id, 1), else_=0),
+            last_activity=case(
+                (ConversationParticipant.last_activity > message.created_at, ConversationParticipant.last_activity),
+                else_=message.created_at,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return conversation_id
+
+
+def mark_read(
+    db: Session,
+    user_id: int,
+    message_ids: Optional[Sequence[int]] = None,
+    sender_id: Optional[int] = None,
+    until: Optional[datetime] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Marcar como leídos los mensajes recibidos por user_id que cumplan los
+    filtros (combinables; sin filtros: todos) y descontarlos de los no leídos
+    de cada conversación: una sentencia UPDATE sobre los mensajes y otra sobre
+    los participantes, sin commit. Retorna la cantidad de mensajes marcados
+    (incluidos los enviados a uno mismo o sin conversación aún) y, por
+    conversación afectada, conversation_id, peer_id, message_ids marcados y
+    unread_count restante.
+    """
+    conditions = [ChatMessage.receiver_id == user_id, ChatMessage.is_read.isnot(True)]
+    if message_ids is not None:
+        conditions.append(ChatMessage.id.in_(list(message_ids)))
+    if sender_id is not None:
+        conditions.append(ChatMessage.sender_id == sender_id)
+    if until is not None:
+        conditions.append(ChatMessage.created_at <= until)
+    rows = db.execute(
+        update(ChatMessage).where(*conditions).values(is_read=True)
+        .returning(ChatMessage.id, ChatMessage.sender_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    read_by_peer: Dict[int, List[int]] = {}
+    for message_id, sender in rows:
+        if sender != user_id:  # Los mensajes a uno mismo no cuentan como no leídos
+            read_by_peer.setdefault(sender, []).append(message_id)
+    if not read_by_peer:
+        return len(rows), []
+
+    pairs = {pair_of(user_id, peer_id): peer_id for peer_id in read_by_peer}
+    peer_of = {
+        conversation_id: pairs[(user_a_id, user_b_id)]
+        for conversation_id, user_a_id, user_b_id in db.execute(
+            select(Conversation.id, Conversation.user_a_id, Conversation.user_b_id)
+            .where(tuple_(Conversation.user_a_id, Conversation.user_b_id).in_(list(pairs)))
+        )
+    }
+    if not peer_of:
+        return len(rows), []
+    read_count = case(
+        {conversation_id: len(read_by_peer[peer_id]) for conversation_id, peer_id in peer_of.items()},
+        value=ConversationParticipant.conversation_id, else_=0,
+    )
+    remaining = db.execute(
+        update(ConversationParticipant)
+        .where(ConversationParticipant.user_id == user_id,
+               ConversationParticipant.conversation_id.in_(list(peer_of)))
+        .values(unread_count=case(
+            (ConversationParticipant.unread_count > read_count, ConversationParticipant.unread_count - read_count),
+            else_=0,
+        ))
+        .returning(ConversationParticipant.conversation_id, ConversationParticipant.unread_count)
+        .execution_options(synchronize_session=False)
+    ).all()
+    return len(rows), [
+        {
+            "conversation_id": conversation_id,
+            "peer_id": peer_of[conversation_id],
+            "message_ids": sorted(read_by_peer[peer_of[conversation_id]]),
+            "unread_count": unread_count,
+        }
+        for conversation_id, unread_count in sorted(remaining)
+    ]
+
+
+def unread_total(db: Session, user_id: int) -> int:
+    """Mensajes no leídos del usuario en todas sus conversaciones."""
+    return db.execute(
+        select(func.coalesce(func.sum(ConversationParticipant.unread_count), 0))
+        .where(ConversationParticipant.user_id == user_id)
+    ).scalar_one()
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recalcular todas las conversaciones directas desde chat_messages (sin
+    commit). Pensado para el despliegue, antes de recibir mensajes nuevos.
+    Retorna la cantidad de conversaciones.
+    """
+    user_a = case((ChatMessage.sender_id <= ChatMessage.receiver_id, ChatMessage.sender_id),
+                  else_=ChatMessage.receiver_id).label("user_a_id")
+    user_b = case((ChatMessage.sender_id <= ChatMessage.receiver_id, ChatMessage.receiver_id),
+                  else_=ChatMessage.sender_id).label("user_b_id")
+    pairs = db.execute(
+        select(user_a, user_b, func.max(ChatMessage.id), func.max(ChatMessage.created_at))
+        .where(ChatMessage.receiver_id.isnot(None))
+        .group_by(user_a, user_b)
+    ).all()
+    unread = dict(
+        ((a, b, receiver), count)
+        for a, b, receiver, count in db.execute(
+            select(user_a, user_b, ChatMessage.receiver_id, func.count())
+            .where(ChatMessage.receiver_id.isnot(None), ChatMessage.sender_id != ChatMessage.receiver_id,
+                   ChatMessage.is_read.isnot(True))
+            .group_by(user_a, user_b, ChatMessage.receiver_id)
+        )
+    )
+
+    direct = select(Conversation.id).where(Conversation.kind == "direct")
+    db.execute(delete(ConversationParticipant).where(ConversationParticipant.conversation_id.in_(direct)))
+    db.execute(delete(Conversation).where(Conversation.kind == "direct"))
+    if not pairs:
+        return 0
+
+    ids = db.execute(
+        insert(Conversation).returning(Conversation.id, Conversation.user_a_id, Conversation.user_b_id),
+        [
+            {"kind": "direct", "user_a_id": a, "user_b_id": b, "last_message_id": last_id, "last_activity": activity}
+            for a, b, last_id, activity in pairs
+        ],
+    ).all()
+    activity_of = {(a, b): activity for a, b, _, activity in pairs}
+    db.execute(insert(ConversationParticipant), [
+        {
+            "conversation_id": conversation_id,
+            "user_id": user_id,
+            "unread_count": unread.get((a, b, user_id), 0),
+            "last_activity": activity_of[(a, b)],
+        }
+        for conversation_id, a, b in ids
+        for user_id in sorted({a, b})
+    ])
+    return len(ids)
@@ -0,0 +1,351 @@
+"""
+Motor de calificación de evaluaciones.
+Precompila por quiz una "clave de respuestas" (respuesta normalizada y puntos de
+cada pregunta) que se guarda en la caché de aplicación, califica en Python puro
+y escribe el intento y todas sus respuestas con dos sentencias: un INSERT del
+intento (ya calificado, con RETURNING id) y un único INSERT multi-fila de
+respuestas.
+
+Comparación de respuestas (answer_matches):
+  1. exacta tras normalizar (minúsculas y sin espacios en los extremos; en
+     preguntas de texto además sin tildes y con los espacios colapsados)
+  2. por distancia de edición acotada, con umbral por pregunta
+     (Question.fuzzy_threshold; en preguntas de texto, GRADING_FUZZY_THRESHOLD
+     si no tiene uno propio)
+  3. semántica (Question.semantic_threshold): el llamador obtiene las
+     similitudes de todas las respuestas pendientes del intento en un solo
+     lote (app.services.similarity) y las pasa a grade.
+
+Quizzes con banco de preguntas (Quiz.pool_size): se califica solo la parte
+de la clave servida en el intento (AnswerKey.subset con Attempt.question_ids).
+
+La clave se invalida tras el commit de cualquier cambio en las preguntas o en
+el quiz (listeners de sesión en app.models.quiz, activos en cualquier proceso
+que use los modelos). La invalidación solo llega a otros procesos con
+CACHE_BACKEND=redis; con la caché en memoria de cada worker la clave vive a
+lo sumo GRADING_KEY_MEMORY_TTL_SECONDS.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import MemoryBackend, cache
+from app.core.config import settings
+from app.models.quiz import Answer, Attempt, Question, Quiz
+
+try:
+    from rapidfuzz.distance import Levenshtein as _rapidfuzz_levenshtein
+except ImportError:  # pragma: no cover - dependencia opcional
+    _rapidfuzz_levenshtein = None
+
+MAX_SCORE = 20.0  # Escala de calificación (aprobar con >= passing_score/20)
+ANSWER_KEY_VERSION = 4  # Cambia cuando cambia el formato o la normalización de la clave
+TEXT_QUESTION_TYPES = ("text",)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_answer(text: Optional[str]) -> str:
+    """Forma canónica de una respuesta para compararla con la clave."""
+    return (text or "").lower().strip()
+
+
+def normalize_text_answer(text: Optional[str]) -> str:
+    """Forma canónica de una respuesta de texto: minúsculas, sin tildes, espacios colapsados."""
+    text = (text or "").lower()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Distancia de Levenshtein acotada: retorna limit + 1 en cuanto se sabe que la
+    supera. Solo recorre la banda |i - j| <= limit (O(len * limit)).
+    """
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > limit:
+        return limit + 1
+    if _rapidfuzz_levenshtein is not None:
+        return _rapidfuzz_levenshtein.distance(a, b, score_cutoff=limit)
+
+    over = limit + 1
+    n = len(a)
+    previous = [j if j <= limit else over for j in range(n + 1)]
+    for i in range(1, len(b) + 1):
+        char = b[i - 1]
+        current = [over] * (n + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(n, i + limit) + 1):
+            value = previous[j - 1] + (a[j - 1] != char)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[n], over)
+
+
+def fuzzy_match(answer: str, expected: str, threshold: float) -> bool:
+    """¿Similitud 1 - distancia/longitud >= threshold? (textos ya normalizados)"""
+    if not answer or not expected:
+        return answer == expected
+    longest = max(len(answer), len(expected))
+    limit = int((1.0 - threshold) * longest + 1e-9)
+    return edit_distance(answer, expected, limit) <= limit
+
+
+@dataclass(frozen=True)
+class KeyEntry:
+    """Pregunta precompilada."""
+    question_id: int
+    answer: str  # Respuesta correcta normalizada
+    points: float
+    fuzzy_threshold: Optional[float] = None  # None: solo coincidencia exacta
+    semantic_threshold: Optional[float] = None  # None: sin similitud semántica
+    reference: str = ""  # Respuesta correcta original (texto para embeddings)
+    text: bool = False  # Pregunta de texto: normalize_text_answer en lugar de normalize_answer
+
+    def normalize(self, answer: Optional[str]) -> str:
+        return normalize_text_answer(answer) if self.text else normalize_answer(answer)
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Clave de respuestas de un quiz, en el orden de las preguntas."""
+    quiz_id: int
+    passing_score: float
+    entries: Tuple[KeyEntry, ...]
+    pool_size: Optional[int] = None  # Preguntas servidas por intento (None: todas)
+
+    @property
+    def max_points(self) -> float:
+        return sum(entry.points for entry in self.entries)
+
+    def subset(self, question_ids: Optional[Sequence[int]]) -> "AnswerKey":
+        """Clave restringida a las preguntas servidas, en ese orden (None: todas)."""
+        if question_ids is None:
+            return self
+        by_id = {entry.question_id: entry for entry in self.entries}
+        # Las preguntas borradas después de servir el intento no cuentan
+        entries = tuple(by_id[qid] for qid in question_ids if qid in by_id)
+        return AnswerKey(self.quiz_id, self.passing_score, entries, self.pool_size)
+
+    @classmethod
+    def from_cached(cls, data: Mapping[str, Any]) -> "AnswerKey":
+        return cls(
+            quiz_id=data["quiz_id"],
+            passing_score=data["passing_score"],
+            entries=tuple(KeyEntry(*entry) for entry in data["entries"]),
+            pool_size=data.get("pool_size"),
+        )
+
+
+@dataclass(frozen=True)
+class GradedAnswer:
+    question_id: int
+    answer_text: str
+    is_correct: bool
+    points_earned: float
+
+
+@dataclass(frozen=True)
+class GradeResult:
+    score: float  # Sobre MAX_SCORE
+    is_passed: bool
+    passing_score: float
+    answers: Tuple[GradedAnswer, ...]
+
+
+def _compile_answer_key(db: Session, quiz_id: int) -> Optional[Dict[str, Any]]:
+    """Clave de respuestas serializable para la caché, o None si el quiz no existe."""
+    quiz = db.query(Quiz.id, Quiz.passing_score, Quiz.pool_size).filter(Quiz.id == quiz_id).first()
+    if quiz is None:
+        return None
+    questions = (
+        db.query(
+            Question.id, Question.correct_answer, Question.points, Question.question_type,
+            Question.fuzzy_threshold, Question.semantic_threshold,
+        )
+        .filter(Question.quiz_id == quiz_id)
+        .order_by(Question.order, Question.id)
+        .all()
+    )
+    return {
+        "version": ANSWER_KEY_VERSION,
+        "quiz_id": quiz.id,
+        "passing_score": quiz.passing_score if quiz.passing_score is not None else 18.0,
+        "pool_size": quiz.pool_size if quiz.pool_size and quiz.pool_size > 0 else None,
+        "entries": [
+            [
+                q.id,
+                _normalizer(q)(q.correct_answer),
+                q.points if q.points is not None else 1.0,
+                _fuzzy_threshold(q),
+                q.semantic_threshold,
+                q.correct_answer if q.semantic_threshold is not None else "",
+                q.question_type in TEXT_QUESTION_TYPES,
+            ]
+            for q in questions
+        ],
+    }
+
+
+def _normalizer(question):
+    return normalize_text_answer if question.question_type in TEXT_QUESTION_TYPES else normalize_answer
+
+
+def _fuzzy_threshold(question) -> Optional[float]:
+    """Umbral efectivo: el de la pregunta, o el global en preguntas de texto."""
+    if question.fuzzy_threshold is not None:
+        return question.fuzzy_threshold
+    if question.question_type in TEXT_QUESTION_TYPES:
+        return settings.GRADING_FUZZY_THRESHOLD
+    return None
+
+
+def _answer_key_ttl() -> Optional[float]:
+    # Caché por proceso: sin invalidación entre procesos, TTL corto
+    return settings.GRADING_KEY_MEMORY_TTL_SECONDS if isinstance(cache.backend, MemoryBackend) else None
+
+
+def get_answer_key(db: Session, quiz_id: int) -> Optional[AnswerKey]:
+    """Clave de respuestas del quiz desde la caché (compilándola si hace falta)."""
+    ttl = _answer_key_ttl()
+    data = cache.get_or_load(None, "answer_key", quiz_id, lambda: _compile_answer_key(db, quiz_id), ttl=ttl)
+    return _answer_key_from(db, quiz_id, data, ttl)
+
+
+async def aget_answer_key(db: Session, quiz_id: int) -> Optional[AnswerKey]:
+    """get_answer_key para handlers async (ver TenantCache.aget_or_load)."""
+    ttl = _answer_key_ttl()
+    data = await cache.aget_or_load(None, "answer_key", quiz_id, lambda: _compile_answer_key(db, quiz_id), ttl=ttl)
+    return _answer_key_from(db, quiz_id, data, ttl)
+
+
+def _answer_key_from(db: Session, quiz_id: int, data, ttl: Optional[float]) -> Optional[AnswerKey]:
+    if data and data.get("version") != ANSWER_KEY_VERSION:
+        # Clave cacheada por una versión anterior (p.ej. en Redis durante un despliegue)
+        data = _compile_answer_key(db, quiz_id)
+        cache.set(None, "answer_key", quiz_id, data, ttl=ttl)
+    return AnswerKey.from_cached(data) if data else None
+
+
+def answer_matches(entry: KeyEntry, answer: Optional[str], similarity: Optional[float] = None) -> bool:
+    """¿La respuesta es correcta? Exacta, por distancia de edición o por similitud semántica."""
+    normalized = entry.normalize(answer)
+    if normalized == entry.answer:
+        return True
+    if entry.fuzzy_threshold is not None and fuzzy_match(normalized, entry.answer, entry.fuzzy_threshold):
+        return True
+    return (
+        entry.semantic_threshold is not None
+        and similarity is not None
+        and similarity >= entry.semantic_threshold
+    )
+
+
+def similarity_candidates(key: AnswerKey, answers: Mapping[int, str]) -> List[Tuple[int, str, str]]:
+    """
+    Respuestas que solo pueden acertar por similitud semántica:
+    [(question_id, respuesta, respuesta correcta)], para pedirlas en un lote.
+    """
+    candidates = []
+    for entry in key.entries:
+        if entry.semantic_threshold is None:
+            continue
+        answer = answers.get(entry.question_id, "")
+        if entry.normalize(answer) and not answer_matches(entry, answer):
+            candidates.append((entry.question_id, answer, entry.reference))
+    return candidates
+
+
+def grade(
+    key: AnswerKey,
+    answers: Mapping[int, str],
+    similarities: Optional[Mapping[int, float]] = None,
+) -> GradeResult:
+    """
+    Calificar las respuestas (question_id -> texto) contra la clave.
+    similarities: similitud semántica por question_id (de similarity_candidates).
+    """
+    similarities = similarities or {}
+    graded: List[GradedAnswer] = []
+    total_points = 0.0
+    for entry in key.entries:
+        user_answer = answers.get(entry.question_id, "")
+        is_correct = answer_matches(entry, user_answer, similarities.get(entry.question_id))
+        points = entry.points if is_correct else 0.0
+        total_points += points
+        graded.append(GradedAnswer(entry.question_id, user_answer, is_correct, points))
+
+    max_points = key.max_points
+    score = (total_points / max_points) * MAX_SCORE if max_points > 0 else 0
+    return GradeResult(
+        score=score,
+        is_passed=score >= key.passing_score,
+        passing_score=key.passing_score,
+        answers=tuple(graded),
+    )
+
+
+def store_attempt(
+    db: Session,
+    user_id: int,
+    quiz_id: int,
+    result: GradeResult,
+    attempt_id: Optional[int] = None,
+) -> int:
+    """
+    Insertar el intento calificado y sus respuestas (sin objetos ORM), o
+    completar el intento en curso attempt_id (sesión con autoguardado).
+    No hace commit: el llamador decide la transacción. Retorna el id del intento.
+    """
+    values = {
+        "score": result.score,
+        "is_passed": result.is_passed,
+        "completed_at": datetime.utcnow(),
+    }
+    if attempt_id is None:
+        attempt_id = db.execute(
+            insert(Attempt)
+            .values(user_id=user_id, quiz_id=quiz_id, **values)
+            .returning(Attempt.id)
+        ).scalar_one()
+    else:
+        db.execute(
+            update(Attempt)
+            .where(Attempt.id == attempt_id)
+            .values(draft_answers=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+
+    if result.answers:
+        db.execute(
+            insert(Answer).values([
+                {
+                    "attempt_id": attempt_id,
+                    "question_id": answer.question_id,
+                    "answer_text": answer.answer_text,
+                    "is_correct": answer.is_correct,
+                    "points_earned": answer.points_earned,
+                }
+                for answer in result.answers
+            ])
+        )
+    return attempt_id
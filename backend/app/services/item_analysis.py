@@ -0,0 +1,273 @@
+"""
+Análisis de ítems por lotes (teoría clásica de tests) con NumPy.
+Para cada quiz se leen todas sus respuestas en streaming (yield_per) a arreglos
+NumPy y se calculan a la vez, sin bucles por pregunta:
+  - dificultad (índice p): proporción de aciertos
+  - discriminación: correlación punto-biserial corregida entre acertar el ítem
+    y el puntaje en el resto del test (aciertos en las demás preguntas)
+  - distractores: frecuencia de cada opción de `options`, de otras respuestas
+    y de respuestas en blanco
+
+NumPy solo se necesita para este job (requirements-full.txt); la API lee los
+resultados guardados en question_item_stats.
+"""
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, delete, false, func, insert, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.models.quiz import Answer, Attempt, Question, QuestionItemStats
+from app.services.grading import normalize_answer
+
+DEFAULT_CHUNK_SIZE = 50_000
+OTHER_LABEL = "(otra respuesta)"
+BLANK_LABEL = "(sin responder)"
+
+
+@dataclass
+class ItemMatrix:
+    """Respuestas de un quiz en forma columnar."""
+    question_ids: Any  # np.ndarray[int64], columnas (preguntas del quiz, ordenadas)
+    attempt_index: Any  # np.ndarray[intp], fila (intento) de cada respuesta
+    question_index: Any  # np.ndarray[intp], columna de cada respuesta
+    correct: Any  # np.ndarray[float64], 1.0 si acertó
+    choice: Any  # np.ndarray[int16], opción elegida (ver _choice_codes)
+    attempt_count: int
+    rows_read: int
+    seconds_reading: float
+
+
+def require_numpy():
+    try:
+        import numpy as np
+    except ImportError as e:  # pragma: no cover - dependencia opcional
+        raise RuntimeError("El análisis de ítems requiere numpy (requirements-full.txt)") from e
+    return np
+
+
+def parse_options(options: Optional[str]) -> List[Tuple[str, set]]:
+    """
+    Opciones de una pregunta como [(etiqueta, {formas normalizadas aceptadas})].
+    `options` es un JSON: lista de textos, lista de objetos (text/label/value/key)
+    o diccionario {clave: texto}. Una respuesta coincide con la opción si es su
+    texto o su clave (p.ej. "b").
+    """
+    if not options:
+        return []
+    try:
+        data = json.loads(options)
+    except (TypeError, ValueError):
+        return []
+    if isinstance(data, dict):
+        items = [(str(text), {key, text}) for key, text in data.items()]
+    elif isinstance(data, list):
+        items = []
+        for option in data:
+            if isinstance(option, dict):
+                text = option.get("text") or option.get("label") or option.get("value") or ""
+                aliases = {option.get(k) for k in ("text", "label", "value", "key", "id")}
+                items.append((str(text), aliases))
+            else:
+                items.append((str(option), {option}))
+    else:
+        return []
+    return [
+        (label, {normalize_answer(str(alias)) for alias in aliases if alias is not None})
+        for label, aliases in items
+    ]
+
+
+def _choice_codes(questions: Sequence[Any]) -> Tuple[Dict[int, Dict[str, int]], int]:
+    """
+    Código numérico de cada respuesta normalizada por pregunta. Las opciones van
+    de 0 a K-1 (K = máximo de opciones en el quiz); K es "otra" y K+1 "en blanco".
+    """
+    codes, width = {}, 0
+    for question in questions:
+        mapping, parsed = {}, parse_options(question.options)
+        for index, (_, aliases) in enumerate(parsed):
+            for alias in aliases:
+                mapping.setdefault(alias, index)
+        codes[question.id] = mapping
+        width = max(width, len(parsed))
+    return codes, width
+
+
+def load_matrix(
+    db: Session,
+    quiz_id: int,
+    questions: Sequence[Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ItemMatrix:
+    """Leer en streaming las respuestas de los intentos completos del quiz."""
+    np = require_numpy()
+    start = time.perf_counter()
+    question_ids = np.array(sorted(q.id for q in questions), dtype=np.int64)
+    codes, width = _choice_codes(questions)
+    other_code, blank_code = width, width + 1
+    # (question_id, texto tal cual) -> código; los textos distintos son pocos
+    memo: Dict[Tuple[int, str], int] = {}
+
+    def code_of(question_id: int, text: Optional[str]) -> int:
+        key = (question_id, text)
+        code = memo.get(key)
+        if code is None:
+            normalized = normalize_answer(text)
+            if not normalized:
+                code = blank_code
+            else:
+                code = codes.get(question_id, {}).get(normalized, other_code)
+            memo[key] = code
+        return code
+
+    # is_correct sin procesador de resultados por fila (0/1 o bool según el driver)
+    is_correct = type_coerce(func.coalesce(Answer.is_correct, false()), Integer)
+    stmt = (
+        select(Answer.attempt_id, Answer.question_id, is_correct, Answer.answer_text)
+        .join(Attempt, Attempt.id == Answer.attempt_id)
+        .where(Attempt.quiz_id == quiz_id, Attempt.completed_at.isnot(None))
+        .execution_options(yield_per=chunk_size)
+    )
+    attempts, question_cols, correct, choice = [], [], [], []
+    rows_read = 0
+    # Ejecución Core sobre la conexión de la sesión: sin la capa de filas del ORM
+    for partition in db.connection().execute(stmt).partitions():
+        attempt_ids, qids, is_correct, texts = zip(*partition)
+        rows_read += len(attempt_ids)
+        attempts.append(np.fromiter(attempt_ids, dtype=np.int64, count=len(attempt_ids)))
+        question_cols.append(np.fromiter(qids, dtype=np.int64, count=len(qids)))
+        correct.append(np.fromiter(is_correct, dtype=np.float64, count=len(is_correct)))
+        choice.append(np.fromiter(map(code_of, qids, texts), dtype=np.int16, count=len(texts)))
+
+    if rows_read:
+        attempt_arr = np.concatenate(attempts)
+        question_arr = np.concatenate(question_cols)
+        correct_arr = np.concatenate(correct)
+        choice_arr = np.concatenate(choice)
+    else:
+        attempt_arr = question_arr = np.empty(0, dtype=np.int64)
+        correct_arr = np.empty(0, dtype=np.float64)
+        choice_arr = np.empty(0, dtype=np.int16)
+
+    # Descartar respuestas a preguntas que ya no existen en el quiz
+    column = np.searchsorted(question_ids, question_arr)
+    column = np.minimum(column, max(len(question_ids) - 1, 0))
+    known = question_ids[column] == question_arr if len(question_ids) else np.zeros(len(question_arr), bool)
+    attempt_ids, attempt_index = np.unique(attempt_arr[known], return_inverse=True)
+
+    return ItemMatrix(
+        question_ids=question_ids,
+        attempt_index=attempt_index,
+        question_index=column[known],
+        correct=correct_arr[known],
+        choice=choice_arr[known],
+        attempt_count=len(attempt_ids),
+        rows_read=rows_read,
+        seconds_reading=time.perf_counter() - start,
+    )
+
+
+def to_dense(matrix: ItemMatrix):
+    """Matrices intentos x preguntas: aciertos (x) y presencia de respuesta (m)."""
+    np = require_numpy()
+    shape = (matrix.attempt_count, len(matrix.question_ids))
+    x, m = np.zeros(shape), np.zeros(shape)
+    x[matrix.attempt_index, matrix.question_index] = matrix.correct
+    m[matrix.attempt_index, matrix.question_index] = 1.0
+    return x, m
+
+
+def analyze(matrix: ItemMatrix, questions: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Métricas de todas las preguntas del quiz a la vez (operaciones por columna)."""
+    np = require_numpy()
+    n_items = len(matrix.question_ids)
+    x, m = to_dense(matrix)
+
+    responses = m.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        difficulty = x.sum(axis=0) / responses
+
+        # Punto-biserial corregida: corr(x_j, total - x_j) sobre los intentos que respondieron j
+        rest = (x.sum(axis=1, keepdims=True) - x) * m
+        sx, sy = x.sum(axis=0), rest.sum(axis=0)
+        mean_x, mean_y = sx / responses, sy / responses
+        cov = (x * rest).sum(axis=0) / responses - mean_x * mean_y
+        var_x = (x * x).sum(axis=0) / responses - mean_x ** 2
+        var_y = (rest * rest).sum(axis=0) / responses - mean_y ** 2
+        discrimination = cov / np.sqrt(var_x * var_y)
+
+    # Frecuencias de opción: un bincount sobre (columna, código)
+    _, width = _choice_codes(questions)
+    n_codes = width + 2
+    counts = np.bincount(
+        matrix.question_index.astype(np.int64) * n_codes + matrix.choice,
+        minlength=n_items * n_codes,
+    ).reshape(n_items, n_codes)
+
+    by_id = {q.id: q for q in questions}
+    results = []
+    for column, question_id in enumerate(matrix.question_ids.tolist()):
+        question = by_id[question_id]
+        total = int(responses[column])
+        correct_answer = normalize_answer(question.correct_answer)
+        labels = parse_options(question.options)
+        distractors = [
+            {
+                "option": label,
+                "count": int(counts[column, index]),
+                "proportion": counts[column, index] / total if total else 0.0,
+                "is_correct": correct_answer in aliases,
+            }
+            for index, (label, aliases) in enumerate(labels)
+        ]
+        for label, code in ((OTHER_LABEL, width), (BLANK_LABEL, width + 1)):
+            if counts[column, code]:
+                distractors.append({
+                    "option": label,
+                    "count": int(counts[column, code]),
+                    "proportion": counts[column, code] / total,
+                    "is_correct": False,
+                })
+        results.append({
+            "question_id": question_id,
+            "response_count": total,
+            "difficulty": _finite(difficulty[column]),
+            "discrimination": _finite(discrimination[column]),
+            "distractors": distractors,
+        })
+    return results
+
+
+def _finite(value) -> Optional[float]:
+    """float o None (sin respuestas o sin varianza la métrica no está definida)."""
+    value = float(value)
+    return value if value == value and value not in (float("inf"), float("-inf")) else None
+
+
+def run_quiz(db: Session, quiz_id: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """Calcular y guardar el análisis de un quiz (sin commit). Retorna tiempos y conteos."""
+    questions = (
+        db.query(Question.id, Question.correct_answer, Question.options)
+        .filter(Question.quiz_id == quiz_id)
+        .all()
+    )
+    matrix = load_matrix(db, quiz_id, questions, chunk_size)
+    start = time.perf_counter()
+    results = analyze(matrix, questions)
+    seconds_computing = time.perf_counter() - start
+
+    # Reemplazar los resultados del quiz: un DELETE y un INSERT multi-fila
+    db.execute(delete(QuestionItemStats).where(QuestionItemStats.quiz_id == quiz_id))
+    if results:
+        db.execute(insert(QuestionItemStats).values([{**row, "quiz_id": quiz_id} for row in results]))
+    return {
+        "quiz_id": quiz_id,
+        "questions": len(results),
+        "attempts": matrix.attempt_count,
+        "answers": matrix.rows_read,
+        "seconds_reading": matrix.seconds_reading,
+        "seconds_computing": seconds_computing,
+    }
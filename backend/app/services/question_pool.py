@@ -0,0 +1,66 @@
+"""
+Bancos de preguntas: selección aleatoria por intento.
+
+Un quiz con pool_size sirve a cada intento pool_size preguntas de su banco,
+en orden aleatorio. La selección:
+  - es determinista: semilla = id del intento (se puede reproducir o auditar)
+  - no carga el banco: se muestrean posiciones de la clave de respuestas
+    cacheada (ids en el orden de las preguntas) y solo las preguntas elegidas
+    se leen de la base, por clave primaria
+  - se guarda en Attempt.question_ids al iniciar el intento, de modo que
+    agregar o quitar preguntas del banco no cambia un intento en curso; la
+    calificación usa solo esas preguntas (AnswerKey.subset)
+"""
+import json
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.models.quiz import Question
+from app.services.grading import AnswerKey
+
+
+def select_questions(key: AnswerKey, attempt_id: int) -> Optional[List[int]]:
+    """
+    Preguntas servidas al intento, en el orden en que se presentan.
+    None si el quiz no usa banco (se sirven todas en su orden).
+    """
+    if not key.pool_size:
+        return None
+    size = len(key.entries)
+    # sample(range(n), k) elige k posiciones sin materializar range(n)
+    positions = random.Random(attempt_id).sample(range(size), min(key.pool_size, size))
+    return [key.entries[position].question_id for position in positions]
+
+
+def _decode_options(options: Optional[str]) -> Any:
+    try:
+        return json.loads(options) if options else None
+    except ValueError:
+        return options
+
+
+def load_questions(db: Session, quiz_id: int, question_ids: Optional[Sequence[int]]) -> List[Dict[str, Any]]:
+    """
+    Contenido de las preguntas servidas (sin la respuesta correcta), en orden;
+    question_ids None: todas las del quiz. options se entrega ya decodificado.
+    """
+    query = db.query(
+        Question.id, Question.question_text, Question.question_type, Question.options, Question.points
+    )
+    if question_ids is None:
+        rows = query.filter(Question.quiz_id == quiz_id).order_by(Question.order, Question.id).all()
+    else:
+        by_id = {row.id: row for row in query.filter(Question.id.in_(list(question_ids))).all()}
+        rows = [by_id[qid] for qid in question_ids if qid in by_id]
+    return [
+        {
+            "id": row.id,
+            "question_text": row.question_text,
+            "question_type": row.question_type,
+            "options": _decode_options(row.options),
+            "points": row.points,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,164 @@
+"""
+Estadísticas agregadas por quiz (tabla quiz_stats).
+record_attempt actualiza la fila del quiz dentro de la transacción del intento:
+conteo, aprobados, suma y suma de cuadrados del puntaje (media y desviación
+sin recorrer attempts), mínimo/máximo, histograma por tramos y el ranking de
+los LEADERBOARD_SIZE mejores usuarios (mejor intento de cada uno).
+
+La fila se bloquea (SELECT ... FOR UPDATE) hasta el commit del intento, de modo
+que las entregas concurrentes del mismo quiz se aplican una tras otra.
+rebuild recalcula la fila desde attempts (backfill o corrección).
+"""
+import math
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.quiz import Attempt, QuizStats
+from app.services.grading import MAX_SCORE
+
+HISTOGRAM_BUCKETS = 10
+BUCKET_WIDTH = MAX_SCORE / HISTOGRAM_BUCKETS
+LEADERBOARD_SIZE = 10
+
+
+def bucket_of(score: float) -> int:
+    """Tramo del histograma de un puntaje (el puntaje máximo cae en el último)."""
+    return max(0, min(int(score // BUCKET_WIDTH), HISTOGRAM_BUCKETS - 1))
+
+
+def _create_if_missing(db: Session, quiz_id: int) -> None:
+    """Insertar la fila vacía del quiz si no existe (seguro ante entregas concurrentes)."""
+    values = {"quiz_id": quiz_id, "histogram": [0] * HISTOGRAM_BUCKETS, "top_scores": []}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        db.execute(insert(QuizStats).values(**values).on_conflict_do_nothing(index_elements=["quiz_id"]))
+        return
+    try:
+        with db.begin_nested():
+            db.add(QuizStats(**values))
+    except IntegrityError:
+        pass  # Otra transacción la creó primero
+
+
+def _lock_stats(db: Session, quiz_id: int) -> QuizStats:
+    """Fila de estadísticas del quiz bloqueada hasta el fin de la transacción."""
+    query = (
+        db.query(QuizStats)
+        .filter(QuizStats.quiz_id == quiz_id)
+        .with_for_update()
+        .populate_existing()
+    )
+    stats = query.one_or_none()
+    if stats is None:
+        _create_if_missing(db, quiz_id)
+        stats = query.one()
+    return stats
+
+
+def merge_top(top: List[Dict[str, Any]], entry: Dict[str, Any], size: int = LEADERBOARD_SIZE) -> List[Dict[str, Any]]:
+    """
+    Incorporar un intento al ranking (un puesto por usuario, su mejor puntaje;
+    en empate gana el intento más antiguo). Los puntajes solo se agregan, así que
+    un usuario fuera del ranking nunca necesita volver a considerarse.
+    """
+    previous = next((e for e in top if e["user_id"] == entry["user_id"]), None)
+    if previous is not None and previous["score"] >= entry["score"]:
+        return top
+    merged = [e for e in top if e["user_id"] != entry["user_id"]] + [entry]
+    merged.sort(key=lambda e: (-e["score"], e["attempt_id"]))
+    return merged[:size]
+
+
+def record_attempt(db: Session, quiz_id: int, user_id: int, attempt_id: int, score: float, is_passed: bool) -> None:
+    """Sumar un intento a las estadísticas del quiz (sin commit: misma transacción que el intento)."""
+    stats = _lock_stats(db, quiz_id)
+    stats.attempt_count += 1
+    stats.pass_count += 1 if is_passed else 0
+    stats.score_sum += score
+    stats.score_sq_sum += score * score
+    stats.min_score = score if stats.min_score is None else min(stats.min_score, score)
+    stats.max_score = score if stats.max_score is None else max(stats.max_score, score)
+
+    # Las columnas JSON se reasignan (no se mutan) para que el ORM detecte el cambio
+    histogram = list(stats.histogram or [0] * HISTOGRAM_BUCKETS)
+    histogram[bucket_of(score)] += 1
+    stats.histogram = histogram
+    stats.top_scores = merge_top(
+        stats.top_scores or [],
+        {"user_id": user_id, "attempt_id": attempt_id, "score": score},
+    )
+    db.flush()
+
+
+def rebuild(db: Session, quiz_id: int) -> QuizStats:
+    """Recalcular la fila del quiz desde attempts (sin commit)."""
+    stats = _lock_stats(db, quiz_id)
+    completed = db.query(Attempt).filter(Attempt.quiz_id == quiz_id, Attempt.completed_at.isnot(None))
+
+    totals = completed.with_entities(
+        func.count(Attempt.id),
+        func.coalesce(func.sum(case((Attempt.is_passed == True, 1), else_=0)), 0),
+        func.coalesce(func.sum(Attempt.score), 0.0),
+        func.coalesce(func.sum(Attempt.score * Attempt.score), 0.0),
+        func.min(Attempt.score),
+        func.max(Attempt.score),
+    ).one()
+    (stats.attempt_count, stats.pass_count, stats.score_sum, stats.score_sq_sum,
+     stats.min_score, stats.max_score) = totals
+
+    # Mismos tramos que bucket_of, en SQL portable (CASE en lugar de floor/least)
+    bucket = case(
+        *[(Attempt.score >= BUCKET_WIDTH * b, b) for b in range(HISTOGRAM_BUCKETS - 1, 0, -1)],
+        else_=0,
+    )
+    histogram = [0] * HISTOGRAM_BUCKETS
+    for index, count in completed.with_entities(bucket, func.count()).group_by(bucket).all():
+        histogram[index] += count
+    stats.histogram = histogram
+
+    # Mejor intento por usuario (empate: el más antiguo)
+    ranked = completed.with_entities(
+        Attempt.id, Attempt.user_id, Attempt.score,
+        func.row_number().over(
+            partition_by=Attempt.user_id, order_by=(Attempt.score.desc(), Attempt.id)
+        ).label("position"),
+    ).subquery()
+    best = (
+        db.query(ranked.c.id, ranked.c.user_id, ranked.c.score)
+        .filter(ranked.c.position == 1)
+        .order_by(ranked.c.score.desc(), ranked.c.id)
+        .limit(LEADERBOARD_SIZE)
+        .all()
+    )
+    stats.top_scores = [{"user_id": u, "attempt_id": a, "score": s} for a, u, s in best]
+    db.flush()
+    return stats
+
+
+def summarize(stats: Optional[QuizStats]) -> Dict[str, Any]:
+    """Estadísticas derivadas para la API (todas O(1) sobre la fila agregada)."""
+    count = stats.attempt_count if stats else 0
+    mean = stats.score_sum / count if count else None
+    variance = max(0.0, stats.score_sq_sum / count - mean * mean) if count else None
+    histogram = (stats.histogram if stats and stats.histogram else [0] * HISTOGRAM_BUCKETS)
+    return {
+        "attempt_count": count,
+        "pass_count": stats.pass_count if stats else 0,
+        "pass_rate": stats.pass_count / count if count else None,
+        "mean_score": mean,
+        "stddev_score": math.sqrt(variance) if variance is not None else None,
+        "min_score": stats.min_score if stats else None,
+        "max_score": stats.max_score if stats else None,
+        "histogram": [
+            {"from_score": b * BUCKET_WIDTH, "to_score": (b + 1) * BUCKET_WIDTH, "count": histogram[b]}
+            for b in range(HISTOGRAM_BUCKETS)
+        ],
+        "top_scores": list(stats.top_scores or []) if stats else [],
+    }
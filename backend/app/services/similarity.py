@@ -0,0 +1,82 @@
+"""
+Similitud semántica de respuestas de texto (embeddings), para preguntas con
+Question.semantic_threshold.
+
+Todas las respuestas pendientes de un intento y sus respuestas correctas se
+envían en UNA sola petición de embeddings; la similitud coseno se calcula
+localmente. Backends (GRADING_EMBEDDING_BACKEND):
+  - none:   deshabilitado (por defecto), solo exacta y distancia de edición
+  - openai: API de embeddings de OpenAI (OPENAI_API_KEY)
+  - ollama: servidor local de Ollama (OLLAMA_BASE_URL)
+
+Si el backend falla o tarda más de GRADING_EMBEDDING_TIMEOUT la calificación
+sigue sin similitud semántica (la respuesta cuenta como incorrecta).
+"""
+import logging
+import math
+from typing import Dict, List, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS = {
+    "openai": "text-embedding-3-small",
+    "ollama": "nomic-embed-text",
+}
+OPENAI_EMBEDDINGS_URL = "https://api.openai.com/v1/embeddings"
+
+
+def enabled() -> bool:
+    return settings.GRADING_EMBEDDING_BACKEND.lower() in DEFAULT_MODELS
+
+
+async def _embed(texts: List[str]) -> List[List[float]]:
+    """Embeddings de todos los textos en una petición, en el mismo orden."""
+    import httpx
+
+    backend = settings.GRADING_EMBEDDING_BACKEND.lower()
+    model = settings.GRADING_EMBEDDING_MODEL or DEFAULT_MODELS[backend]
+    async with httpx.AsyncClient(timeout=settings.GRADING_EMBEDDING_TIMEOUT) as client:
+        if backend == "openai":
+            response = await client.post(
+                OPENAI_EMBEDDINGS_URL,
+                json={"model": model, "input": texts},
+                headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+            )
+            response.raise_for_status()
+            data = sorted(response.json()["data"], key=lambda item: item["index"])
+            return [item["embedding"] for item in data]
+        response = await client.post(
+            f"{settings.OLLAMA_BASE_URL.rstrip('/')}/api/embed",
+            json={"model": model, "input": texts},
+        )
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+async def answer_similarities(candidates: Sequence[Tuple[int, str, str]]) -> Dict[int, float]:
+    """
+    Similitud coseno por question_id para [(question_id, respuesta, correcta)]
+    (grading.similarity_candidates). Retorna {} si no hay candidatos, el
+    backend está deshabilitado o falla.
+    """
+    if not candidates or not enabled():
+        return {}
+    # Textos únicos: respuestas repetidas o iguales a otra correcta se envían una vez
+    texts = list(dict.fromkeys(text for _, answer, reference in candidates for text in (answer, reference)))
+    try:
+        vectors = dict(zip(texts, await _embed(texts)))
+    except Exception as e:
+        logger.warning("⚠️ Similitud semántica no disponible (%s): se califica sin embeddings", e)
+        return {}
+    return {
+        question_id: cosine(vectors[answer], vectors[reference])
+        for question_id, answer, reference in candidates
+    }
@@ -0,0 +1,41 @@
+"""
+Backfill de conversaciones de chat desde la tabla chat_messages.
+Recalcula todas las conversaciones directas (último mensaje, última actividad
+y no leídos de cada participante) en una transacción. Ejecutar al desplegar la
+migración de conversaciones, antes de recibir mensajes nuevos.
+
+Uso:
+    python scripts/backfill_conversations.py
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import SessionLocal
+from app.services import conversations
+
+
+def backfill() -> None:
+    db = SessionLocal()
+    try:
+        print("Recalculando conversaciones desde chat_messages...")
+        start = time.perf_counter()
+        count = conversations.rebuild(db)
+        db.commit()
+        print(f"✅ {count} conversaciones ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    backfill()
@@ -0,0 +1,52 @@
+"""
+Backfill de quiz_stats desde la tabla attempts.
+Recalcula la fila agregada de cada quiz (o de los indicados) en su propia
+transacción. Puede ejecutarse con la aplicación en marcha: la fila del quiz se
+bloquea mientras se recalcula y las entregas concurrentes se suman después.
+
+Uso:
+    python scripts/backfill_quiz_stats.py
+    python scripts/backfill_quiz_stats.py --quiz-id 3 --quiz-id 7
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import SessionLocal
+from app.models.quiz import Quiz
+from app.services import quiz_stats
+
+
+def backfill(quiz_ids=None) -> None:
+    db = SessionLocal()
+    try:
+        if not quiz_ids:
+            quiz_ids = [quiz_id for (quiz_id,) in db.query(Quiz.id).order_by(Quiz.id)]
+        print(f"Recalculando estadísticas de {len(quiz_ids)} quizzes...")
+        for quiz_id in quiz_ids:
+            start = time.perf_counter()
+            stats = quiz_stats.rebuild(db, quiz_id)
+            db.commit()
+            summary = quiz_stats.summarize(stats)
+            pass_rate = f"{summary['pass_rate']:.0%}" if summary["pass_rate"] is not None else "-"
+            print(
+                f"✅ quiz {quiz_id}: {summary['attempt_count']} intentos, aprobación {pass_rate} "
+                f"({(time.perf_counter() - start) * 1000:.0f} ms)"
+            )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quiz-id", type=int, action="append", help="Quiz a recalcular (repetible)")
+    args = parser.parse_args()
+    backfill(args.quiz_id)
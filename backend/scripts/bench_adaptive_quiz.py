@@ -0,0 +1,175 @@
+"""
+Simulación del modo adaptativo.
+Genera en una base SQLite temporal un banco de --questions preguntas con
+parámetros 2PL conocidos e --history intentos históricos, calibra el modelo
+(fit_irt_models) y compara los parámetros recuperados con los verdaderos.
+Después simula --students estudiantes nuevos de habilidad conocida contra los
+endpoints start/next/finish (en el mismo proceso, httpx + ASGI) y reporta
+preguntas usadas, error de la habilidad estimada, latencia por paso y
+sentencias SQL por paso (cabecera Server-Timing).
+
+Uso:
+    python scripts/bench_adaptive_quiz.py --questions 60 --history 3000 --students 100
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_adaptive_quiz.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+
+SERVER_TIMING_RE = re.compile(r'desc="(\d+) queries"')
+OPTIONS = ["a", "b", "c", "d"]
+
+from bench_common import create_students, reset_schema, seed_quiz
+
+
+def probability(a, b, theta):
+    return 1 / (1 + math.exp(-a * (theta - b)))
+
+
+def seed(questions: int, history: int, students: int):
+    """Banco de preguntas con parámetros verdaderos e historial de intentos fijos."""
+    from datetime import datetime
+
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal
+    from app.models.quiz import Answer, Attempt, Question
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        company, quiz = seed_quiz(db, total_questions=20)
+        truth = {}
+        question_rows = []
+        for i in range(questions):
+            question = Question(quiz_id=quiz.id, question_text=f"Pregunta {i}", correct_answer=random.choice(OPTIONS),
+                                order=i)
+            question_rows.append(question)
+        db.add_all(question_rows)
+        db.flush()
+        for question in question_rows:
+            truth[question.id] = (random.uniform(0.6, 2.2), random.uniform(-2.0, 2.0), question.correct_answer)
+
+        users = create_students(db, company.id, students + 1)
+
+        # Historial: cada intento fijo responde 20 preguntas al azar del banco
+        attempt = {"user_id": users[0].id, "quiz_id": quiz.id, "score": 0.0, "completed_at": datetime.utcnow()}
+        first = db.execute(insert(Attempt).values(**attempt).returning(Attempt.id)).scalar_one()
+        db.execute(insert(Attempt), [attempt] * (history - 1))
+        rows = []
+        for attempt_id in range(first, first + history):
+            theta = random.gauss(0, 1)
+            for qid in random.sample(list(truth), min(20, questions)):
+                a, b, correct = truth[qid]
+                right = random.random() < probability(a, b, theta)
+                text = correct if right else random.choice([o for o in OPTIONS if o != correct])
+                rows.append({"attempt_id": attempt_id, "question_id": qid, "answer_text": text,
+                             "is_correct": right, "points_earned": 1.0 if right else 0.0})
+        db.execute(insert(Answer), rows)
+        db.commit()
+        return quiz.id, truth, [u.id for u in users[1:]]
+    finally:
+        db.close()
+
+
+def recovery(quiz_id, truth):
+    """Correlación entre parámetros verdaderos y recuperados."""
+    from app.core.database import SessionLocal
+    from app.services import adaptive
+
+    db = SessionLocal()
+    try:
+        model = adaptive.get_model(db, quiz_id)
+    finally:
+        db.close()
+    pairs = [(truth[qid][:2], params) for qid, params in model.items.items()]
+
+    def corr(xs, ys):
+        mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+        cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+        return cov / math.sqrt(sum((x - mx) ** 2 for x in xs) * sum((y - my) ** 2 for y in ys))
+
+    print(f"Recuperación de parámetros ({len(pairs)} preguntas): "
+          f"r(a) = {corr([t[0] for t, _ in pairs], [p[0] for _, p in pairs]):.3f}, "
+          f"r(b) = {corr([t[1] for t, _ in pairs], [p[1] for _, p in pairs]):.3f}")
+
+
+async def simulate(app, quiz_id, truth, sessions):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def student(token, theta):
+            headers = {"Authorization": f"Bearer {token}"}
+            timings = []
+            start = time.perf_counter()
+            response = await client.post("/api/v1/quizzes/attempt/adaptive/start", json={"quiz_id": quiz_id},
+                                         headers=headers)
+            step = response.json()
+            while step["question"] is not None:
+                a, b, correct = truth[step["question"]["id"]]
+                right = random.random() < probability(a, b, theta)
+                answer = correct if right else random.choice([o for o in OPTIONS if o != correct])
+                t0 = time.perf_counter()
+                response = await client.post(
+                    f"/api/v1/quizzes/attempt/{step['attempt_id']}/next",
+                    json={"question_id": step["question"]["id"], "answer": answer}, headers=headers,
+                )
+                match = SERVER_TIMING_RE.search(response.headers.get("server-timing", ""))
+                timings.append((time.perf_counter() - t0, int(match.group(1)) if match else None))
+                step = response.json()
+            result = (await client.post(f"/api/v1/quizzes/attempt/{step['attempt_id']}/finish", headers=headers)).json()
+            return theta, result, timings, time.perf_counter() - start
+
+        return [await student(token, theta) for token, theta in sessions]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=60)
+    parser.add_argument("--history", type=int, default=3000)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    quiz_id, truth, user_ids = seed(args.questions, args.history, args.students)
+
+    from fit_irt_models import fit
+
+    fit([quiz_id])
+    recovery(quiz_id, truth)
+
+    from app.core.security import create_access_token
+    from app.main import app
+
+    sessions = [
+        (create_access_token({"sub": str(uid), "role": "estudiante", "company_id": 1}), random.gauss(0, 1))
+        for uid in user_ids
+    ]
+    results = asyncio.run(simulate(app, quiz_id, truth, sessions))
+
+    lengths = [result["questions_answered"] for _, result, _, _ in results]
+    errors = [result["theta"] - theta for theta, result, _, _ in results]
+    steps = [elapsed * 1000 for _, _, timings, _ in results for elapsed, _ in timings]
+    statements = [count for _, _, timings, _ in results for _, count in timings if count is not None]
+    print(f"{len(results)} estudiantes: {sum(lengths) / len(lengths):.1f} preguntas en promedio "
+          f"(mín {min(lengths)}, máx {max(lengths)}; el quiz fijo usa 20)")
+    print(f"Error de theta: RMSE {math.sqrt(sum(e * e for e in errors) / len(errors)):.2f}")
+    print(f"Paso /next: {sum(steps) / len(steps):.1f} ms en promedio, "
+          f"{sum(statements) / max(len(statements), 1):.1f} sentencias SQL (incluye autenticación)")
@@ -0,0 +1,181 @@
+"""
+Prueba de carga del chat en tiempo real (WebSocket /api/v1/chat/ws).
+Crea --clients usuarios en una base SQLite temporal, levanta uvicorn en un
+subproceso (un worker, REALTIME_BACKEND=memory) y abre un WebSocket por
+usuario. Después --senders de esos clientes envían --messages mensajes en
+total por su socket a destinatarios al azar; cada remitente espera el eco de
+su mensaje antes de enviar el siguiente (carga en lazo cerrado).
+
+Reporta tiempo de conexión, mensajes/s entregados y latencia de entrega
+(envío del remitente -> recepción en el socket del destinatario), que incluye
+guardar el mensaje en la base.
+
+Uso:
+    python scripts/bench_chat_websocket.py --clients 5000 --senders 50 --messages 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_chat_websocket.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+os.environ["REALTIME_BACKEND"] = "memory"
+
+from bench_common import percentile, reset_schema
+
+
+def seed(clients: int):
+    """Empresa y un usuario por cliente (INSERT multi-fila)."""
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal
+    from app.core.enums import Role
+    from app.models import Company, User
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        company = Company(name="Empresa")
+        db.add(company)
+        db.flush()
+        db.execute(insert(User), [
+            {"email": f"usuario{i}@demo.com", "hashed_password": "x", "role": Role.ESTUDIANTE.value,
+             "company_id": company.id, "is_active": True}
+            for i in range(clients)
+        ])
+        db.commit()
+        return [user_id for (user_id,) in db.query(User.id).order_by(User.id).all()]
+    finally:
+        db.close()
+
+
+def start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--backlog", "8192"],
+        cwd=BACKEND_DIR, env=os.environ.copy(),
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("uvicorn no arrancó")
+
+
+async def run(port, user_ids, tokens, senders, messages):
+    import websockets
+
+    sent_at = {}
+    latencies = []
+    echoes = {}  # seq -> Future del remitente
+    delivered = 0
+
+    async def listen(user_id, socket):
+        nonlocal delivered
+        async for raw in socket:
+            event = json.loads(raw)
+            if event.get("type") != "message":
+                continue
+            data = event["data"]
+            seq = int(data["message"].split()[-1])
+            if data["receiver_id"] == user_id and data["sender_id"] != user_id:
+                latencies.append(time.perf_counter() - sent_at[seq])
+                delivered += 1
+            if data["sender_id"] == user_id and seq in echoes and not echoes[seq].done():
+                echoes[seq].set_result(None)
+
+    slots = asyncio.Semaphore(200)
+    sockets = {}
+
+    async def connect(user_id, token):
+        async with slots:
+            socket = await websockets.connect(
+                f"ws://127.0.0.1:{port}/api/v1/chat/ws?token={token}", ping_interval=None, max_queue=None,
+                open_timeout=60,
+            )
+        sockets[user_id] = socket
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connect(user_id, token) for user_id, token in zip(user_ids, tokens)))
+    connect_elapsed = time.perf_counter() - start
+    listeners = [asyncio.create_task(listen(user_id, socket)) for user_id, socket in sockets.items()]
+
+    counter = iter(range(messages))
+
+    async def sender(user_id):
+        socket = sockets[user_id]
+        for seq in counter:
+            receiver = random.choice(user_ids)
+            while receiver == user_id:
+                receiver = random.choice(user_ids)
+            echoes[seq] = asyncio.get_running_loop().create_future()
+            sent_at[seq] = time.perf_counter()
+            await socket.send(json.dumps({"type": "message", "receiver_id": receiver, "message": f"bench {seq}"}))
+            await asyncio.wait_for(echoes[seq], timeout=30)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender(user_id) for user_id in random.sample(user_ids, senders)))
+    deadline = time.perf_counter() + 10
+    while delivered < messages and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    send_elapsed = time.perf_counter() - start
+
+    for task in listeners:
+        task.cancel()
+    await asyncio.gather(*(socket.close() for socket in sockets.values()), return_exceptions=True)
+    return len(sockets), connect_elapsed, delivered, send_elapsed, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--senders", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    # Cada cliente usa un descriptor aquí y otro en el servidor
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.clients * 2 + 1024)), hard))
+
+    user_ids = seed(args.clients)
+
+    from app.core.security import create_access_token
+
+    tokens = [create_access_token({"sub": str(uid), "role": "estudiante", "company_id": 1}) for uid in user_ids]
+    server = start_server(args.port)
+    try:
+        connected, connect_elapsed, delivered, send_elapsed, latencies = asyncio.run(
+            run(args.port, user_ids, tokens, args.senders, args.messages)
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    latencies_ms = [value * 1000 for value in latencies]
+    print(f"{connected} WebSockets abiertos en {connect_elapsed:.1f} s")
+    print(f"{delivered}/{args.messages} mensajes entregados en {send_elapsed:.1f} s "
+          f"({delivered / send_elapsed:.0f} mensajes/s; {args.senders} remitentes en lazo cerrado)")
+    print(f"Latencia de entrega: p50 {percentile(latencies_ms, 50):.1f} ms, p95 {percentile(latencies_ms, 95):.1f} ms, "
+          f"p99 {percentile(latencies_ms, 99):.1f} ms")
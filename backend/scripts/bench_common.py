@@ -0,0 +1,72 @@
+"""
+Utilidades compartidas por los scripts de benchmark (bench_*.py): percentil
+de latencias, esquema nuevo y el fixture común de las pruebas de
+evaluaciones (empresa, profesor, curso, módulo y quiz; estudiantes).
+Las funciones de base de datos importan la aplicación al llamarse: cada
+script fija antes DATABASE_URL y demás variables de entorno.
+
+Uso (desde un script de scripts/):
+    from bench_common import create_students, percentile, reset_schema, seed_quiz
+"""
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from app.models import Company, User
+    from app.models.quiz import Quiz
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentil simple (nearest-rank) sobre una lista de valores."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def reset_schema() -> None:
+    """Borrar y crear todas las tablas en la base de DATABASE_URL."""
+    import app.models  # noqa: F401 - registra todas las tablas
+    from app.core.database import Base, engine
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_quiz(db, title: str = "Examen", total_questions: int = 20) -> Tuple["Company", "Quiz"]:
+    """Empresa, profesor, curso, módulo y su quiz (flush, sin commit). Retorna (company, quiz)."""
+    from app.core.enums import Role
+    from app.models import Company, Course, Module, User
+    from app.models.quiz import Quiz
+
+    company = Company(name="Empresa")
+    db.add(company)
+    db.flush()
+    professor = User(email="profesor@demo.com", hashed_password="x", role=Role.PROFESOR.value,
+                     company_id=company.id)
+    db.add(professor)
+    db.flush()
+    course = Course(company_id=company.id, title="Curso", description="...", instructor_id=professor.id)
+    db.add(course)
+    db.flush()
+    module = Module(course_id=course.id, title="Módulo", description="...", order=0)
+    db.add(module)
+    db.flush()
+    quiz = Quiz(module_id=module.id, title=title, passing_score=14.0, total_questions=total_questions)
+    db.add(quiz)
+    db.flush()
+    return company, quiz
+
+
+def create_students(db, company_id: int, count: int) -> List["User"]:
+    """`count` estudiantes alumno{i}@demo.com de la empresa (flush, sin commit)."""
+    from app.core.enums import Role
+    from app.models import User
+
+    users = [
+        User(email=f"alumno{i}@demo.com", hashed_password="x", role=Role.ESTUDIANTE.value, company_id=company_id)
+        for i in range(count)
+    ]
+    db.add_all(users)
+    db.flush()
+    return users
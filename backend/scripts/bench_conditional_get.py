@@ -0,0 +1,111 @@
+"""
+Medición del ahorro de las peticiones condicionales (ETag / If-None-Match).
+Simula navegaciones repetidas por un curso (curso, módulos, estructura y
+contenidos de cada módulo) contra una base SQLite temporal y compara:
+  - sin caché: el cliente nunca envía If-None-Match
+  - con ETag:  el cliente reenvía el ETag recibido (como hace el navegador)
+
+Reporta bytes de cuerpo transferidos y tiempo de CPU del proceso por navegación
+(cliente y servidor corren en el mismo proceso con TestClient).
+
+Uso:
+    python scripts/bench_conditional_get.py --modules 20 --contents 5 --rounds 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_conditional_get.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from bench_common import reset_schema
+
+
+def seed(modules: int, contents: int) -> int:
+    from app.core.database import SessionLocal
+    from app.core.enums import Role
+    from app.models import Company, Course, Module, ModuleContent, User
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        company = Company(name="Empresa")
+        db.add(company)
+        db.flush()
+        user = User(email="alumno@demo.com", hashed_password="x", role=Role.ESTUDIANTE.value, company_id=company.id)
+        db.add(user)
+        db.flush()
+        course = Course(company_id=company.id, title="Curso", description="Descripción " * 20, instructor_id=user.id)
+        db.add(course)
+        db.flush()
+        for m in range(modules):
+            module = Module(course_id=course.id, title=f"Módulo {m}", description="Texto " * 30, order=m)
+            db.add(module)
+            db.flush()
+            for c in range(contents):
+                db.add(ModuleContent(module_id=module.id, content_type="text", content="Contenido " * 200, order=c))
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def navigation_paths(client, headers):
+    modules = client.get("/api/v1/courses/1/modules", headers=headers).json()
+    paths = ["/api/v1/courses/1", "/api/v1/courses/1/modules", "/api/v1/courses/1/outline"]
+    paths += [f"/api/v1/courses/modules/{m['id']}/contents" for m in modules]
+    return paths
+
+
+def run(client, headers, paths, rounds: int, etags=None):
+    """Navegar `rounds` veces; con `etags` se reenvían y actualizan los ETag recibidos."""
+    body_bytes = 0
+    not_modified = 0
+    start = time.process_time()
+    for _ in range(rounds):
+        for path in paths:
+            request_headers = dict(headers)
+            if etags is not None and path in etags:
+                request_headers["If-None-Match"] = etags[path]
+            response = client.get(path, headers=request_headers)
+            body_bytes += len(response.content)
+            not_modified += response.status_code == 304
+            if etags is not None and "etag" in response.headers:
+                etags[path] = response.headers["etag"]
+    cpu = time.process_time() - start
+    return body_bytes / rounds, cpu / rounds * 1000, not_modified
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--contents", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    user_id = seed(args.modules, args.contents)
+
+    from fastapi.testclient import TestClient
+    from app.core.security import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": str(user_id), "role": "estudiante", "company_id": 1})
+    headers = {"Authorization": f"Bearer {token}"}
+    client = TestClient(app)
+    paths = navigation_paths(client, headers)
+    etags = {}
+    run(client, headers, paths, 2, etags)  # calentamiento: el navegador ya visitó el curso
+
+    print(f"{len(paths)} peticiones por navegación, {args.rounds} navegaciones")
+    print(f"{'modo':<10} {'bytes/navegación':>18} {'CPU ms/navegación':>18} {'304':>6}")
+    for label, known_etags in (("sin caché", None), ("con ETag", etags)):
+        size, cpu, hits = run(client, headers, paths, args.rounds, known_etags)
+        print(f"{label:<10} {size:>18.0f} {cpu:>18.1f} {hits:>6}")
@@ -0,0 +1,93 @@
+"""
+Latencia de obtención de conexiones por estrategia de pool (DB_POOL_MODE).
+Para cada modo crea un engine con build_engine() y ejecuta, desde varios hilos,
+ciclos "obtener conexión + SELECT 1 + devolver" como haría una petición:
+  - null:          NullPool (serverless): conexión nueva por checkout
+  - queue:         QueuePool LIFO con pre-ping (uvicorn)
+  - queue-no-ping: QueuePool sin pre-ping (un round trip menos por checkout)
+
+Reporta percentiles de la obtención (engine.connect()) y del ciclo completo, y
+las conexiones físicas abiertas. Usar contra el Postgres real o el pooler de
+Supabase (puerto 6543) para resultados representativos; con SQLite solo
+compara el overhead del pool.
+
+Uso:
+    DATABASE_URL=postgresql://... python scripts/bench_db_connections.py --threads 4 --iterations 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_db_connections.db")
+os.environ.setdefault("QUERY_STATS_ENABLED", "false")
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import build_engine, pool_stats
+from bench_common import percentile
+
+MODES = {
+    "null": ("null", None),
+    "queue": ("queue", True),
+    "queue-no-ping": ("queue", False),
+}
+
+
+def worker(engine, iterations: int, pause: float, acquire, total):
+    for _ in range(iterations):
+        start = time.perf_counter()
+        with engine.connect() as connection:
+            acquired = time.perf_counter()
+            connection.execute(text("SELECT 1")).scalar()
+        end = time.perf_counter()
+        acquire.append((acquired - start) * 1000)
+        total.append((end - start) * 1000)
+        if pause:
+            time.sleep(pause)
+
+
+def run_mode(name: str, threads: int, iterations: int, pause: float):
+    mode, pre_ping = MODES[name]
+    if pre_ping is not None:
+        settings.DB_POOL_PRE_PING = pre_ping
+    engine = build_engine(mode)
+    try:
+        acquire, total = [], []
+        workers = [
+            threading.Thread(target=worker, args=(engine, iterations, pause, acquire, total))
+            for _ in range(threads)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return acquire, total, pool_stats(engine)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help="Modos separados por coma")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=200, help="Ciclos por hilo")
+    parser.add_argument("--pause-ms", type=float, default=0.0, help="Pausa entre ciclos (tiempo de la petición)")
+    args = parser.parse_args()
+
+    print(f"{args.threads} hilos x {args.iterations} ciclos contra {settings.get_database_url().split('@')[-1]}")
+    print(f"{'modo':<15} {'obtener p50':>12} {'p95':>8} {'p99':>8} {'ciclo p50':>10} {'p95':>8} {'conexiones':>11}")
+    for name in args.modes.split(","):
+        acquire, total, stats = run_mode(name.strip(), args.threads, args.iterations, args.pause_ms / 1000)
+        print(
+            f"{name:<15} {percentile(acquire, 50):>9.3f} ms {percentile(acquire, 95):>8.3f} {percentile(acquire, 99):>8.3f}"
+            f" {percentile(total, 50):>7.3f} ms {percentile(total, 95):>8.3f} {stats['connects']:>11}"
+        )
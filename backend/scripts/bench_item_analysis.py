@@ -0,0 +1,159 @@
+"""
+Benchmark del análisis de ítems sobre un quiz grande.
+Genera en una base SQLite temporal un quiz de --questions preguntas de opción
+múltiple y --attempts intentos (attempts x questions respuestas; por defecto
+1.000.000) con un modelo de habilidad simple, de modo que las preguntas tienen
+dificultades y discriminaciones distintas. Mide la lectura en streaming, el
+cálculo vectorizado y la escritura de resultados.
+
+Con --check compara dificultad y discriminación con un cálculo directo por
+pregunta en Python puro (sobre una muestra de preguntas).
+
+Uso:
+    python scripts/bench_item_analysis.py --attempts 25000 --questions 40 --check
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_item_analysis.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+
+OPTIONS = ["a", "b", "c", "d"]
+BATCH = 20_000
+
+from bench_common import create_students, reset_schema, seed_quiz
+
+
+def seed(attempts: int, questions: int):
+    """Crear el quiz y sus intentos con inserts multi-fila. Retorna el quiz_id."""
+    import json
+    from datetime import datetime
+
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal
+    from app.models.quiz import Answer, Attempt, Question
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        company, quiz = seed_quiz(db, total_questions=questions)
+        (student,) = create_students(db, company.id, 1)
+        items = []
+        for i in range(questions):
+            items.append({
+                "correct": random.choice(OPTIONS),
+                "difficulty": random.uniform(-1.5, 1.5),
+                "discrimination": random.uniform(0.2, 2.0),
+            })
+        question_rows = [
+            Question(quiz_id=quiz.id, question_text=f"Pregunta {i}", correct_answer=item["correct"],
+                     options=json.dumps([o.upper() for o in OPTIONS]), order=i)
+            for i, item in enumerate(items)
+        ]
+        db.add_all(question_rows)
+        db.flush()
+        question_ids = [q.id for q in question_rows]
+
+        start = time.perf_counter()
+        attempt = {"user_id": student.id, "quiz_id": quiz.id, "score": 0.0, "completed_at": datetime.utcnow()}
+        first_attempt = db.execute(insert(Attempt).values(**attempt).returning(Attempt.id)).scalar_one()
+        db.execute(insert(Attempt), [attempt] * (attempts - 1))
+        rows = []
+        for attempt_id in range(first_attempt, first_attempt + attempts):
+            ability = random.gauss(0, 1)
+            for qid, item in zip(question_ids, items):
+                p = 1 / (1 + math.exp(-item["discrimination"] * (ability - item["difficulty"])))
+                roll = random.random()
+                if roll < p:
+                    text, correct = item["correct"], True
+                elif roll < p + (1 - p) * 0.05:
+                    text, correct = "", False
+                else:
+                    text, correct = random.choice([o for o in OPTIONS if o != item["correct"]]), False
+                rows.append({"attempt_id": attempt_id, "question_id": qid, "answer_text": text,
+                             "is_correct": correct, "points_earned": 1.0 if correct else 0.0})
+            if len(rows) >= BATCH:
+                db.execute(insert(Answer), rows)
+                rows = []
+        if rows:
+            db.execute(insert(Answer), rows)
+        db.commit()
+        print(f"Datos generados: {attempts * questions} respuestas en {time.perf_counter() - start:.1f} s")
+        return quiz.id
+    finally:
+        db.close()
+
+
+def check(db, quiz_id: int, sample: int = 5) -> None:
+    """Dificultad y discriminación por pregunta en Python puro (referencia)."""
+    from app.models.quiz import Answer, Attempt, QuestionItemStats
+
+    rows = (
+        db.query(Answer.attempt_id, Answer.question_id, Answer.is_correct)
+        .join(Attempt, Attempt.id == Answer.attempt_id)
+        .filter(Attempt.quiz_id == quiz_id)
+        .all()
+    )
+    totals, by_question = {}, {}
+    for attempt_id, question_id, is_correct in rows:
+        totals[attempt_id] = totals.get(attempt_id, 0) + int(is_correct)
+        by_question.setdefault(question_id, []).append((attempt_id, int(is_correct)))
+
+    worst = 0.0
+    for question_id in sorted(by_question)[:sample]:
+        pairs = by_question[question_id]
+        xs = [x for _, x in pairs]
+        ys = [totals[a] - x for a, x in pairs]
+        n = len(xs)
+        mx, my = sum(xs) / n, sum(ys) / n
+        cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / n
+        sx = math.sqrt(sum((x - mx) ** 2 for x in xs) / n)
+        sy = math.sqrt(sum((y - my) ** 2 for y in ys) / n)
+        stored = db.get(QuestionItemStats, question_id)
+        worst = max(worst, abs(stored.difficulty - mx), abs(stored.discrimination - cov / (sx * sy)))
+    print(f"Diferencia máxima con el cálculo de referencia ({sample} preguntas): {worst:.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=25_000)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--check", action="store_true", help="Verificar contra un cálculo directo")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    quiz_id = seed(args.attempts, args.questions)
+
+    from app.core.database import SessionLocal
+    from app.services import item_analysis
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        report = item_analysis.run_quiz(db, quiz_id, args.chunk_size)
+        db.commit()
+        total = time.perf_counter() - start
+        print(f"{report['answers']} respuestas, {report['attempts']} intentos, {report['questions']} preguntas")
+        print(f"Lectura en streaming: {report['seconds_reading']:.2f} s "
+              f"({report['answers'] / max(report['seconds_reading'], 1e-9):,.0f} filas/s)")
+        print(f"Cálculo vectorizado: {report['seconds_computing'] * 1000:.0f} ms")
+        print(f"Total (incluye escritura): {total:.2f} s")
+        if args.check:
+            check(db, quiz_id)
+    finally:
+        db.close()
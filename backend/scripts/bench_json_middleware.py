@@ -0,0 +1,131 @@
+"""
+Benchmark del middleware de errores JSON.
+Compara el middleware anterior (@app.middleware("http"), BaseHTTPMiddleware)
+con JSONErrorMiddleware (ASGI puro) sobre una app mínima con:
+  - GET /health: respuesta JSON pequeña (peticiones/segundo)
+  - GET /stream: StreamingResponse de 20 fragmentos de 4 KB
+    (peticiones/segundo y tiempo hasta el primer byte con un productor lento)
+
+Las peticiones se envían directamente a la app ASGI, sin red ni servidor,
+para medir solo el costo del middleware.
+
+Uso:
+    python scripts/bench_json_middleware.py --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.json_errors import JSONErrorMiddleware
+
+CHUNK = b"x" * 4096
+CHUNKS = 20
+
+
+async def legacy_ensure_json_response(request: Request, call_next):
+    """Middleware anterior de main.py (sin los print), como referencia."""
+    try:
+        response = await call_next(request)
+        content_type = response.headers.get("content-type", "")
+        if response.status_code >= 400 and "text/plain" in content_type:
+            error_text = response.body.decode("utf-8") if hasattr(response, "body") else "Internal Server Error"
+            return JSONResponse(status_code=response.status_code, content={"detail": error_text})
+        return response
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": f"Error en middleware: {str(e)}"}
+        )
+
+
+def build_app(mode: str, delay: float) -> FastAPI:
+    app = FastAPI()
+    if mode == "before":
+        app.middleware("http")(legacy_ensure_json_response)
+    elif mode == "after":
+        app.add_middleware(JSONErrorMiddleware)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/stream")
+    async def stream():
+        async def produce():
+            for _ in range(CHUNKS):
+                if delay:
+                    await asyncio.sleep(delay)
+                yield CHUNK
+        return StreamingResponse(produce(), media_type="application/octet-stream")
+
+    return app
+
+
+async def request(app, path: str) -> float:
+    """Ejecutar una petición ASGI y retornar el tiempo hasta el primer byte del cuerpo."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    start = time.perf_counter()
+    first_byte = None
+
+    request_sent = False
+
+    async def receive():
+        # Como un servidor real: el cuerpo una vez y luego esperar la desconexión
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and first_byte is None and message.get("body"):
+            first_byte = time.perf_counter() - start
+
+    await app(scope, receive, send)
+    return first_byte or 0.0
+
+
+async def throughput(app, path: str, total: int, concurrency: int = 50) -> float:
+    """Peticiones por segundo con `concurrency` peticiones simultáneas."""
+    async def worker(n):
+        for _ in range(n):
+            await request(app, path)
+
+    per_worker = total // concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def main(total: int) -> None:
+    print(f"{'modo':<8} {'/health req/s':>14} {'/stream req/s':>14} {'TTFB stream lento':>18}")
+    for mode in ("none", "before", "after"):
+        app = build_app(mode, delay=0)
+        slow_app = build_app(mode, delay=0.01)
+        await throughput(app, "/health", 500)  # calentamiento
+        health_rps = await throughput(app, "/health", total)
+        stream_rps = await throughput(app, "/stream", total)
+        ttfb = sum([await request(slow_app, "/stream") for _ in range(10)]) / 10
+        print(f"{mode:<8} {health_rps:>14.0f} {stream_rps:>14.0f} {ttfb * 1000:>15.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
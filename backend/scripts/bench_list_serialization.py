@@ -0,0 +1,97 @@
+"""
+Microbenchmark de serialización de listados.
+Compara, sobre N filas ORM en memoria, la ruta estándar de FastAPI
+(validación contra response_model + jsonable_encoder + json.dumps) con
+list_response (TypeAdapter from_attributes + orjson) para los esquemas de
+get_courses, get_users, get_events y get_notifications.
+
+Uso:
+    python scripts/bench_list_serialization.py --rows 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+# No se consulta la base de datos: las filas se construyen en memoria
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_serialization.db")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.v1.routers.courses import CourseResponse
+from app.api.v1.routers.events import EventResponse
+from app.api.v1.routers.notifications import NotificationResponse
+from app.core.enums import EventType, NotificationType, Role
+from app.core.serialization import list_response
+from app.models import Course, Event, Notification, User
+from app.schemas.user import UserResponse
+
+
+def build_rows(n: int):
+    now = datetime.now(timezone.utc)
+    return {
+        "get_courses": (CourseResponse, [
+            Course(id=i, company_id=1, title=f"Curso {i}", description="Descripción " * 10,
+                   instructor_id=1, is_active=True, created_at=now)
+            for i in range(n)
+        ]),
+        "get_users": (UserResponse, [
+            User(id=i, email=f"user{i}@demo.com", role=Role.ESTUDIANTE.value, company_id=1,
+                 is_active=True, is_verified=False, created_at=now)
+            for i in range(n)
+        ]),
+        "get_events": (EventResponse, [
+            Event(id=i, company_id=1, user_id=1, title=f"Evento {i}", description="...",
+                  event_type=EventType.TRAINING, start_time=now, end_time=now + timedelta(hours=1),
+                  location="Sala 1", is_all_day=False, created_at=now)
+            for i in range(n)
+        ]),
+        "get_notifications": (NotificationResponse, [
+            Notification(id=i, user_id=1, notification_type=NotificationType.SYSTEM, title="Aviso",
+                         message="Mensaje " * 10, is_read=False, link="/cursos", created_at=now)
+            for i in range(n)
+        ]),
+    }
+
+
+def standard(schema, rows) -> bytes:
+    """Ruta por defecto de FastAPI al retornar objetos ORM con response_model."""
+    field = create_response_field(name="response", type_=List[schema])
+    content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def fast(schema, rows) -> bytes:
+    return list_response(rows, schema).body
+
+
+def measure(func, schema, rows, repeat: int) -> float:
+    func(schema, rows)  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(schema, rows)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<20} {'estándar':>12} {'rápido':>12} {'mejora':>8}")
+    for name, (schema, rows) in build_rows(args.rows).items():
+        base = measure(standard, schema, rows, args.repeat)
+        quick = measure(fast, schema, rows, args.repeat)
+        print(f"{name:<20} {base:>9.1f} ms {quick:>9.1f} ms {base / quick:>7.1f}x")
@@ -0,0 +1,95 @@
+"""
+Benchmark del costo de logging por petición autenticada.
+Ejecuta la ruta de autenticación (decode_token + require_role) N veces con tres
+configuraciones, cada una en un proceso separado:
+  - off:   logging deshabilitado
+  - sync:  configuración anterior (DEBUG, FileHandler + StreamHandler síncronos)
+  - queue: pipeline actual (QueueHandler/QueueListener, JSON y muestreo)
+
+Uso:
+    python scripts/bench_logging_overhead.py --iterations 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def configure(mode: str, log_file: str) -> None:
+    """Aplicar la configuración de logging correspondiente al modo."""
+    if mode == "off":
+        logging.disable(logging.CRITICAL)
+    elif mode == "sync":
+        logging.basicConfig(
+            level=logging.DEBUG,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler(log_file, encoding='utf-8', mode='a'),
+                logging.StreamHandler(open(os.devnull, "w", encoding="utf-8")),
+            ]
+        )
+    else:
+        from app.core import logging_config
+        from app.core.config import settings
+        settings.LOG_TO_FILE = False
+        logging_config.setup_logging()
+        # Redirigir la consola del listener a /dev/null para no medir la terminal
+        for handler in logging_config._listener.handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(open(os.devnull, "w", encoding="utf-8"))
+
+
+async def run(iterations: int) -> float:
+    """Ejecutar la ruta de autenticación y retornar microsegundos por petición."""
+    from app.core.dependencies import require_role
+    from app.core.enums import Role
+    from app.core.security import create_access_token, decode_token
+
+    token = create_access_token({"sub": "1", "role": Role.PROFESOR.value, "company_id": 1})
+    user = SimpleNamespace(id=1, email="bench@demo.com", role=Role.PROFESOR.value, company_id=1)
+    checker = require_role([Role.PROFESOR, Role.ADMINISTRADOR])
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_token(token)
+        await checker(current_user=user)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1_000_000
+
+
+def child(mode: str, iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(mode, os.path.join(tmp, "bench.log"))
+        per_request = asyncio.run(run(iterations))
+        print(f"{mode:>5}: {per_request:8.1f} µs/petición")
+        if mode == "queue":
+            from app.core.logging_config import shutdown_logging
+            shutdown_logging()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--mode", choices=["off", "sync", "queue"])
+    args = parser.parse_args()
+
+    if args.mode:
+        child(args.mode, args.iterations)
+    else:
+        os.environ.setdefault("SECRET_KEY", "bench-secret")
+        # La ruta de autenticación no toca la base de datos en este benchmark
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_logging.db")
+        for mode in ("off", "sync", "queue"):
+            subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--iterations", str(args.iterations)],
+                check=True
+            )
@@ -0,0 +1,72 @@
+"""
+Benchmark de tormenta de logins.
+Lanza logins concurrentes contra el servidor y, en paralelo, mide la latencia
+de un endpoint no relacionado (/health) para detectar bloqueos del event loop.
+
+Uso:
+    uvicorn app.main:app --port 8000
+    python scripts/bench_login_storm.py --email user@demo.com --password secret
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from bench_common import percentile
+
+
+async def login_worker(client, args, results):
+    """Ejecutar logins en bucle hasta agotar el tiempo del benchmark."""
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": args.email, "password": args.password}
+        )
+        results.setdefault(response.status_code, []).append(time.perf_counter() - start)
+
+
+async def health_probe(client, args, latencies):
+    """Medir /health a intervalos regulares mientras dura la tormenta."""
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(args.probe_interval)
+
+
+async def main(args):
+    login_results = {}
+    health_latencies = []
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        tasks = [login_worker(client, args, login_results) for _ in range(args.concurrency)]
+        tasks.append(health_probe(client, args, health_latencies))
+        await asyncio.gather(*tasks)
+
+    total_logins = sum(len(v) for v in login_results.values())
+    print("=" * 50)
+    print(f"Concurrencia: {args.concurrency}  Duración: {args.duration}s")
+    print(f"Logins totales: {total_logins} ({total_logins / args.duration:.1f} req/s)")
+    for code, latencies in sorted(login_results.items()):
+        print(f"  HTTP {code}: {len(latencies)} (p50={statistics.median(latencies) * 1000:.1f} ms)")
+    print(f"/health muestras: {len(health_latencies)}")
+    print(f"  p50={percentile(health_latencies, 50) * 1000:.1f} ms")
+    print(f"  p99={percentile(health_latencies, 99) * 1000:.1f} ms")
+    print(f"  max={max(health_latencies, default=0) * 1000:.1f} ms")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,154 @@
+"""
+Prueba de carga del autoguardado de evaluaciones.
+Crea un quiz de --questions preguntas y --students estudiantes en una base
+SQLite temporal; cada estudiante inicia una sesión (POST /attempt/session) y
+envía --rounds autoguardados (PATCH /attempt/{id}/autosave, una o dos
+preguntas cada vez, todos los estudiantes a la vez por ronda) separados por
+--interval segundos, y al final entrega (POST /attempt/{id}/submit). A lo
+sumo --concurrency peticiones en vuelo (como un worker con su pool de
+conexiones; con sesiones síncronas más peticiones que conexiones se bloquean).
+
+Reporta latencia del autoguardado, peticiones de autoguardado frente a
+sentencias UPDATE de borradores (métrica quiz_autosave_total) y verifica que
+la calificación de la entrega coincide con la de las respuestas enviadas.
+
+Uso:
+    python scripts/bench_quiz_autosave.py --students 300 --rounds 20 --interval 0.25
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_quiz_autosave.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+os.environ.setdefault("AUTOSAVE_FLUSH_SECONDS", "1.0")
+os.environ.setdefault("AUTOSAVE_BACKEND", "memory")  # Un solo proceso: buffer en memoria
+
+OPTIONS = ["a", "b", "c", "d"]
+
+from bench_common import create_students, percentile, reset_schema, seed_quiz
+
+
+def seed(students: int, questions: int):
+    """Crear empresa, curso, módulo, quiz, preguntas y estudiantes."""
+    from app.core.database import SessionLocal
+    from app.models.quiz import Question
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        company, quiz = seed_quiz(db, total_questions=questions)
+        question_rows = [
+            Question(quiz_id=quiz.id, question_text=f"Pregunta {i}", correct_answer=random.choice(OPTIONS), order=i)
+            for i in range(questions)
+        ]
+        db.add_all(question_rows)
+        users = create_students(db, company.id, students)
+        db.commit()
+        return quiz.id, [q.id for q in question_rows], [u.id for u in users]
+    finally:
+        db.close()
+
+
+async def run(app, quiz_id, question_ids, tokens, rounds, interval, concurrency):
+    import httpx
+
+    slots = asyncio.Semaphore(concurrency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+        async def call(method, url, **kwargs):
+            async with slots:
+                return await client.request(method, url, **kwargs)
+
+        sessions = await asyncio.gather(*(
+            call("POST", "/api/v1/quizzes/attempt/session", json={"quiz_id": quiz_id}, headers=h) for h in headers
+        ))
+        attempt_ids = [response.json()["attempt_id"] for response in sessions]
+        answers = [dict() for _ in tokens]
+        latencies, statuses = [], {}
+
+        async def autosave(index):
+            changed = {qid: random.choice(OPTIONS) for qid in random.sample(question_ids, random.randint(1, 2))}
+            answers[index].update(changed)
+            start = time.perf_counter()
+            response = await call(
+                "PATCH", f"/api/v1/quizzes/attempt/{attempt_ids[index]}/autosave",
+                json={"answers": {str(k): v for k, v in changed.items()}}, headers=headers[index],
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(autosave(i) for i in range(len(tokens))))
+            await asyncio.sleep(interval)
+        elapsed = time.perf_counter() - start
+
+        # Reanudar: el borrador debe contener todo lo enviado
+        drafts = await asyncio.gather(*(
+            call("GET", f"/api/v1/quizzes/attempt/{attempt_id}/draft", headers=h)
+            for attempt_id, h in zip(attempt_ids, headers)
+        ))
+        drafts_ok = all(
+            {int(k): v for k, v in response.json()["answers"].items()} == sent
+            for response, sent in zip(drafts, answers)
+        )
+        submissions = await asyncio.gather(*(
+            call("POST", f"/api/v1/quizzes/attempt/{attempt_id}/submit", json={}, headers=h)
+            for attempt_id, h in zip(attempt_ids, headers)
+        ))
+        return attempt_ids, answers, latencies, statuses, elapsed, drafts_ok, [r.json() for r in submissions]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.25, help="Segundos entre rondas de autoguardado")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    quiz_id, question_ids, user_ids = seed(args.students, args.questions)
+
+    from app.core.metrics import QUIZ_AUTOSAVE
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.services.grading import get_answer_key, grade
+    from app.core.database import SessionLocal
+
+    tokens = [create_access_token({"sub": str(uid), "role": "estudiante", "company_id": 1}) for uid in user_ids]
+    attempt_ids, answers, latencies, statuses, elapsed, drafts_ok, results = asyncio.run(
+        run(app, quiz_id, question_ids, tokens, args.rounds, args.interval, args.concurrency)
+    )
+
+    counts = {labels[0]: value for labels, value in QUIZ_AUTOSAVE._values.items()}
+    db = SessionLocal()
+    try:
+        key = get_answer_key(db, quiz_id)
+    finally:
+        db.close()
+    scores_ok = all(abs(result["score"] - grade(key, sent).score) < 1e-9 for result, sent in zip(results, answers))
+
+    print(f"{len(latencies)} autoguardados de {args.students} estudiantes en {elapsed:.1f} s; estados {statuses}")
+    print(f"Latencia autoguardado: p50 {percentile(latencies, 50):.1f} ms, p99 {percentile(latencies, 99):.1f} ms")
+    print(f"Escrituras de borradores: {int(counts.get('batch', 0))} sentencias UPDATE para "
+          f"{int(counts.get('flushed', 0))} intentos (sin buffer: {int(counts.get('received', 0))} UPDATE)")
+    print(f"Borradores completos al reanudar: {'sí' if drafts_ok else 'NO'}")
+    print(f"Calificación de la entrega = respuestas enviadas: {'sí' if scores_ok else 'NO'}")
@@ -0,0 +1,185 @@
+"""
+Prueba de carga de POST /api/v1/quizzes/attempt (ventana de examen).
+Crea un quiz con --questions preguntas y --students estudiantes en una base
+SQLite temporal (o en DATABASE_URL con --keep-db) y lanza todas las entregas a
+la vez contra la aplicación en el mismo proceso (httpx + ASGI).
+
+Reporta latencia (p50/p95/p99), entregas por segundo y sentencias SQL por
+entrega (de la cabecera Server-Timing). Con --compare también califica las
+mismas entregas con la implementación anterior (un objeto ORM Answer por
+pregunta + flush + UPDATE del intento) para comparar tiempo y sentencias.
+
+Uso:
+    python scripts/bench_quiz_submissions.py --students 500 --questions 30 --compare
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_quiz_submissions.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+if "--keep-db" not in sys.argv:
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+
+SERVER_TIMING_RE = re.compile(r'desc="(\d+) queries"')
+OPTIONS = ["a", "b", "c", "d"]
+
+from bench_common import create_students, percentile, reset_schema, seed_quiz
+
+
+def seed(students: int, questions: int):
+    """Crear empresa, curso, módulo, quiz, preguntas y estudiantes. Retorna (quiz_id, question_ids, user_ids)."""
+    from app.core.database import SessionLocal
+    from app.models.quiz import Question
+
+    reset_schema()
+    db = SessionLocal()
+    try:
+        company, quiz = seed_quiz(db, title="Examen final", total_questions=questions)
+        question_rows = [
+            Question(quiz_id=quiz.id, question_text=f"Pregunta {i}", correct_answer=random.choice(OPTIONS),
+                     points=1.0 + (i % 3), order=i)
+            for i in range(questions)
+        ]
+        db.add_all(question_rows)
+        users = create_students(db, company.id, students)
+        db.commit()
+        return quiz.id, [q.id for q in question_rows], [u.id for u in users]
+    finally:
+        db.close()
+
+
+def random_answers(question_ids):
+    # Algunas respuestas con mayúsculas/espacios y algunas preguntas sin responder
+    return {
+        qid: random.choice(OPTIONS + [" A ", "B"]) for qid in question_ids if random.random() > 0.05
+    }
+
+
+async def submit_all(app, quiz_id, submissions):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def submit(token, answers):
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/quizzes/attempt",
+                json={"quiz_id": quiz_id, "answers": {str(k): v for k, v in answers.items()}},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            elapsed = time.perf_counter() - start
+            match = SERVER_TIMING_RE.search(response.headers.get("server-timing", ""))
+            return response.status_code, elapsed, int(match.group(1)) if match else None
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(submit(token, answers) for token, answers in submissions))
+        return results, time.perf_counter() - start
+
+
+def legacy_submit(db, user_id, quiz_id, answers):
+    """Implementación anterior de submit_attempt (referencia para --compare)."""
+    from datetime import datetime
+
+    from app.models.quiz import Answer, Attempt, Question, Quiz
+
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    questions = db.query(Question).filter(Question.quiz_id == quiz.id).all()
+    total_points = 0.0
+    max_points = sum(q.points for q in questions)
+    attempt = Attempt(user_id=user_id, quiz_id=quiz.id, score=0.0)
+    db.add(attempt)
+    db.flush()
+    for question in questions:
+        user_answer = answers.get(question.id, "")
+        is_correct = user_answer.lower().strip() == question.correct_answer.lower().strip()
+        points = question.points if is_correct else 0.0
+        db.add(Answer(attempt_id=attempt.id, question_id=question.id, answer_text=user_answer,
+                      is_correct=is_correct, points_earned=points))
+        total_points += points
+    score = (total_points / max_points) * 20 if max_points > 0 else 0
+    attempt.score = score
+    attempt.is_passed = score >= quiz.passing_score
+    attempt.completed_at = datetime.utcnow()
+    db.commit()
+    db.refresh(attempt)
+    return score
+
+
+def engine_submit(db, user_id, quiz_id, answers):
+    from app.services.grading import get_answer_key, grade, store_attempt
+
+    result = grade(get_answer_key(db, quiz_id), answers)
+    store_attempt(db, user_id, quiz_id, result)
+    db.commit()
+    return result.score
+
+
+def compare(quiz_id, user_ids, all_answers):
+    """Tiempo y sentencias por entrega de cada implementación, en secuencia y sin HTTP."""
+    from app.core.database import SessionLocal
+    from app.core.query_stats import track_queries
+
+    scores = {}
+    print(f"\n{'implementación':<16} {'ms/entrega':>11} {'sentencias':>11}")
+    for label, func in (("anterior (ORM)", legacy_submit), ("motor", engine_submit)):
+        db = SessionLocal()
+        try:
+            with track_queries() as stats:
+                start = time.perf_counter()
+                scores[label] = [func(db, uid, quiz_id, ans) for uid, ans in zip(user_ids, all_answers)]
+                elapsed = time.perf_counter() - start
+        finally:
+            db.close()
+        print(f"{label:<16} {elapsed / len(user_ids) * 1000:>11.2f} {stats.count / len(user_ids):>11.1f}")
+    same = all(abs(a - b) < 1e-9 for a, b in zip(*scores.values()))
+    print(f"Mismas calificaciones: {'sí' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--compare", action="store_true", help="Comparar con la implementación anterior")
+    parser.add_argument("--keep-db", action="store_true", help="Usar DATABASE_URL del entorno (¡borra las tablas!)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    quiz_id, question_ids, user_ids = seed(args.students, args.questions)
+    all_answers = [random_answers(question_ids) for _ in user_ids]
+
+    from app.core.security import create_access_token
+    from app.main import app
+
+    submissions = [
+        (create_access_token({"sub": str(uid), "role": "estudiante", "company_id": 1}), answers)
+        for uid, answers in zip(user_ids, all_answers)
+    ]
+    results, wall = asyncio.run(submit_all(app, quiz_id, submissions))
+
+    statuses = {}
+    for status_code, _, _ in results:
+        statuses[status_code] = statuses.get(status_code, 0) + 1
+    latencies = [elapsed * 1000 for _, elapsed, _ in results]
+    statements = [count for _, _, count in results if count is not None]
+    print(f"{len(results)} entregas simultáneas, {args.questions} preguntas: {wall:.2f} s ({len(results) / wall:.0f} entregas/s)")
+    print(f"Estados: {statuses}")
+    print(f"Latencia p50 {percentile(latencies, 50):.1f} ms, p95 {percentile(latencies, 95):.1f} ms, "
+          f"p99 {percentile(latencies, 99):.1f} ms")
+    if statements:
+        print(f"Sentencias SQL por entrega (incluye autenticación): {sum(statements) / len(statements):.1f}")
+
+    if args.compare:
+        compare(quiz_id, user_ids, all_answers)
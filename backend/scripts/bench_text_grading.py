@@ -0,0 +1,118 @@
+"""
+Latencia de calificación de intentos con preguntas de texto.
+Arma en memoria (sin base de datos) una clave de --questions preguntas de
+texto con respuestas de 5 a --max-length caracteres y califica --attempts
+intentos con errores típicos: tildes, mayúsculas, espacios extra, errores de
+tipeo (dentro y fuera del umbral) y respuestas en blanco. Mide solo grade()
+(sin la petición de embeddings) e indica si se usa rapidfuzz o la distancia
+de edición en Python puro.
+
+Uso:
+    python scripts/bench_text_grading.py --questions 20 --attempts 2000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+
+from bench_common import percentile
+
+WORDS = ["evaluación", "química", "módulo", "gestión", "seguridad", "prevención", "riesgo", "auditoría",
+         "información", "calidad", "proceso", "jerarquía", "ergonomía", "protección", "señalización", "equipo"]
+EXAMPLES = [
+    ("Prevención de riesgos", "prevencion  de riesgos"),
+    ("Prevención de riesgos", "prevension de riesgos"),
+    ("Ergonomía", "ergonomia"),
+    ("Ergonomía", "economía"),
+    ("gato", "pato"),
+]
+
+
+def reference_text(max_length: int) -> str:
+    text = random.choice(WORDS).capitalize()
+    target = random.randint(5, max_length)
+    while len(text) < target:
+        text += " " + random.choice(WORDS)
+    return text[:target].strip()
+
+
+def typo(text: str, edits: int) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        position = random.randrange(max(len(chars), 1))
+        action = random.choice(("replace", "delete", "insert"))
+        if action == "replace" and chars:
+            chars[position] = random.choice(string.ascii_lowercase)
+        elif action == "delete" and chars:
+            del chars[position]
+        else:
+            chars.insert(position, random.choice(string.ascii_lowercase))
+    return "".join(chars)
+
+
+def student_answer(reference: str) -> str:
+    roll = random.random()
+    if roll < 0.3:
+        return reference
+    if roll < 0.5:
+        # Sin tildes, mayúsculas y espacios extra
+        return "  " + reference.upper().replace("ó", "o").replace("í", "i").replace(" ", "  ") + " "
+    if roll < 0.75:
+        return typo(reference, 1)
+    if roll < 0.95:
+        return typo(reference, max(2, len(reference) // 3))
+    return ""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--max-length", type=int, default=80)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    from app.core.config import settings
+    from app.services import grading
+
+    threshold = settings.GRADING_FUZZY_THRESHOLD
+    references = [reference_text(args.max_length) for _ in range(args.questions)]
+    key = grading.AnswerKey(
+        quiz_id=1,
+        passing_score=14.0,
+        entries=tuple(
+            grading.KeyEntry(question_id=i, answer=grading.normalize_text_answer(text), points=1.0,
+                             fuzzy_threshold=threshold, text=True)
+            for i, text in enumerate(references)
+        ),
+    )
+    attempts = [{i: student_answer(text) for i, text in enumerate(references)} for _ in range(args.attempts)]
+
+    timings, correct = [], 0
+    for answers in attempts:
+        start = time.perf_counter()
+        result = grading.grade(key, answers)
+        timings.append((time.perf_counter() - start) * 1000)
+        correct += sum(answer.is_correct for answer in result.answers)
+
+    backend = "rapidfuzz" if grading._rapidfuzz_levenshtein is not None else "Python puro"
+    print(f"Distancia de edición: {backend}; umbral de similitud {threshold}")
+    print(f"{args.attempts} intentos de {args.questions} preguntas de texto (hasta {args.max_length} caracteres)")
+    print(f"grade(): p50 {percentile(timings, 50):.2f} ms, p99 {percentile(timings, 99):.2f} ms, "
+          f"máx {max(timings):.2f} ms (objetivo < 50 ms)")
+    print(f"Respuestas aceptadas: {correct / (args.attempts * args.questions):.0%}")
+    for expected, given in EXAMPLES:
+        entry = grading.KeyEntry(0, grading.normalize_text_answer(expected), 1.0, threshold, text=True)
+        verdict = "acepta" if grading.answer_matches(entry, given) else "rechaza"
+        print(f"  {expected!r} vs {given!r}: {verdict}")
@@ -0,0 +1,231 @@
+"""
+Verificación de planes de consulta.
+Ejecuta EXPLAIN ANALYZE sobre las consultas de los routers (armadas con las
+mismas funciones que usan los endpoints) y falla si alguna recorre con Seq Scan
+la tabla principal que consulta. El esquema se crea con `alembic upgrade head`,
+así se verifican los índices de las migraciones y no los de los modelos.
+
+Uso (contra una base de datos PostgreSQL desechable):
+    python scripts/explain_queries.py --seed     # migra el esquema + datos de prueba
+    python scripts/explain_queries.py            # solo verifica planes
+
+⚠️ --seed inserta muchas filas: NO ejecutar contra la base de datos de producción.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import insert, text
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.routers import chat, courses, documents, events, notifications, rag, users
+from app.core.database import SessionLocal, engine
+from app.core.enums import DocumentType, EventType, NotificationType, Role
+from app.core.pagination import page_query
+from app.services import conversations
+from app.models import (
+    ChatLog,
+    ChatMessage,
+    Company,
+    Course,
+    Document,
+    Enrollment,
+    Event,
+    Module,
+    ModuleContent,
+    Notification,
+    User,
+)
+
+# Usuario/empresa/curso/módulo usados como parámetros de las consultas
+PROBE_ID = 1
+
+
+def migrate() -> None:
+    """Crear el esquema con las migraciones de Alembic (alembic upgrade head)."""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+
+
+def seed(db, scale: int) -> None:
+    """Migrar el esquema e insertar un conjunto de datos con distribución realista."""
+    print(f"Migrando esquema e insertando datos (scale={scale})...")
+    migrate()
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    companies = max(10, scale // 1000)
+    users = max(100, scale // 10)
+    courses = max(50, scale // 100)
+    modules = courses * 5
+
+    def bulk(model, rows):
+        for start in range(0, len(rows), 5000):
+            db.execute(insert(model), rows[start:start + 5000])
+
+    bulk(Company, [{"name": f"Empresa {i}", "is_active": True} for i in range(companies)])
+    bulk(User, [
+        {
+            "email": f"user{i}@demo.com",
+            "hashed_password": "x",
+            "role": Role.ESTUDIANTE.value,
+            "company_id": rng.randint(1, companies),
+        }
+        for i in range(users)
+    ])
+    bulk(Course, [
+        {"company_id": rng.randint(1, companies), "title": f"Curso {i}", "instructor_id": rng.randint(1, users)}
+        for i in range(courses)
+    ])
+    bulk(Module, [{"course_id": i % courses + 1, "title": f"Módulo {i}", "order": i // courses} for i in range(modules)])
+    bulk(ModuleContent, [
+        {"module_id": i % modules + 1, "content_type": "text", "content": "...", "order": i // modules}
+        for i in range(modules * 4)
+    ])
+    bulk(Enrollment, [{"user_id": i % users + 1, "course_id": i // users + 1} for i in range(min(scale, users * courses))])
+    bulk(Document, [
+        {
+            "company_id": rng.randint(1, companies),
+            "title": f"doc{i}",
+            "file_path": f"/tmp/doc{i}",
+            "file_type": DocumentType.PDF,
+            "file_size": 1,
+            "uploaded_by": rng.randint(1, users),
+        }
+        for i in range(scale // 10)
+    ])
+    bulk(Event, [
+        {
+            "company_id": rng.randint(1, companies),
+            "user_id": rng.randint(1, users),
+            "title": f"evento {i}",
+            "event_type": EventType.TRAINING,
+            "start_time": now + timedelta(hours=rng.randint(-5000, 5000)),
+            "end_time": now + timedelta(hours=rng.randint(5001, 6000)),
+        }
+        for i in range(scale // 5)
+    ])
+    bulk(Notification, [
+        {
+            "user_id": rng.randint(1, users),
+            "notification_type": NotificationType.SYSTEM,
+            "title": "t",
+            "message": "m",
+            "is_read": rng.random() < 0.9,
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(scale)
+    ])
+    bulk(ChatMessage, [
+        {
+            "sender_id": rng.randint(1, users),
+            "receiver_id": rng.randint(1, users),
+            "message": "hola",
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(scale)
+    ])
+    conversations.rebuild(db)
+    bulk(ChatLog, [
+        {
+            "user_id": rng.randint(1, users),
+            "company_id": rng.randint(1, companies),
+            "query": "q",
+            "response": "r",
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(scale)
+    ])
+    db.commit()
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+
+def router_queries(db):
+    """Consultas de los routers con sus parámetros por defecto: (nombre, tabla principal, query)."""
+    me, other = PROBE_ID, PROBE_ID + 1
+    company_admin = User(id=me, role=Role.COMPANY_ADMIN.value, company_id=me)
+    return [
+        ("notifications.get_notifications", "notifications",
+         page_query(notifications.notifications_query(db, me), notifications.NOTIFICATIONS_ORDER,
+                    limit=50, descending=True)),
+        ("notifications.get_notifications(unread_only)", "notifications",
+         page_query(notifications.notifications_query(db, me, unread_only=True), notifications.NOTIFICATIONS_ORDER,
+                    limit=50, descending=True)),
+        ("chat.get_messages", "chat_messages",
+         page_query(chat.messages_query(db, me), chat.MESSAGES_ORDER, limit=100, descending=True)),
+        ("chat.get_messages(receiver_id)", "chat_messages",
+         page_query(chat.messages_query(db, me, receiver_id=other), chat.MESSAGES_ORDER, limit=100, descending=True)),
+        ("chat.get_conversations", "conversation_participants",
+         page_query(chat.conversations_query(db, me), chat.CONVERSATIONS_ORDER, limit=100, descending=True)),
+        ("rag.get_rag_history", "chat_logs",
+         page_query(rag.history_query(db, me), rag.HISTORY_ORDER, limit=50, descending=True)),
+        ("courses.enroll_in_course(duplicado)", "enrollments",
+         courses.enrollment_query(db, me, me).limit(1)),
+        ("courses.get_course_modules", "modules", courses.modules_query(db, me)),
+        ("courses.get_module_contents", "module_contents", courses.contents_query(db, me)),
+        ("events.get_events", "events",
+         events.events_query(db, me, start_date=datetime.now(timezone.utc))),
+        ("documents.get_documents", "documents",
+         page_query(documents.documents_query(db, me), [Document.id], limit=100)),
+        ("users.get_users(company_admin)", "users",
+         page_query(users.users_query(db, company_admin), [User.id], limit=100)),
+    ]
+
+
+def seq_scans(plan: dict, table: str) -> list:
+    """Buscar nodos Seq Scan sobre `table` en un plan JSON."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == table:
+        found.append(plan)
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, table))
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Crear esquema e insertar datos de prueba")
+    parser.add_argument("--scale", type=int, default=200_000, help="Filas en las tablas grandes")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar el plan completo")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args.scale)
+
+        failures = 0
+        dialect = postgresql.dialect()
+        for name, table, query in router_queries(db):
+            sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            row = db.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")).scalar()
+            plan = (row if isinstance(row, list) else json.loads(row))[0]
+            scans = seq_scans(plan["Plan"], table)
+            status_label = "[ERROR] SEQ SCAN" if scans else "[OK]"
+            print(f"{status_label:<16} {name:<45} {plan['Execution Time']:8.2f} ms")
+            if args.verbose or scans:
+                print(json.dumps(plan["Plan"], indent=2)[:4000])
+            failures += bool(scans)
+        db.rollback()
+    finally:
+        db.close()
+
+    if failures:
+        print(f"\n[ERROR] {failures} consulta(s) con Seq Scan")
+        return 1
+    print("\n[OK] Ninguna consulta usa Seq Scan sobre su tabla principal")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Calibración fuera de línea del modo adaptativo (quiz_irt_models).
+Para cada quiz (o los indicados) ajusta el modelo IRT 2PL de sus preguntas con
+las respuestas históricas de intentos completos y guarda la tabla de
+información precalculada, en una transacción propia por quiz. Requiere numpy
+(requirements-full.txt); volver a ejecutar cuando cambien las preguntas o se
+acumulen intentos nuevos.
+
+Uso:
+    python scripts/fit_irt_models.py
+    python scripts/fit_irt_models.py --quiz-id 3 --quiz-id 7
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.core.cache import invalidate_irt_model
+from app.core.database import SessionLocal
+from app.models.quiz import Quiz
+from app.services import adaptive, item_analysis
+
+
+def fit(quiz_ids=None, chunk_size: int = item_analysis.DEFAULT_CHUNK_SIZE) -> None:
+    db = SessionLocal()
+    try:
+        if not quiz_ids:
+            quiz_ids = [quiz_id for (quiz_id,) in db.query(Quiz.id).order_by(Quiz.id)]
+        print(f"Calibrando {len(quiz_ids)} quizzes...")
+        for quiz_id in quiz_ids:
+            report = adaptive.fit_quiz(db, quiz_id, chunk_size)
+            db.commit()
+            invalidate_irt_model(quiz_id)
+            if not report["questions"]:
+                print(f"⚠️ quiz {quiz_id}: sin preguntas con {adaptive.MIN_RESPONSES}+ respuestas, modo adaptativo desactivado")
+                continue
+            print(
+                f"✅ quiz {quiz_id}: {report['questions']} preguntas calibradas "
+                f"({report['skipped']} con pocos datos), {report['answers']} respuestas, "
+                f"{report['iterations']} iteraciones EM, {report['seconds']:.2f} s"
+            )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quiz-id", type=int, action="append", help="Quiz a calibrar (repetible)")
+    parser.add_argument("--chunk-size", type=int, default=item_analysis.DEFAULT_CHUNK_SIZE,
+                        help="Filas por lote leído de la base (yield_per)")
+    args = parser.parse_args()
+    fit(args.quiz_id, args.chunk_size)
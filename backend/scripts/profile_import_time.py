@@ -0,0 +1,141 @@
+"""
+Perfil de arranque en frío.
+Ejecuta `python -X importtime` en procesos nuevos importando el punto de entrada
+(por defecto api.index, el handler de Vercel), resume el costo de importación
+(total, módulos más caros por tiempo acumulado y por tiempo propio) y, con
+--request, mide además la primera petición servida por ese proceso.
+
+Termina con código 1 si la mediana supera --budget-ms: sirve como prueba de
+presupuesto de arranque en frío en CI.
+
+Uso:
+    python scripts/profile_import_time.py
+    python scripts/profile_import_time.py --module app.main --lazy false --runs 5
+    python scripts/profile_import_time.py --request /api/v1/courses/ --budget-ms 1500
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:  self [us] | cumulative | imported package" (la indentación marca el nivel)
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Se ejecuta en el proceso perfilado: importa el módulo y, opcionalmente, sirve
+# una petición; imprime los milisegundos de esa primera petición
+CHILD_CODE = """
+import sys, time
+import {module}
+path = {path!r}
+if path:
+    from fastapi.testclient import TestClient
+    from app.main import app
+    client = TestClient(app)
+    start = time.perf_counter()
+    client.get(path)
+    print(f"FIRST_REQUEST_MS={{(time.perf_counter() - start) * 1000:.1f}}")
+"""
+
+
+def parse_importtime(stderr: str):
+    """Lista de (nivel, módulo, propio_us, acumulado_us) en orden de salida."""
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((len(indent) // 2, name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile_once(module: str, path: str, env: dict):
+    """Importar `module` en un proceso nuevo; retorna (filas, ms primera petición o None)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE.format(module=module, path=path)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"❌ Error importando {module}:\n{result.stderr[-2000:]}")
+    first_request = re.search(r"FIRST_REQUEST_MS=([\d.]+)", result.stdout)
+    return parse_importtime(result.stderr), float(first_request.group(1)) if first_request else None
+
+
+def module_total_ms(rows, module: str) -> float:
+    """Tiempo acumulado del módulo raíz importado (la última fila con su nombre)."""
+    totals = [cumulative for _, name, _, cumulative in rows if name == module]
+    return totals[-1] / 1000 if totals else 0.0
+
+
+def print_top(title: str, rows, key, top: int) -> None:
+    print(f"\n{title}")
+    for level, name, self_us, cumulative_us in sorted(rows, key=key, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:>9.1f} ms acum. {self_us / 1000:>8.1f} ms propio  {name}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="api.index", help="Módulo a importar (api.index o app.main)")
+    parser.add_argument("--lazy", choices=("true", "false"), default=None,
+                        help="Forzar LAZY_ROUTERS (por defecto: lo que decida el módulo)")
+    parser.add_argument("--request", default="", help="Ruta de la primera petición a medir, p.ej. /health")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="Presupuesto para la mediana de importación (+ primera petición)")
+    return parser
+
+
+def build_env(args) -> dict:
+    """Entorno de los procesos perfilados (variables mínimas y LAZY_ROUTERS de --lazy)."""
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "profile-secret")
+    env.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/profile_import_time.db")
+    env.setdefault("LOG_TO_FILE", "false")
+    if args.lazy is not None:
+        env["LAZY_ROUTERS"] = args.lazy
+    return env
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    env = build_env(args)
+
+    totals, first_requests, last_rows = [], [], []
+    for _ in range(args.runs):
+        rows, first_request = profile_once(args.module, args.request, env)
+        totals.append(module_total_ms(rows, args.module))
+        if first_request is not None:
+            first_requests.append(first_request)
+        last_rows = rows
+
+    # Agregar por paquete de primer nivel (fastapi, sqlalchemy, app, ...) para el resumen
+    packages = {}
+    for level, name, self_us, _ in last_rows:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+
+    import_ms = statistics.median(totals)
+    print(f"{args.module}: mediana {import_ms:.1f} ms (min {min(totals):.1f}, max {max(totals):.1f}) en {args.runs} procesos")
+    print("\nPor paquete (tiempo propio sumado)")
+    for root, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:>9.1f} ms  {root}")
+    app_rows = [row for row in last_rows if row[1].startswith(("app.", "api."))]
+    print_top("Módulos de la aplicación por tiempo acumulado", app_rows, key=lambda row: row[3], top=args.top)
+    print_top("Módulos por tiempo propio", last_rows, key=lambda row: row[2], top=args.top)
+
+    total_ms = import_ms
+    if first_requests:
+        first_ms = statistics.median(first_requests)
+        total_ms += first_ms
+        print(f"\nPrimera petición {args.request}: mediana {first_ms:.1f} ms")
+
+    print(f"\nArranque en frío: {total_ms:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    if total_ms > args.budget_ms:
+        print("❌ Presupuesto de arranque en frío superado")
+        sys.exit(1)
+    print("✅ Dentro del presupuesto")
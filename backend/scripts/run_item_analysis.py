@@ -0,0 +1,52 @@
+"""
+Job por lotes de análisis de ítems (question_item_stats).
+Para cada quiz (o los indicados) lee sus respuestas en streaming, calcula
+dificultad, discriminación y distractores de todas sus preguntas con NumPy y
+reemplaza sus filas en una transacción propia. Requiere numpy
+(requirements-full.txt); pensado para ejecutarse periódicamente (cron).
+
+Uso:
+    python scripts/run_item_analysis.py
+    python scripts/run_item_analysis.py --quiz-id 3 --quiz-id 7 --chunk-size 100000
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import SessionLocal
+from app.models.quiz import Quiz
+from app.services import item_analysis
+
+
+def run(quiz_ids=None, chunk_size: int = item_analysis.DEFAULT_CHUNK_SIZE) -> None:
+    db = SessionLocal()
+    try:
+        if not quiz_ids:
+            quiz_ids = [quiz_id for (quiz_id,) in db.query(Quiz.id).order_by(Quiz.id)]
+        print(f"Analizando ítems de {len(quiz_ids)} quizzes...")
+        for quiz_id in quiz_ids:
+            report = item_analysis.run_quiz(db, quiz_id, chunk_size)
+            db.commit()
+            print(
+                f"✅ quiz {quiz_id}: {report['questions']} preguntas, {report['attempts']} intentos, "
+                f"{report['answers']} respuestas (lectura {report['seconds_reading']:.2f} s, "
+                f"cálculo {report['seconds_computing'] * 1000:.0f} ms)"
+            )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quiz-id", type=int, action="append", help="Quiz a analizar (repetible)")
+    parser.add_argument("--chunk-size", type=int, default=item_analysis.DEFAULT_CHUNK_SIZE,
+                        help="Filas por lote leído de la base (yield_per)")
+    args = parser.parse_args()
+    run(args.quiz_id, args.chunk_size)
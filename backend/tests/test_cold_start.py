@@ -0,0 +1,51 @@
+"""
+Presupuesto de arranque en frío: `python -X importtime -c "import app.main"`
+con LAZY_ROUTERS=true (como en Vercel), leído con el parser de
+scripts/profile_import_time.py, no supera --budget-ms; y tras importar
+app.main no hay ningún router de /api/v1 en sys.modules.
+
+Uso (desde backend/):
+    python -m pytest -q tests/test_cold_start.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BACKEND_DIR, "scripts")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import profile_import_time  # noqa: E402
+
+ARGS = ["--module", "app.main", "--lazy", "true", "--runs", "3"]
+
+# Se ejecuta en un proceso nuevo: el resto de las pruebas ya importó los routers
+ROUTERS_CODE = """
+import json, sys
+import app.main
+print(json.dumps(sorted(name for name in sys.modules if name.startswith("app.api.v1.routers."))))
+"""
+
+
+def test_import_app_main_within_budget():
+    args = profile_import_time.build_parser().parse_args(ARGS)
+    env = profile_import_time.build_env(args)
+    totals = []
+    for _ in range(args.runs):
+        rows, _ = profile_import_time.profile_once(args.module, args.request, env)
+        totals.append(profile_import_time.module_total_ms(rows, args.module))
+    assert min(totals) > 0, "importtime no reportó app.main"
+    assert statistics.median(totals) <= args.budget_ms, f"{totals} ms > {args.budget_ms:.0f} ms"
+
+
+def test_import_app_main_loads_no_router():
+    args = profile_import_time.build_parser().parse_args(ARGS)
+    result = subprocess.run(
+        [sys.executable, "-c", ROUTERS_CODE],
+        cwd=BACKEND_DIR, env=profile_import_time.build_env(args), capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
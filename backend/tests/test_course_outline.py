@@ -0,0 +1,119 @@
+"""
+Prueba de GET /courses/{course_id}/outline: el número de consultas es
+constante (curso + módulos + contenidos + evaluaciones con selectinload),
+independiente de la cantidad de módulos y contenidos del curso.
+
+Uso (desde backend/):
+    python -m pytest -q tests/test_course_outline.py
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "test_course_outline.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+
+MODULES = 5
+CONTENTS_PER_MODULE = 3
+
+
+def _seed_course(db, company_id: int, instructor_id: int, modules: int) -> int:
+    """Curso con `modules` módulos, cada uno con contenidos y un quiz."""
+    from app.models import Course, Module, ModuleContent, Quiz
+
+    course = Course(company_id=company_id, title=f"Curso {modules}", description="...", instructor_id=instructor_id)
+    db.add(course)
+    db.flush()
+    for i in range(modules):
+        module = Module(course_id=course.id, title=f"Módulo {i}", description="...", order=i)
+        db.add(module)
+        db.flush()
+        db.add_all([
+            ModuleContent(module_id=module.id, content_type="text", content=f"Contenido {j}", order=j)
+            for j in range(CONTENTS_PER_MODULE)
+        ])
+        db.add(Quiz(module_id=module.id, title=f"Quiz {i}", passing_score=14.0, total_questions=1))
+    return course.id
+
+
+@pytest.fixture(scope="module")
+def outline_setup():
+    """Esquema en SQLite, un administrador y cursos de N y 2N módulos."""
+    import app.models  # noqa: F401 - registra todas las tablas
+    from fastapi.testclient import TestClient
+
+    from app.core.database import Base, SessionLocal, get_engine
+    from app.core.enums import Role
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.models import Company, User
+
+    engine = get_engine()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        company = Company(name="Empresa")
+        db.add(company)
+        db.flush()
+        admin = User(email="admin@demo.com", hashed_password="x", role=Role.ADMINISTRADOR.value,
+                     company_id=company.id, is_active=True)
+        db.add(admin)
+        db.flush()
+        small = _seed_course(db, company.id, admin.id, MODULES)
+        large = _seed_course(db, company.id, admin.id, 2 * MODULES)
+        db.commit()
+        token = create_access_token({"sub": str(admin.id), "role": admin.role, "company_id": company.id})
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        yield client, {"Authorization": f"Bearer {token}"}, small, large
+    engine.dispose()
+
+
+@contextmanager
+def count_statements():
+    """Sentencias SQL ejecutadas dentro del bloque."""
+    from app.core.database import get_engine
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_outline_query_count_is_constant(outline_setup):
+    client, headers, small, large = outline_setup
+    client.get(f"/api/v1/courses/{small}/outline", headers=headers)  # Calentar cachés de la petición
+
+    counts = {}
+    for course_id, modules in ((small, MODULES), (large, 2 * MODULES)):
+        with count_statements() as statements:
+            response = client.get(f"/api/v1/courses/{course_id}/outline", headers=headers)
+        assert response.status_code == 200, response.text
+        outline = response.json()
+        assert len(outline["modules"]) == modules
+        assert all(len(module["contents"]) == CONTENTS_PER_MODULE for module in outline["modules"])
+        assert all(len(module["quizzes"]) == 1 for module in outline["modules"])
+        counts[modules] = len(statements)
+
+    assert counts[MODULES] == counts[2 * MODULES], counts
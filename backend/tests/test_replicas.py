@@ -0,0 +1,123 @@
+"""
+Pruebas del enrutado entre la base primaria y las réplicas de lectura
+(app.core.replicas): las lecturas van a la réplica, un usuario que escribió
+lee de la primaria durante READ_AFTER_WRITE_SECONDS y una réplica con más
+retraso que REPLICA_MAX_LAG_SECONDS no recibe lecturas.
+
+La primaria y la réplica son dos bases SQLite con el mismo usuario y distinto
+email: GET /auth/me indica de cuál se leyó.
+
+Uso (desde backend/):
+    python -m pytest -q tests/test_replicas.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'test_replicas_primary.db')}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_TO_FILE", "false")
+
+REPLICA_URL = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'test_replicas_replica.db')}"
+USER_ID = 1
+
+
+def _seed(engine, email: str) -> None:
+    """Esquema nuevo con una empresa y el usuario USER_ID."""
+    from sqlalchemy.orm import Session
+
+    from app.core.database import Base
+    from app.core.enums import Role
+    from app.models import Company, User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as db:
+        db.add(Company(id=1, name="Empresa"))
+        db.flush()
+        db.add(User(id=USER_ID, email=email, hashed_password="x", role=Role.ESTUDIANTE.value,
+                    company_id=1, is_active=True))
+        db.commit()
+
+
+@pytest.fixture(scope="module")
+def replica_client():
+    """Primaria y réplica sembradas, DATABASE_REPLICA_URLS apuntando a la réplica."""
+    import app.models  # noqa: F401 - registra todas las tablas
+    from fastapi.testclient import TestClient
+
+    from app.core import replicas
+    from app.core.config import settings
+    from app.core.database import build_engine, get_engine
+    from app.core.security import create_access_token
+    from app.main import app
+
+    replica_engine = build_engine(database_url=REPLICA_URL)
+    _seed(get_engine(), "primaria@demo.com")
+    _seed(replica_engine, "replica@demo.com")
+    replica_engine.dispose()
+    token = create_access_token({"sub": str(USER_ID), "role": "estudiante", "company_id": 1})
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "DATABASE_REPLICA_URLS", [REPLICA_URL])
+        patch.setattr(settings, "READ_AFTER_WRITE_SECONDS", 5.0)
+        patch.setattr(settings, "REPLICA_MAX_LAG_SECONDS", 2.0)
+        patch.setattr(replicas, "_replicas", None)
+        with TestClient(app) as client:
+            yield client, {"Authorization": f"Bearer {token}"}
+        for replica in replicas._replicas or []:
+            replica.engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_routing(monkeypatch):
+    """Sin marcas de lectura tras escritura y réplicas al día en cada prueba."""
+    from app.core import replicas
+    from app.core.cache import MemoryBackend
+
+    monkeypatch.setattr(replicas, "_pins", MemoryBackend(100))
+    for replica in replicas._replicas or []:
+        monkeypatch.setattr(replica, "lag_seconds", 0.0)
+
+
+def _read_email(client, headers) -> str:
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["email"]
+
+
+def test_get_reads_from_replica(replica_client):
+    client, headers = replica_client
+    assert _read_email(client, headers) == "replica@demo.com"
+
+
+def test_write_pins_user_to_primary(replica_client):
+    from app.core import replicas
+
+    client, headers = replica_client
+    assert _read_email(client, headers) == "replica@demo.com"
+
+    response = client.post("/api/v1/chat/", json={"receiver_id": USER_ID, "message": "Hola"}, headers=headers)
+    assert response.status_code == 201, response.text
+    assert replicas.is_pinned(USER_ID)
+    assert _read_email(client, headers) == "primaria@demo.com"
+
+
+def test_lagging_replica_falls_back_to_primary(replica_client):
+    from app.core import replicas
+
+    client, headers = replica_client
+    assert _read_email(client, headers) == "replica@demo.com"
+
+    (replica,) = replicas.get_replicas()
+    replica.lag_seconds = 10.0
+    replica.checked_at = time.monotonic()  # Medición reciente: no se vuelve a consultar
+    assert _read_email(client, headers) == "primaria@demo.com"